@@ -0,0 +1,27 @@
+"""Micro-benchmarks for chatbot intent detection.
+
+Run with ``pytest benchmarks`` (plain ``pytest`` only collects tests/). Inputs grow
+from a short question to the 4000-character limit ChatRequest accepts.
+"""
+import pytest
+
+from src.main import detect_intent
+
+FILLER = "please tell me more about the things we discussed earlier today "
+
+
+def synthetic_input(length: int, keyword: str) -> str:
+    """About ``length`` characters of filler text ending in ``keyword``."""
+    text = (FILLER * (length // len(FILLER) + 1))[: max(0, length - len(keyword) - 1)]
+    return f"{text} {keyword}".strip()
+
+
+@pytest.mark.parametrize("length", [16, 256, 4000], ids=lambda length: f"chars={length}")
+@pytest.mark.parametrize("keyword, intent", [
+    ("relationship", "graph_relationships"),
+    ("transaction", "structured_data"),
+    ("", "graph_relationships"),
+], ids=["first-rule", "last-rule", "no-match"])
+def test_detect_intent(benchmark, length, keyword, intent):
+    """Keyword scan over the lowered input; no-match inputs check every rule."""
+    assert benchmark(detect_intent, synthetic_input(length, keyword)) == intent
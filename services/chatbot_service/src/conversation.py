@@ -0,0 +1,239 @@
+"""
+Session-keyed conversation history for the chatbot.
+
+A ConversationStore keeps the recent turns of each session, bounded per session
+by a turn cap and an approximate token cap (oldest turns are dropped first), and
+bounded overall by a session cap that evicts the least recently used session.
+
+Two implementations share the interface: InMemoryConversationStore for a single
+process, and SqliteConversationStore, which keeps history on disk across
+restarts and between workers on the same host.
+"""
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count: whitespace-separated words."""
+    return len(text.split())
+
+
+@dataclass
+class Turn:
+    user_input: str
+    intent: str
+    database: Optional[str] = None
+    response: str = ""
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def tokens(self) -> int:
+        return count_tokens(self.user_input) + count_tokens(self.response)
+
+
+@dataclass
+class StoreLimits:
+    max_turns: int = 20
+    max_tokens: int = 2000
+    max_sessions: int = 10000
+
+    @classmethod
+    def from_env(cls) -> "StoreLimits":
+        return cls(
+            max_turns=int(os.getenv("CHATBOT_SESSION_MAX_TURNS", "20")),
+            max_tokens=int(os.getenv("CHATBOT_SESSION_MAX_TOKENS", "2000")),
+            max_sessions=int(os.getenv("CHATBOT_MAX_SESSIONS", "10000")),
+        )
+
+
+class ConversationStore(ABC):
+    """Bounded per-session conversation history."""
+
+    def __init__(self, limits: Optional[StoreLimits] = None):
+        self.limits = limits or StoreLimits()
+
+    @abstractmethod
+    def append(self, session_id: str, turn: Turn) -> None:
+        """Record a turn, trimming the session and evicting idle sessions as needed."""
+
+    @abstractmethod
+    def history(self, session_id: str) -> List[Turn]:
+        """Turns of a session, oldest first; empty for unknown sessions."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Forget a session; returns whether it existed."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored sessions."""
+
+    def last_turn(self, session_id: str) -> Optional[Turn]:
+        turns = self.history(session_id)
+        return turns[-1] if turns else None
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryConversationStore(ConversationStore):
+    """Sessions in an OrderedDict kept in least-recently-used order."""
+
+    def __init__(self, limits: Optional[StoreLimits] = None):
+        super().__init__(limits)
+        self._sessions: "OrderedDict[str, Deque[Turn]]" = OrderedDict()
+        self._tokens: Dict[str, int] = {}
+
+    def append(self, session_id: str, turn: Turn) -> None:
+        turns = self._sessions.get(session_id)
+        if turns is None:
+            turns = self._sessions[session_id] = deque()
+            self._tokens[session_id] = 0
+        self._sessions.move_to_end(session_id)
+        turns.append(turn)
+        self._tokens[session_id] += turn.tokens
+        # Always keep the newest turn, even if it alone exceeds the token cap
+        while len(turns) > 1 and (len(turns) > self.limits.max_turns
+                                  or self._tokens[session_id] > self.limits.max_tokens):
+            self._tokens[session_id] -= turns.popleft().tokens
+        while len(self._sessions) > self.limits.max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            del self._tokens[evicted]
+
+    def history(self, session_id: str) -> List[Turn]:
+        turns = self._sessions.get(session_id)
+        if turns is None:
+            return []
+        self._sessions.move_to_end(session_id)
+        return list(turns)
+
+    def delete(self, session_id: str) -> bool:
+        self._tokens.pop(session_id, None)
+        return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class SqliteConversationStore(ConversationStore):
+    """Sessions and turns in a SQLite database (WAL mode, one shared connection)."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            last_used REAL NOT NULL,
+            tokens INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS sessions_last_used ON sessions (last_used);
+        CREATE TABLE IF NOT EXISTS turns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+            user_input TEXT NOT NULL,
+            intent TEXT NOT NULL,
+            database TEXT,
+            response TEXT NOT NULL,
+            tokens INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS turns_session ON turns (session_id, id);
+    """
+
+    def __init__(self, path: str, limits: Optional[StoreLimits] = None):
+        super().__init__(limits)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self.SCHEMA)
+
+    def append(self, session_id: str, turn: Turn) -> None:
+        with self._lock, self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, last_used, tokens) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET last_used = excluded.last_used, "
+                "tokens = sessions.tokens + excluded.tokens",
+                (session_id, time.time(), turn.tokens),
+            )
+            conn.execute(
+                "INSERT INTO turns "
+                "(session_id, user_input, intent, database, response, tokens, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session_id, turn.user_input, turn.intent, turn.database, turn.response,
+                 turn.tokens, turn.created_at),
+            )
+            self._trim(conn, session_id)
+            conn.execute(
+                "DELETE FROM sessions WHERE session_id IN (SELECT session_id FROM sessions "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.limits.max_sessions,),
+            )
+
+    def _trim(self, conn: sqlite3.Connection, session_id: str) -> None:
+        rows = conn.execute(
+            "SELECT id, tokens FROM turns WHERE session_id = ? ORDER BY id DESC", (session_id,)
+        ).fetchall()
+        kept_tokens = 0
+        cutoff = None
+        for position, (turn_id, tokens) in enumerate(rows):
+            if position > 0 and (position >= self.limits.max_turns
+                                 or kept_tokens + tokens > self.limits.max_tokens):
+                cutoff = turn_id
+                break
+            kept_tokens += tokens
+        if cutoff is not None:
+            conn.execute("DELETE FROM turns WHERE session_id = ? AND id <= ?", (session_id, cutoff))
+            conn.execute("UPDATE sessions SET tokens = ? WHERE session_id = ?",
+                         (kept_tokens, session_id))
+
+    def history(self, session_id: str) -> List[Turn]:
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE sessions SET last_used = ? WHERE session_id = ?", (time.time(), session_id)
+            ).rowcount
+            if not updated:
+                return []
+            rows = self._conn.execute(
+                "SELECT user_input, intent, database, response, created_at FROM turns "
+                "WHERE session_id = ? ORDER BY id", (session_id,)
+            ).fetchall()
+        return [Turn(*row) for row in rows]
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            return cursor.rowcount > 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def create_store_from_env() -> ConversationStore:
+    """In-memory store by default; CHATBOT_CONVERSATION_STORE=sqlite keeps history on disk."""
+    limits = StoreLimits.from_env()
+    if os.getenv("CHATBOT_CONVERSATION_STORE", "memory") == "sqlite":
+        path = os.getenv("CHATBOT_CONVERSATION_DB", "conversations.db")
+        return SqliteConversationStore(path, limits)
+    return InMemoryConversationStore(limits)
@@ -1,13 +1,62 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import asdict
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, constr
 import httpx
-from typing import Optional, Dict, Any, Union
+import orjson
+from typing import AsyncIterator, Callable, Optional, Dict, Any
 from enum import Enum
+import os
+from service_common.metrics import instrument, stage
+from service_common.profiling import ProfilingSettings, enable_profiling
+from service_common.tracing import TraceSettings, Tracer, inject, trace_requests
 
-app = FastAPI(title="Chatbot Service")
+from .conversation import Turn, create_store_from_env
+from .semantic_cache import SemanticCache, SemanticCacheSettings
 
 # Constants
-MCP_SERVICE_URL = "http://mcp_service:8001"
+MCP_SERVICE_URL = os.getenv("MCP_SERVICE_URL", "http://mcp_service:8001")
+
+# Per-session conversation history (CHATBOT_CONVERSATION_STORE=memory|sqlite)
+conversations = create_store_from_env()
+
+# Answers for paraphrased questions, matched by embedding similarity (CHATBOT_SEMANTIC_CACHE*)
+answer_cache = SemanticCache(SemanticCacheSettings.from_env())
+
+# Pooled client for every MCP request, so calls reuse keep-alive connections
+_mcp_client: Optional[httpx.AsyncClient] = None
+
+def mcp_client() -> httpx.AsyncClient:
+    """The pooled MCP client, created on first use and closed when the app shuts down."""
+    global _mcp_client
+    if _mcp_client is None:
+        _mcp_client = httpx.AsyncClient(base_url=MCP_SERVICE_URL, timeout=10.0)
+    return _mcp_client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _mcp_client
+    yield
+    if _mcp_client is not None:
+        await _mcp_client.aclose()
+        _mcp_client = None
+    conversations.close()
+
+app = FastAPI(title="Chatbot Service", lifespan=lifespan)
+instrument(app)
+
+# Request traces continued into MCP via traceparent (CHATBOT_TRACE_EXPORTER, CHATBOT_TRACE_SAMPLE_RATIO)
+tracer = Tracer(TraceSettings.from_env("CHATBOT_TRACE", "chatbot"))
+trace_requests(app, tracer)
+
+# POST /admin/profile and X-Profile: 1 requests, enabled by CHATBOT_PROFILING_TOKEN
+profiler = enable_profiling(app, ProfilingSettings.from_env("CHATBOT", "chatbot"))
+
+# Hot-path stages of /chat, exported as stage_duration_seconds on /metrics
+INTENT_STAGE = stage("intent_detection")
+ROUTE_STAGE = stage("route")
+SERIALIZE_STAGE = stage("serialize")
 
 class DatabaseType(str, Enum):
     NEO4J = "neo4j"
@@ -17,6 +66,8 @@ class DatabaseType(str, Enum):
 class ChatRequest(BaseModel):
     # Add validation: non-empty string with max length of 4000 chars
     user_input: constr(min_length=1, max_length=4000)
+    # Optional conversation key; follow-up questions reuse the session's previous intent
+    session_id: Optional[constr(min_length=1, max_length=128)] = None
 
 class ChatResponse(BaseModel):
     # Support different response types based on database
@@ -29,9 +80,10 @@ class ChatResponse(BaseModel):
     data: Optional[Dict[str, Any]] = None  # For Relational responses
     records: Optional[list] = None  # For Relational responses
 
-def detect_intent(user_input: str) -> str:
+def detect_intent(user_input: str, previous_intent: Optional[str] = None) -> str:
     """
     Detect intent from user input to determine appropriate database routing.
+    Input without any intent keyword is treated as a follow-up of previous_intent.
     """
     user_input = user_input.lower()
     
@@ -47,67 +99,218 @@ def detect_intent(user_input: str) -> str:
     if any(term in user_input for term in ["profile", "user", "data", "record", "transaction"]):
         return "structured_data"
     
-    # Default to graph relationships
-    return "graph_relationships"
+    # Follow-up questions stay on the previous intent; default to graph relationships
+    return previous_intent or "graph_relationships"
+
+def resolve_intent(request: ChatRequest) -> str:
+    """Detect the intent of a chat request in the context of its session."""
+    previous = conversations.last_turn(request.session_id) if request.session_id else None
+    return detect_intent(request.user_input, previous.intent if previous else None)
+
+def remember_turn(request: ChatRequest, intent: str, database: Optional[str], response: str) -> None:
+    """Record a completed turn in the request's session, if it has one."""
+    if request.session_id:
+        conversations.append(request.session_id, Turn(request.user_input, intent, database, response))
 
 async def route_to_mcp(query: str, intent: str) -> Dict[str, Any]:
     """
     Route request to MCP service and get appropriate database response.
     """
-    async with httpx.AsyncClient() as client:
+    with tracer.span("mcp.route", kind="client", intent=intent) as span:
         try:
-            response = await client.post(
-                f"{MCP_SERVICE_URL}/route",
+            response = await mcp_client().post(
+                "/route",
                 json={"query": query, "intent": intent},
-                timeout=10.0
+                headers=inject({}),
             )
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except httpx.HTTPError as e:
+            span.fail(str(e))
             raise HTTPException(status_code=500, detail=f"MCP service error: {str(e)}")
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest) -> ChatResponse:
+def build_chat_response(mcp_response: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Process a chat request and return a response from appropriate database.
-    
-    Parameters:
-        request (ChatRequest): Chat request with user input
-            - user_input must not be empty
-            - user_input must not exceed 4000 characters
-    
-    Returns:
-        ChatResponse: Response with appropriate fields based on database type
+    ChatResponse fields filled with the backend payload routed by MCP.
+    Lists are shared between the fields that expose them rather than copied.
     """
-    # Detect intent from user input
-    intent = detect_intent(request.user_input)
-    
-    # Route request to MCP service
-    mcp_response = await route_to_mcp(request.user_input, intent)
-    
-    # Initialize response with base fields
-    response_data = {"response": mcp_response.get("response", "")}
-    
+    response_data: Dict[str, Any] = dict.fromkeys(ChatResponse.model_fields)
+    response_data["response"] = mcp_response.get("response", "")
+
     # Add database-specific fields based on routing
     database = mcp_response.get("database")
+    result = mcp_response.get("result") or {}
     if database == DatabaseType.NEO4J:
+        nodes = result.get("nodes", [])
+        relationships = result.get("relationships", [])
         response_data.update({
-            "graph": {"nodes": [], "relationships": []},  # Mock graph data
-            "nodes": [],
-            "relationships": []
+            "graph": {"nodes": nodes, "relationships": relationships},
+            "nodes": nodes,
+            "relationships": relationships
         })
     elif database == DatabaseType.WEAVIATE:
+        documents = result.get("results", [])
         response_data.update({
-            "similar_docs": [],  # Mock similar docs
-            "results": []
+            "similar_docs": documents,
+            "results": documents
         })
     elif database == DatabaseType.RELATIONAL:
         response_data.update({
-            "data": {},  # Mock data
-            "records": []
+            "data": result,
+            "records": result.get("results") or []
         })
+    return response_data
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest) -> Response:
+    """
+    Process a chat request and return a response from appropriate database.
     
-    return ChatResponse(**response_data)
+    Parameters:
+        request (ChatRequest): Chat request with user input
+            - user_input must not be empty
+            - user_input must not exceed 4000 characters
+    
+    Returns:
+        ChatResponse: Response with appropriate fields based on database type,
+        serialized with orjson straight from the MCP payload. A close paraphrase
+        of a recent question with the same intent is answered from answer_cache.
+    """
+    # Detect intent from user input
+    with INTENT_STAGE.time(), tracer.span("intent_detection") as span:
+        intent = resolve_intent(request)
+        span.set_attribute("intent", intent)
+    
+    cached = None
+    if answer_cache.settings.enabled:
+        with tracer.span("semantic_cache.lookup") as span:
+            cached = answer_cache.get(request.user_input, intent)
+            span.set_attribute("hit", cached is not None)
+    if cached is not None:
+        body, database, summary = cached
+    else:
+        # Route request to MCP service
+        with ROUTE_STAGE.time():
+            mcp_response = await route_to_mcp(request.user_input, intent)
+        with SERIALIZE_STAGE.time(), tracer.span("serialize"):
+            body = orjson.dumps(build_chat_response(mcp_response))
+        database, summary = mcp_response.get("database"), mcp_response.get("response", "")
+        if answer_cache.settings.enabled:
+            answer_cache.put(request.user_input, intent, (body, database, summary))
+    remember_turn(request, intent, database, summary)
+    
+    return Response(content=body, media_type="application/json")
+
+# Server-Sent Event name for each record kind streamed by the MCP service
+SSE_EVENTS = {
+    "node": "graph",
+    "relationship": "graph",
+    "document": "similar_doc",
+    "row": "record",
+    "status": "record",
+}
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Encode one Server-Sent Event."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+async def open_mcp_stream(query: str, intent: str) -> tuple[AsyncExitStack, httpx.Response]:
+    """
+    Open a streaming /route/stream request to the MCP service.
+    Errors before the stream starts are raised as HTTPException, like route_to_mcp.
+    """
+    stack = AsyncExitStack()
+    try:
+        with tracer.span("mcp.route_stream", kind="client", intent=intent):
+            response = await stack.enter_async_context(mcp_client().stream(
+                "POST", "/route/stream", json={"query": query, "intent": intent},
+                headers=inject({}),
+                # No read timeout: records may arrive slowly, the MCP service bounds the backend calls
+                timeout=httpx.Timeout(10.0, read=None),
+            ))
+        if response.status_code >= 400:
+            body = await response.aread()
+            raise HTTPException(
+                status_code=500,
+                detail=f"MCP service error: {response.status_code} {body[:200].decode(errors='replace')}",
+            )
+        return stack, response
+    except httpx.HTTPError as e:
+        await stack.aclose()
+        raise HTTPException(status_code=500, detail=f"MCP service error: {str(e)}")
+    except BaseException:
+        await stack.aclose()
+        raise
+
+async def relay_mcp_events(
+    response: httpx.Response,
+    stack: AsyncExitStack,
+    on_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Translate the MCP NDJSON event stream into Server-Sent Events as lines arrive.
+    on_done receives the final `done` event.
+    """
+    try:
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            event = orjson.loads(line)
+            kind = event.pop("event")
+            if kind == "record":
+                record = event["record"]
+                yield sse_event(SSE_EVENTS.get(record.get("record"), "record"), record)
+            else:
+                # route, done and error events are forwarded as they are
+                if kind == "done" and on_done is not None:
+                    on_done(event)
+                yield sse_event(kind, event)
+    except httpx.HTTPError as e:
+        yield sse_event("error", {"detail": f"MCP service error: {str(e)}"})
+    finally:
+        await stack.aclose()
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    """
+    Streaming variant of /chat using Server-Sent Events.
+
+    Emits a `route` event naming the database, then `graph`, `similar_doc` or
+    `record` events as the backend produces results, and finally `done` with the
+    summary response (or `error` if the backend fails mid-stream).
+    """
+    with INTENT_STAGE.time(), tracer.span("intent_detection") as span:
+        intent = resolve_intent(request)
+        span.set_attribute("intent", intent)
+    stack, response = await open_mcp_stream(request.user_input, intent)
+
+    def on_done(event: Dict[str, Any]) -> None:
+        remember_turn(request, intent, event.get("database"), event.get("response", ""))
+
+    return StreamingResponse(
+        relay_mcp_events(response, stack, on_done),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: str) -> dict:
+    """
+    Conversation history of a session, oldest turn first.
+    """
+    turns = conversations.history(session_id)
+    if not turns:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"session_id": session_id, "turns": [asdict(turn) for turn in turns]}
+
+@app.delete("/sessions/{session_id}", status_code=204)
+async def delete_session(session_id: str) -> Response:
+    """
+    Forget a session's conversation history.
+    """
+    if not conversations.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return Response(status_code=204)
 
 @app.get("/health")
 async def health_check() -> dict:
@@ -115,3 +318,10 @@ async def health_check() -> dict:
     Health check endpoint that returns OK status.
     """
     return {"status": "ok"}
+
+@app.get("/health/cache")
+async def cache_health() -> dict:
+    """
+    Semantic answer cache size and hit statistics.
+    """
+    return answer_cache.snapshot()
@@ -0,0 +1,217 @@
+"""Semantic answer cache for paraphrased chat questions.
+
+Questions are embedded locally with the hashing trick (no model download, no
+network) and matched against cached answers by cosine similarity.  All cached
+embeddings live in one preallocated NumPy matrix, so a lookup is a single
+matrix-vector product over at most `max_entries` rows.
+
+Words are folded to a canonical form first (plurals, a small synonym table),
+so "find similar articles" and "search for related articles" embed identically.
+Similarity alone cannot tell "John and Jane" from "John and Bob": one swapped
+name barely moves a bag-of-words vector.  A cached answer therefore also needs
+the anchors of each question -- numbers and capitalized words -- to appear in
+the other, while the rest of the wording may differ.
+"""
+import os
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set
+
+import numpy as np
+
+TOKEN = re.compile(r"[A-Za-z0-9]+")
+
+# Words that do not change what a question asks for
+FILLER = frozenset({
+    "a", "an", "the", "please", "kindly", "just", "can", "could", "would", "will",
+    "you", "i", "me", "us", "some", "any", "is", "are", "do", "does", "for", "of", "all",
+})
+
+# Interchangeable words in chat questions, folded to one canonical form
+SYNONYMS = {
+    "search": "find", "look": "find", "lookup": "find", "get": "find", "fetch": "find",
+    "retrieve": "find", "show": "find", "list": "find", "display": "find",
+    "related": "similar", "alike": "similar", "like": "similar", "comparable": "similar",
+    "connection": "relationship", "relation": "relationship", "link": "relationship",
+    "doc": "document", "record": "row", "entry": "row",
+}
+
+
+def canonical(word: str) -> str:
+    """Lowercase, singular, synonym-folded form of word."""
+    word = word.lower()
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return SYNONYMS.get(word, word)
+
+
+def content_words(text: str) -> List[str]:
+    """Canonical words of text without filler, in order."""
+    words = (canonical(word) for word in TOKEN.findall(text))
+    return [word for word in words if word not in FILLER]
+
+
+def anchor_words(text: str) -> FrozenSet[str]:
+    """Canonical forms of the numbers and capitalized words in text.
+
+    These name the entities a question is about; filler stays out even when it
+    starts a sentence.
+    """
+    anchors = (
+        canonical(word) for word in TOKEN.findall(text) if word[0].isupper() or not word.isalpha()
+    )
+    return frozenset(word for word in anchors if word not in FILLER)
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder using signed feature hashing.
+
+    Unigrams and bigrams of the content words are hashed into `dim` buckets with
+    CRC32 (stable across processes, unlike `hash()`), weighted by sublinear term
+    frequency and L2-normalized so a dot product is the cosine similarity.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def features(self, text: str) -> List[str]:
+        words = content_words(text)
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self.features(text):
+            digest = zlib.crc32(feature.encode())
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dim] += sign
+        # Sublinear tf keeps repeated words from dominating the direction
+        np.copysign(np.log1p(np.abs(vector)), vector, out=vector)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+@dataclass
+class SemanticCacheSettings:
+    enabled: bool = True
+    threshold: float = 0.95
+    ttl: float = 300.0
+    max_entries: int = 1024
+    dim: int = 512
+
+    @classmethod
+    def from_env(cls) -> "SemanticCacheSettings":
+        return cls(
+            enabled=os.getenv("CHATBOT_SEMANTIC_CACHE", "true").lower() in ("1", "true", "yes"),
+            threshold=float(os.getenv("CHATBOT_SEMANTIC_CACHE_THRESHOLD", "0.95")),
+            ttl=float(os.getenv("CHATBOT_SEMANTIC_CACHE_TTL", "300")),
+            max_entries=int(os.getenv("CHATBOT_SEMANTIC_CACHE_SIZE", "1024")),
+            dim=int(os.getenv("CHATBOT_SEMANTIC_CACHE_DIM", "512")),
+        )
+
+
+class SemanticCache:
+    """Nearest-neighbour answer cache with a similarity threshold, TTL and size bound.
+
+    Entries only match lookups for the same intent whose anchors agree both
+    ways, so a paraphrase never returns an answer that was routed to a
+    different database or asked about a different entity.  When full, an
+    expired slot is reused if there is one, otherwise the least recently used
+    entry is evicted.
+    """
+
+    def __init__(
+        self,
+        settings: Optional[SemanticCacheSettings] = None,
+        embedder: Optional[HashingEmbedder] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.settings = settings or SemanticCacheSettings()
+        self.embedder = embedder or HashingEmbedder(self.settings.dim)
+        self.clock = clock
+        size = self.settings.max_entries
+        self._vectors = np.zeros((size, self.embedder.dim), dtype=np.float32)
+        # Empty slots have expires_at == -inf and never match
+        self._expires_at = np.full(size, -np.inf)
+        self._last_used = np.zeros(size)
+        self._intent_ids = np.full(size, -1)
+        self._words: List[Set[str]] = [set() for _ in range(size)]
+        self._anchors: List[FrozenSet[str]] = [frozenset()] * size
+        self._intent_index: Dict[str, int] = {}
+        self._values: List[Any] = [None] * size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires_at > self.clock()))
+
+    def _best_match(self, vector: np.ndarray, words: Set[str], anchors: FrozenSet[str],
+                    intent: str, now: float) -> Optional[int]:
+        intent_id = self._intent_index.get(intent, -1)
+        candidates = np.flatnonzero((self._expires_at > now) & (self._intent_ids == intent_id))
+        if not candidates.size:
+            return None
+        scores = self._vectors[candidates] @ vector
+        above = np.flatnonzero(scores >= self.settings.threshold)
+        # Most similar first; the first entry whose anchors agree both ways wins
+        for index in above[np.argsort(-scores[above])]:
+            slot = int(candidates[index])
+            if anchors <= self._words[slot] and self._anchors[slot] <= words:
+                return slot
+        return None
+
+    def get(self, text: str, intent: str) -> Optional[Any]:
+        """Cached value for the closest question with this intent, if similar enough."""
+        now = self.clock()
+        slot = self._best_match(
+            self.embedder.embed(text), set(content_words(text)), anchor_words(text), intent, now
+        )
+        if slot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._last_used[slot] = now
+        return self._values[slot]
+
+    def put(self, text: str, intent: str, value: Any) -> None:
+        """Cache value for text, replacing a near-duplicate entry if one exists."""
+        now = self.clock()
+        vector = self.embedder.embed(text)
+        words = set(content_words(text))
+        anchors = anchor_words(text)
+        slot = self._best_match(vector, words, anchors, intent, now)
+        if slot is None:
+            expired = np.flatnonzero(self._expires_at <= now)
+            if expired.size:
+                slot = int(expired[0])
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+        self._vectors[slot] = vector
+        self._expires_at[slot] = now + self.settings.ttl
+        self._last_used[slot] = now
+        self._intent_ids[slot] = self._intent_index.setdefault(intent, len(self._intent_index))
+        self._words[slot] = words
+        self._anchors[slot] = anchors
+        self._values[slot] = value
+
+    def clear(self) -> None:
+        self._expires_at.fill(-np.inf)
+        self._intent_ids.fill(-1)
+        self._values = [None] * len(self._values)
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.settings.enabled,
+            "entries": len(self),
+            "max_entries": self.settings.max_entries,
+            "threshold": self.settings.threshold,
+            "ttl": self.settings.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
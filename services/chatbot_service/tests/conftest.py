@@ -0,0 +1,13 @@
+import pytest
+
+from src import main
+from src.conversation import InMemoryConversationStore
+from src.semantic_cache import SemanticCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch) -> None:
+    """Give every test an empty conversation store, answer cache and MCP client."""
+    monkeypatch.setattr(main, "conversations", InMemoryConversationStore())
+    monkeypatch.setattr(main, "answer_cache", SemanticCache())
+    monkeypatch.setattr(main, "_mcp_client", None)
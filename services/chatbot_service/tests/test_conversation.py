@@ -0,0 +1,86 @@
+import pytest
+
+from src.conversation import InMemoryConversationStore, SqliteConversationStore, StoreLimits, Turn
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    """Build either store implementation with the given limits."""
+    stores = []
+
+    def make(**limits):
+        if request.param == "memory":
+            store = InMemoryConversationStore(StoreLimits(**limits))
+        else:
+            store = SqliteConversationStore(str(tmp_path / "conversations.db"), StoreLimits(**limits))
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def test_store_caps_turns_per_session(make_store) -> None:
+    """Test that a session keeps only its newest turns.
+
+    Expected Outcome:
+        - History is capped at max_turns, oldest first
+        - last_turn returns the newest turn
+    """
+    store = make_store(max_turns=3)
+    for i in range(5):
+        store.append("s1", Turn(f"question {i}", "structured_data"))
+
+    assert [turn.user_input for turn in store.history("s1")] == ["question 2", "question 3", "question 4"]
+    assert store.last_turn("s1").user_input == "question 4"
+
+
+def test_store_caps_tokens_per_session(make_store) -> None:
+    """Test the per-session token budget.
+
+    Expected Outcome:
+        - Oldest turns are dropped until the session fits max_tokens
+        - The newest turn is kept even when it alone exceeds the budget
+    """
+    store = make_store(max_tokens=6)
+    store.append("s1", Turn("one two", "semantic_search", response="three"))
+    store.append("s1", Turn("four five", "semantic_search", response="six seven"))
+    assert [turn.user_input for turn in store.history("s1")] == ["four five"]
+
+    store.append("s1", Turn("a b c d e f g h", "semantic_search"))
+    assert [turn.user_input for turn in store.history("s1")] == ["a b c d e f g h"]
+
+
+def test_store_evicts_least_recently_used_session(make_store) -> None:
+    """Test LRU eviction of idle sessions.
+
+    Expected Outcome:
+        - Only max_sessions sessions are kept
+        - The session touched least recently is evicted first
+    """
+    store = make_store(max_sessions=2)
+    store.append("a", Turn("hi", "graph_relationships"))
+    store.append("b", Turn("hi", "graph_relationships"))
+    store.append("a", Turn("again", "graph_relationships"))
+    store.append("c", Turn("hi", "graph_relationships"))
+
+    assert len(store) == 2
+    assert store.history("b") == []
+    assert len(store.history("a")) == 2
+    assert store.delete("c") is True
+    assert store.delete("c") is False
+    assert store.last_turn("c") is None
+
+
+def test_sqlite_store_survives_reopen(tmp_path) -> None:
+    """Test that the SQLite store keeps history across process restarts."""
+    path = str(tmp_path / "conversations.db")
+    store = SqliteConversationStore(path)
+    store.append("s1", Turn("latest posts", "structured_data", "relational", "Found 3 records"))
+    store.close()
+
+    reopened = SqliteConversationStore(path)
+    turn = reopened.last_turn("s1")
+    reopened.close()
+    assert (turn.intent, turn.database, turn.response) == ("structured_data", "relational", "Found 3 records")
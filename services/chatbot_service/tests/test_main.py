@@ -1,10 +1,12 @@
+import json
 from typing import AsyncGenerator
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
 
-from src.main import app
+from src.main import ChatResponse, app
 
 
 @pytest.fixture
@@ -184,3 +186,253 @@ async def test_chat_endpoint_malformed_json(async_client: AsyncClient, client: T
         headers={"Content-Type": "application/json"}
     )
     assert response.status_code == 422
+
+
+def mock_mcp(monkeypatch: pytest.MonkeyPatch, handler) -> None:
+    """Send the service's outgoing MCP requests to an in-process handler."""
+    import functools
+
+    monkeypatch.setattr(httpx, "AsyncClient", functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handler)))
+
+
+def parse_sse(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_chat_stream_relays_mcp_records(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the /chat/stream Server-Sent Events endpoint.
+
+    Purpose:
+        Verify records streamed by the MCP service are forwarded as typed SSE events.
+
+    Expected Outcome:
+        - The detected intent is sent to MCP /route/stream
+        - Graph records become `graph` events, followed by the `done` summary
+        - The response uses the text/event-stream media type
+    """
+    mcp_events = [
+        {"event": "route", "database": "neo4j", "fallback_info": None},
+        {"event": "record", "record": {"record": "node", "id": 1, "labels": [], "properties": {}}},
+        {"event": "record", "record": {"record": "relationship", "id": 0, "type": "KNOWS",
+                                       "start_node": 1, "end_node": 1, "properties": {}}},
+        {"event": "done", "database": "neo4j", "counts": {"node": 1, "relationship": 1},
+         "response": "Found 1 nodes and 1 relationships"},
+    ]
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.url.path, json.loads(request.content)))
+        return httpx.Response(200, content="".join(json.dumps(event) + "\n" for event in mcp_events))
+
+    mock_mcp(monkeypatch, handler)
+    response = client.post("/chat/stream", json={"user_input": "relationship between Ann and Bob"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert requests == [("/route/stream", {"query": "relationship between Ann and Bob",
+                                            "intent": "graph_relationships"})]
+    events = parse_sse(response.text)
+    assert [name for name, _ in events] == ["route", "graph", "graph", "done"]
+    assert events[-1][1]["response"] == "Found 1 nodes and 1 relationships"
+
+
+def test_chat_stream_mcp_failure(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test /chat/stream when the MCP service rejects the request.
+
+    Expected Outcome:
+        - Status code should be 500 with an MCP service error, as for /chat
+    """
+    mock_mcp(monkeypatch, lambda request: httpx.Response(503, json={"detail": "overloaded"}))
+    response = client.post("/chat/stream", json={"user_input": "find similar docs"})
+    assert response.status_code == 500
+    assert "MCP service error" in response.json()["detail"]
+
+
+def test_chat_forwards_backend_payloads(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that /chat fills ChatResponse with the payload routed by MCP.
+
+    Purpose:
+        Verify the database-specific fields carry real backend results instead of placeholders.
+
+    Expected Outcome:
+        - Graph answers populate graph, nodes and relationships
+        - Vector answers populate similar_docs and results
+        - Relational answers populate data and records
+        - Fields for other databases stay null
+    """
+    nodes = [{"id": 1, "labels": ["Person"], "properties": {"name": "John"}}]
+    documents = [{"id": "1", "class_name": "Document", "distance": 0.1, "properties": {}}]
+    rows = [{"id": 1, "username": "john_doe"}]
+    payloads = {
+        "graph_relationships": ("neo4j", {"nodes": nodes, "relationships": []}),
+        "semantic_search": ("weaviate", {"results": documents}),
+        "structured_data": ("relational", {"results": rows, "affected_rows": None, "message": None}),
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        database, result = payloads[json.loads(request.content)["intent"]]
+        return httpx.Response(200, json={"database": database, "response": "summary",
+                                         "fallback_info": None, "result": result})
+
+    mock_mcp(monkeypatch, handler)
+
+    data = client.post("/chat", json={"user_input": "connection between John and Jane"}).json()
+    assert data["graph"] == {"nodes": nodes, "relationships": []}
+    assert data["nodes"] == nodes
+    assert data["similar_docs"] is None
+
+    data = client.post("/chat", json={"user_input": "find similar articles"}).json()
+    assert data["similar_docs"] == documents and data["results"] == documents
+
+    data = client.post("/chat", json={"user_input": "user profile"}).json()
+    assert data["records"] == rows
+    assert data["data"]["results"] == rows
+    assert data["response"] == "summary"
+    assert set(data) == set(ChatResponse.model_fields)
+
+
+def test_mcp_requests_share_one_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that /chat and /chat/stream reuse one pooled MCP client.
+
+    Expected Outcome:
+        - Both endpoints send their requests through the same client
+        - The client is closed when the app shuts down
+    """
+    from src import main
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/route/stream":
+            done = {"event": "done", "database": "relational", "response": "ok"}
+            return httpx.Response(200, content=json.dumps(done).encode() + b"\n")
+        return httpx.Response(200, json={"database": "relational", "response": "ok", "result": {}})
+
+    mock_mcp(monkeypatch, handler)
+    with TestClient(main.app) as client:
+        assert client.post("/chat", json={"user_input": "user profile"}).status_code == 200
+        shared = main._mcp_client
+        assert client.post("/chat", json={"user_input": "list users"}).status_code == 200
+        assert client.post("/chat/stream", json={"user_input": "list users"}).status_code == 200
+        assert main._mcp_client is shared
+    assert shared.is_closed
+    assert main._mcp_client is None
+
+
+def test_chat_session_follow_up_reuses_intent(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test conversation context carried across /chat calls with a session_id.
+
+    Purpose:
+        Verify a follow-up without intent keywords stays on the session's previous intent.
+
+    Expected Outcome:
+        - The follow-up is routed with the first turn's intent
+        - GET /sessions/{id} returns both turns; DELETE forgets them
+    """
+    intents = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        intents.append(json.loads(request.content)["intent"])
+        return httpx.Response(200, json={"database": "weaviate", "response": "Found 1 documents",
+                                         "result": {"results": []}})
+
+    mock_mcp(monkeypatch, handler)
+    client.post("/chat", json={"user_input": "find similar articles", "session_id": "s1"})
+    client.post("/chat", json={"user_input": "what about last year?", "session_id": "s1"})
+    client.post("/chat", json={"user_input": "what about last year?"})
+    assert intents == ["semantic_search", "semantic_search", "graph_relationships"]
+
+    history = client.get("/sessions/s1").json()
+    assert [turn["user_input"] for turn in history["turns"]] == ["find similar articles", "what about last year?"]
+    assert history["turns"][1]["database"] == "weaviate"
+    assert client.delete("/sessions/s1").status_code == 204
+    assert client.get("/sessions/s1").status_code == 404
+
+
+def test_chat_answers_paraphrases_from_cache(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that /chat serves a close paraphrase from the semantic answer cache.
+
+    Expected Outcome:
+        - Only the first of two near-identical questions reaches the MCP service
+        - Both receive the same response body
+    """
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content)["query"])
+        return httpx.Response(200, json={"database": "weaviate", "response": "Found 1 documents",
+                                         "result": {"results": [{"id": "1"}]}})
+
+    mock_mcp(monkeypatch, handler)
+    first = client.post("/chat", json={"user_input": "find documents similar to machine learning"})
+    second = client.post("/chat", json={"user_input": "Find documents similar to machine learning?"})
+
+    assert calls == ["find documents similar to machine learning"]
+    assert second.content == first.content
+    assert client.get("/health/cache").json()["hits"] == 1
+
+
+def test_metrics_endpoint_reports_chat_stages(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that /metrics exposes request latency and /chat stage timings.
+
+    Expected Outcome:
+        - /chat appears in the request latency histogram
+        - Intent detection, routing and serialization are timed as stages
+    """
+    mock_mcp(monkeypatch, lambda request: httpx.Response(
+        200, json={"database": "relational", "response": "Found 1 records", "result": {"results": []}}
+    ))
+    assert client.post("/chat", json={"user_input": "show user profile"}).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="POST",route="/chat",status="200"}' in response.text
+    for name in ("intent_detection", "route", "serialize"):
+        assert f'stage_duration_seconds_count{{stage="{name}"}}' in response.text
+
+
+def test_chat_propagates_trace_context(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that /chat continues the caller's trace into the MCP request.
+
+    Expected Outcome:
+        - The MCP request carries a traceparent in the caller's trace, sampled
+        - Intent detection, the MCP call and serialization are recorded as spans of that trace
+    """
+    from src import main
+    from service_common.tracing import Span, SpanExporter
+
+    class ListExporter(SpanExporter):
+        def __init__(self) -> None:
+            self.spans = []
+
+        def export(self, span: Span) -> None:
+            self.spans.append(span)
+
+    monkeypatch.setattr(main.tracer, "exporter", ListExporter())
+    headers = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        headers.append(request.headers.get("traceparent"))
+        return httpx.Response(200, json={"database": "relational", "response": "Found 0 records", "result": {}})
+
+    mock_mcp(monkeypatch, handler)
+    trace_id = "0af7651916cd43dd8448eb211c80319c"
+    client.post("/chat", json={"user_input": "show user profile"},
+                headers={"traceparent": f"00-{trace_id}-b7ad6b7169203331-01"})
+
+    spans = {span.name: span for span in main.tracer.exporter.spans}
+    assert {"intent_detection", "mcp.route", "serialize", "POST /chat"} <= set(spans)
+    assert all(span.context.trace_id == trace_id for span in spans.values())
+    assert headers == [f"00-{trace_id}-{spans['mcp.route'].context.span_id}-01"]
+
+
+def test_profiling_disabled_without_token(client: TestClient) -> None:
+    """Test that the profiling endpoint is admin-only.
+
+    Expected Outcome:
+        - Without CHATBOT_PROFILING_TOKEN, profiling is refused with 403
+    """
+    assert client.post("/admin/profile?seconds=1", headers={"X-Admin-Token": "x"}).status_code == 403
@@ -0,0 +1,99 @@
+from src.semantic_cache import HashingEmbedder, SemanticCache, SemanticCacheSettings
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_embedder_is_deterministic_and_normalized() -> None:
+    """Test the hashing embedder.
+
+    Expected Outcome:
+        - Case and punctuation do not change the embedding
+        - Embeddings are unit length; unrelated questions are dissimilar
+    """
+    embedder = HashingEmbedder()
+    a = embedder.embed("find documents similar to machine learning")
+    assert abs(float(a @ a) - 1.0) < 1e-6
+    assert float(a @ embedder.embed("Find documents similar to machine learning?")) > 0.999
+    assert float(a @ embedder.embed("search for cooking recipes")) < 0.5
+
+
+def test_cache_matches_paraphrases_of_the_same_intent() -> None:
+    """Test lookups by similarity threshold and intent.
+
+    Expected Outcome:
+        - A close paraphrase hits the cached value
+        - A different question, or the same question with another intent, misses
+    """
+    cache = SemanticCache()
+    cache.put("find documents similar to machine learning", "semantic_search", "answer")
+
+    assert cache.get("please find documents similar to machine learning", "semantic_search") == "answer"
+    assert cache.get("find documents similar to deep learning", "semantic_search") is None
+    assert cache.get("find documents similar to machine learning", "structured_data") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_matches_reworded_questions() -> None:
+    """Test a paraphrase that shares few literal words with the cached question.
+
+    Expected Outcome:
+        - Synonyms and plurals are folded, so the reworded question hits
+        - The same rewording about another numbered entity misses
+    """
+    cache = SemanticCache()
+    cache.put("find similar articles", "semantic_search", "articles")
+    cache.put("show the orders of customer 42", "structured_data", "orders-42")
+
+    assert cache.get("search for related articles", "semantic_search") == "articles"
+    assert cache.get("list all orders for customer 42", "structured_data") == "orders-42"
+    assert cache.get("list all orders for customer 43", "structured_data") is None
+
+
+def test_cache_misses_questions_about_other_entities() -> None:
+    """Test near-duplicate questions that differ only in an entity.
+
+    Expected Outcome:
+        - Swapping or adding a name misses, however similar the rest of the question
+        - Word order alone is not enough to reuse an answer either
+    """
+    cache = SemanticCache()
+    question = "show the shortest path and the relationship between John and Jane in the social graph"
+    cache.put(question, "graph_relationships", "john-jane")
+
+    assert cache.get(question.upper() + "?", "graph_relationships") == "john-jane"
+    assert cache.get(question.replace("Jane", "Bob"), "graph_relationships") is None
+    assert cache.get(question.replace("Jane", "Jane and Bob"), "graph_relationships") is None
+    assert cache.get(question.replace("John and Jane", "Jane and John"), "graph_relationships") is None
+
+
+def test_cache_expires_and_evicts_entries() -> None:
+    """Test TTL expiry and size-bounded eviction.
+
+    Expected Outcome:
+        - Entries stop matching once their TTL has passed
+        - When full, the least recently used entry is evicted
+    """
+    clock = FakeClock()
+    cache = SemanticCache(SemanticCacheSettings(ttl=10, max_entries=2), clock=clock)
+    cache.put("who knows john", "graph_relationships", 1)
+    clock.now = 11
+    assert cache.get("who knows john", "graph_relationships") is None
+    assert len(cache) == 0
+
+    cache.put("who knows john", "graph_relationships", 1)
+    clock.now = 12
+    cache.put("who knows mary", "graph_relationships", 2)
+    clock.now = 13
+    cache.get("who knows john", "graph_relationships")
+    cache.put("who knows alice", "graph_relationships", 3)
+
+    assert cache.evictions == 1
+    assert cache.get("who knows mary", "graph_relationships") is None
+    assert cache.get("who knows john", "graph_relationships") == 1
+    assert cache.get("who knows alice", "graph_relationships") == 3
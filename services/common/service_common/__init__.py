@@ -0,0 +1 @@
+"""Code shared by the chatbot, MCP and database mock services."""
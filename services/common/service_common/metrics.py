@@ -0,0 +1,313 @@
+"""Prometheus-style metrics with lock-free recording on the hot path.
+
+``instrument(app)`` adds a ``GET /metrics`` endpoint in the Prometheus text format
+and an ASGI middleware recording a latency histogram and an in-flight gauge per
+route; ``stage(name)`` returns the histogram of one step inside a hot path::
+
+    PARSE = stage("parse")
+
+    with PARSE.time():
+        plan = parse(query)
+
+Histogram buckets are preallocated, and every thread records into its own shard of
+plain counters, so an observation is a bisect and two list updates with no lock.
+Shards are summed only when /metrics is scraped. Metrics are per process: with
+several workers, a scrape reports the worker that answered it.
+
+Startup is measured too: ``process_start_time_seconds`` and
+``process_time_to_ready_seconds``, the time from process start to the first 200
+answered on ``/health``, which is what a readiness probe waits for.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+
+# Upper bounds in seconds, from sub-millisecond cache hits to multi-second backend calls
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Timer:
+    """Context manager observing its elapsed time into a histogram on exit."""
+
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: "Histogram"):
+        self._histogram = histogram
+
+    def __enter__(self) -> "Timer":
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(perf_counter() - self._start)
+
+
+class Histogram:
+    """Fixed-bucket histogram with one preallocated counter shard per recording thread.
+
+    A shard holds one count per bucket (the last one is +Inf) followed by the sum.
+    Only its own thread writes to a shard, so no increment can be lost.
+    """
+
+    __slots__ = ("bounds", "_shards", "_local")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(bounds))
+        self._shards: List[List[float]] = []
+        self._local = threading.local()
+
+    def _new_shard(self) -> List[float]:
+        shard = [0] * (len(self.bounds) + 1) + [0.0]
+        self._local.shard = shard
+        # list.append is atomic, so threads registering shards concurrently need no lock
+        self._shards.append(shard)
+        return shard
+
+    def observe(self, value: float) -> None:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[bisect_left(self.bounds, value)] += 1
+        shard[-1] += value
+
+    def time(self) -> Timer:
+        """Time a ``with`` block."""
+        return Timer(self)
+
+    def collect(self) -> Tuple[List[int], float]:
+        """Bucket counts (not cumulative, +Inf last) and sum over all shards."""
+        counts = [0] * (len(self.bounds) + 1)
+        total = 0.0
+        for shard in list(self._shards):
+            for index in range(len(counts)):
+                counts[index] += shard[index]
+            total += shard[-1]
+        return counts, total
+
+
+class Gauge:
+    """A value that goes up and down; updated from the event loop thread only."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Family:
+    """A named metric with one child per combination of label values.
+
+    Children are created on first use and never removed. Callers on a hot path should
+    resolve their child once, at import, rather than per call.
+    """
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Sequence[str],
+                 factory: Callable[[], object]):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            # setdefault is atomic: concurrent first uses agree on one child
+            child = self._children.setdefault(key, self._factory())
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        return sorted(self._children.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Iterable[str], values: Iterable[str]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """The metric families of one process, rendered together for /metrics."""
+
+    def __init__(self) -> None:
+        self._families: Dict[str, Family] = {}
+
+    def _register(self, family: Family) -> Family:
+        existing = self._families.get(family.name)
+        if existing is not None:
+            if existing.kind != family.kind or existing.labelnames != family.labelnames:
+                raise ValueError(f"Metric {family.name} is already registered differently")
+            return existing
+        self._families[family.name] = family
+        return family
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Family:
+        return self._register(Family(name, documentation, "histogram", labelnames, lambda: Histogram(buckets)))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Family:
+        return self._register(Family(name, documentation, "gauge", labelnames, Gauge))
+
+    def render(self) -> str:
+        """All families in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for family in self._families.values():
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, child in family.children():
+                labels = _label_text(family.labelnames, values)
+                if family.kind == "gauge":
+                    lines.append(f"{family.name}{{{labels}}} {_number(child.value)}" if labels
+                                 else f"{family.name} {_number(child.value)}")
+                    continue
+                counts, total = child.collect()
+                prefix = labels + "," if labels else ""
+                cumulative = 0
+                for bound, count in zip(child.bounds + (float("inf"),), counts):
+                    cumulative += count
+                    lines.append(f'{family.name}_bucket{{{prefix}le="{_number(bound)}"}} {cumulative}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{family.name}_sum{suffix} {_number(total)}")
+                lines.append(f"{family.name}_count{suffix} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def process_start_time() -> float:
+    """Unix time at which this process started.
+
+    Read from /proc where available; elsewhere this falls back to the time of the
+    call, which misses the interpreter's own startup.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # starttime is the 22nd field; split after the command name, which may hold spaces
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return time.time()
+    return time.time() - uptime + start_ticks / os.sysconf("SC_CLK_TCK")
+
+
+PROCESS_STARTED_AT = process_start_time()
+
+REGISTRY = Registry()
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time to serve an HTTP request, including any streamed body.",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ("method", "route"),
+)
+STAGE_DURATION = REGISTRY.histogram(
+    "stage_duration_seconds", "Time spent in one step of a request's hot path.", ("stage",),
+)
+PROCESS_START_TIME = REGISTRY.gauge(
+    "process_start_time_seconds", "Start time of the process since the Unix epoch in seconds.",
+)
+TIME_TO_READY = REGISTRY.gauge(
+    "process_time_to_ready_seconds", "Seconds from process start to the first successful /health response.",
+)
+
+
+def stage(name: str) -> Histogram:
+    """Histogram of one hot-path stage, e.g. ``parse`` or ``serialize``."""
+    return STAGE_DURATION.labels(name)
+
+
+# Label for requests that match no route, so unknown paths cannot grow the label set
+UNMATCHED_ROUTE = "unmatched"
+# The route whose first 200 marks the service as ready
+READY_ROUTE = "/health"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request under its route's path template."""
+
+    def __init__(self, app, routes: Sequence, registry: Registry = REGISTRY):
+        self.app = app
+        self.routes = routes
+        self.duration = registry.histogram(REQUEST_DURATION.name, REQUEST_DURATION.documentation,
+                                           REQUEST_DURATION.labelnames)
+        self.in_flight = registry.gauge(REQUESTS_IN_FLIGHT.name, REQUESTS_IN_FLIGHT.documentation,
+                                        REQUESTS_IN_FLIGHT.labelnames)
+        registry.gauge(PROCESS_START_TIME.name, PROCESS_START_TIME.documentation).labels().set(PROCESS_STARTED_AT)
+        self.time_to_ready = registry.gauge(TIME_TO_READY.name, TIME_TO_READY.documentation)
+        self.ready = False
+
+    def route_template(self, scope) -> str:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", UNMATCHED_ROUTE)
+        return UNMATCHED_ROUTE
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        route = self.route_template(scope)
+        in_flight = self.in_flight.labels(method, route)
+        status: Optional[int] = None
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            # No response started means the app raised: the server answers 500
+            self.duration.labels(method, route, status or 500).observe(perf_counter() - start)
+            if not self.ready and status == 200 and route == READY_ROUTE:
+                self.ready = True
+                self.time_to_ready.labels().set(time.time() - PROCESS_STARTED_AT)
+
+
+def instrument(app, registry: Registry = REGISTRY) -> None:
+    """Serve ``GET /metrics`` from ``app`` and time all of its HTTP requests."""
+
+    async def metrics(request: Request) -> Response:
+        return Response(registry.render(), media_type=CONTENT_TYPE)
+
+    app.add_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+    app.add_middleware(MetricsMiddleware, routes=app.router.routes, registry=registry)
@@ -0,0 +1,290 @@
+"""On-demand sampling profiler for a running service.
+
+``enable_profiling(app, settings)`` adds two admin endpoints:
+
+- ``POST /admin/profile?seconds=10`` samples every thread's stack for that long and
+  returns the samples in collapsed-stack format, one ``frame;frame;frame count`` line
+  per distinct stack. flamegraph.pl, inferno and speedscope all read this format.
+- ``GET /admin/profile/{id}`` returns the profile of one request that was sent with
+  an ``X-Profile: 1`` header; the response names it in ``X-Profile-Id``.
+
+Stacks are sampled by a signal handler driven by an interval timer, not by
+``sys.setprofile``, so code runs at full speed between samples. ``mode=cpu`` (the
+default) ticks on process CPU time; ``mode=wall`` also samples while the service
+waits. Per-request profiles only keep event-loop samples taken while that request's
+task was running; work it hands to a thread pool is not attributed to it.
+
+Both endpoints and the header need ``X-Admin-Token`` to match ``<PREFIX>_PROFILING_TOKEN``.
+Without that setting, profiling is disabled. One profile runs at a time. The service's
+other admin endpoints take the same token through the ``profiler.require_admin``
+dependency.
+"""
+import asyncio
+import hmac
+import os
+import signal
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import FastAPI, Header, HTTPException, Path, Query, Request
+from fastapi.responses import PlainTextResponse
+
+TIMERS = {
+    "cpu": (signal.SIGPROF, signal.ITIMER_PROF),
+    "wall": (signal.SIGALRM, signal.ITIMER_REAL),
+}
+MAX_STACK_DEPTH = 128
+CONTENT_TYPE = "text/plain; charset=utf-8"
+
+
+class ProfilerUnavailable(Exception):
+    """Raised when a profile cannot start: one is already running, or no main-thread event loop."""
+
+
+# Marks the task of the request being profiled on its own
+_profiled_request: ContextVar[Optional[object]] = ContextVar("profiled_request", default=None)
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+
+def collapse(frame) -> Tuple[str, ...]:
+    """Function labels from the outermost frame to ``frame``."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+class StackSampler:
+    """Counts the stacks seen by a periodic timer signal.
+
+    The handler always runs on the main thread, so the counters need no lock. With
+    ``request`` set, only main-thread samples taken inside that request's task count.
+    """
+
+    def __init__(self, interval: float = 0.005, mode: str = "cpu",
+                 request: Optional[object] = None):
+        if mode not in TIMERS:
+            raise ValueError(f"Unknown profiling mode {mode!r}; expected cpu or wall")
+        self.interval = interval
+        self.mode = mode
+        self.request = request
+        self.samples = 0
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        self._counts: Dict[Tuple[int, Tuple[str, ...]], int] = {}
+        self._previous_handler = None
+
+    def _record(self, thread_id: int, frame) -> None:
+        key = (thread_id, collapse(frame))
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+    def _handle(self, signum, frame) -> None:
+        self.samples += 1
+        main_id = threading.main_thread().ident
+        if self.request is not None:
+            if _profiled_request.get() is self.request and frame is not None:
+                self._record(main_id, frame)
+            return
+        for thread_id, thread_frame in sys._current_frames().items():
+            # The main thread's own entry is this handler; the interrupted frame is passed in
+            self._record(thread_id, frame if thread_id == main_id else thread_frame)
+
+    def start(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            raise ProfilerUnavailable("Profiling needs the service's event loop on the main thread")
+        signum, timer = TIMERS[self.mode]
+        self._previous_handler = signal.signal(signum, self._handle)
+        signal.setitimer(timer, self.interval, self.interval)
+        self.started_at = time.perf_counter()
+
+    def stop(self) -> None:
+        signum, timer = TIMERS[self.mode]
+        signal.setitimer(timer, 0)
+        signal.signal(signum, self._previous_handler)
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def collapsed(self) -> str:
+        """Samples as collapsed stacks, each rooted at its thread's name."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        lines: Dict[str, int] = {}
+        for (thread_id, stack), count in self._counts.items():
+            line = ";".join((names.get(thread_id, f"thread-{thread_id}"),) + stack)
+            lines[line] = lines.get(line, 0) + count
+        ranked = sorted(lines.items(), key=lambda item: -item[1])
+        return "".join(f"{line} {count}\n" for line, count in ranked)
+
+
+@dataclass(frozen=True)
+class ProfilingSettings:
+    service: str
+    token: str = ""
+    max_seconds: float = 60.0
+    max_request_profiles: int = 32
+
+    @classmethod
+    def from_env(cls, prefix: str, service: str) -> "ProfilingSettings":
+        """Settings from ``<prefix>_PROFILING_TOKEN`` and ``<prefix>_PROFILING_MAX_SECONDS``."""
+        return cls(
+            service=service,
+            token=os.getenv(f"{prefix}_PROFILING_TOKEN", ""),
+            max_seconds=float(os.getenv(f"{prefix}_PROFILING_MAX_SECONDS", str(cls.max_seconds))),
+        )
+
+
+class Profiler:
+    """Runs at most one sampler at a time and keeps the latest per-request profiles."""
+
+    def __init__(self, settings: ProfilingSettings):
+        self.settings = settings
+        self.active: Optional[StackSampler] = None
+        self.request_profiles: "OrderedDict[str, str]" = OrderedDict()
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return bool(self.settings.token) and token is not None and hmac.compare_digest(
+            token.encode(), self.settings.token.encode()
+        )
+
+    def check(self, token: Optional[str]) -> None:
+        if not self.settings.token:
+            raise HTTPException(status_code=403,
+                                detail="Admin endpoints are disabled; no admin token is configured")
+        if not self.authorized(token):
+            raise HTTPException(status_code=403, detail="Invalid or missing X-Admin-Token")
+
+    def require_admin(self, x_admin_token: Optional[str] = Header(default=None)) -> None:
+        """FastAPI dependency that guards an admin endpoint with the profiling token."""
+        self.check(x_admin_token)
+
+    def begin(self, sampler: StackSampler) -> None:
+        if self.active is not None:
+            raise ProfilerUnavailable("Another profile is running")
+        sampler.start()
+        self.active = sampler
+
+    def end(self, sampler: StackSampler) -> None:
+        sampler.stop()
+        self.active = None
+
+    def keep(self, profile_id: str, profile: str) -> None:
+        self.request_profiles[profile_id] = profile
+        while len(self.request_profiles) > self.settings.max_request_profiles:
+            self.request_profiles.popitem(last=False)
+
+
+class ProfileRequestMiddleware:
+    """ASGI middleware profiling requests sent with ``X-Profile: 1`` and a valid admin token."""
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if not any(key == b"x-profile" for key, _ in scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if headers[b"x-profile"] not in (b"1", b"true"):
+            await self.app(scope, receive, send)
+            return
+        token = headers.get(b"x-admin-token", b"").decode("latin-1")
+        mode = headers.get(b"x-profile-mode", b"cpu").decode("latin-1")
+        if not self.profiler.authorized(token) or mode not in TIMERS:
+            await self.app(scope, receive, send)
+            return
+
+        marker = object()
+        sampler = StackSampler(interval=0.001, mode=mode, request=marker)
+        profile_id = uuid.uuid4().hex
+        try:
+            self.profiler.begin(sampler)
+        except ProfilerUnavailable as e:
+            profile_header = (b"x-profile-status", str(e).encode())
+            sampler = None
+        else:
+            profile_header = (b"x-profile-id", profile_id.encode())
+
+        async def send_with_profile(message) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), profile_header]}
+            await send(message)
+
+        if sampler is None:
+            await self.app(scope, receive, send_with_profile)
+            return
+        context_token = _profiled_request.set(marker)
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _profiled_request.reset(context_token)
+            self.profiler.end(sampler)
+            self.profiler.keep(profile_id, sampler.collapsed())
+
+
+def enable_profiling(app: FastAPI, settings: ProfilingSettings) -> Profiler:
+    """Add the profiling endpoints and per-request profile mode to ``app``."""
+    profiler = Profiler(settings)
+
+    def profile_response(profile: str, name: str, **headers: str) -> PlainTextResponse:
+        return PlainTextResponse(profile, media_type=CONTENT_TYPE, headers={
+            "Content-Disposition":
+                f'attachment; filename="{profiler.settings.service}-{name}.collapsed"',
+            **headers,
+        })
+
+    async def run_profile(
+        request: Request,
+        seconds: float = Query(default=10.0, gt=0, description="How long to sample"),
+        interval: float = Query(default=0.005, ge=0.001, le=1.0,
+                                description="Seconds between samples"),
+        mode: str = Query(default="cpu", pattern="^(cpu|wall)$",
+                          description="cpu or wall clock timer"),
+    ) -> PlainTextResponse:
+        """Sample every thread's stack for ``seconds`` and return collapsed stacks."""
+        profiler.check(request.headers.get("x-admin-token"))
+        if seconds > profiler.settings.max_seconds:
+            raise HTTPException(status_code=422,
+                                detail=f"seconds must be at most {profiler.settings.max_seconds:g}")
+        sampler = StackSampler(interval=interval, mode=mode)
+        try:
+            profiler.begin(sampler)
+        except ProfilerUnavailable as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        try:
+            # The event loop keeps serving requests meanwhile, and those are what gets sampled
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.end(sampler)
+        return profile_response(sampler.collapsed(), time.strftime("%Y%m%dT%H%M%S"),
+                                **{"X-Profile-Samples": str(sampler.samples)})
+
+    async def get_request_profile(request: Request,
+                                  profile_id: str = Path(...)) -> PlainTextResponse:
+        """Collapsed stacks of one request sent with ``X-Profile: 1``."""
+        profiler.check(request.headers.get("x-admin-token"))
+        profile = profiler.request_profiles.get(profile_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return profile_response(profile, profile_id)
+
+    app.add_api_route("/admin/profile", run_profile, methods=["POST"],
+                      response_class=PlainTextResponse)
+    app.add_api_route("/admin/profile/{profile_id}", get_request_profile, methods=["GET"],
+                      response_class=PlainTextResponse)
+    app.add_middleware(ProfileRequestMiddleware, profiler=profiler)
+    return profiler
+
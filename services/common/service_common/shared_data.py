@@ -0,0 +1,93 @@
+"""Read-mostly data shared by all worker processes through memory-mapped files.
+
+Used by the weaviate and relational mocks; install ``service-common[shared-data]``
+for its NumPy dependency.
+
+The serving process that owns the data publishes it once into a directory
+(``/dev/shm`` when available, so nothing touches disk)::
+
+    meta.json      JSON metadata (small, decoded by every worker)
+    <name>.npy     one array per name, memory-mapped read-only by every worker
+
+Bulky records such as documents or rows belong in the arrays, not in meta.json:
+``pack_records`` encodes them as one byte blob plus an offset array, and
+``PackedRecords`` over the mapped pair decodes a record only when it is read.
+
+Workers attach with ``np.load(mmap_mode="r")``: the pages live once in the page
+cache and are mapped into each worker, so adding workers does not multiply the
+memory used by the arrays.
+"""
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Sequence, Tuple, Union, overload
+
+import numpy as np
+
+META_FILE = "meta.json"
+
+
+def default_shared_root() -> str:
+    """``/dev/shm`` when the platform has it, otherwise the temp directory."""
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def publish(directory: os.PathLike, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> None:
+    """Write ``arrays`` and ``meta`` to ``directory``.
+
+    Files are written to a sibling staging directory that is renamed into place,
+    so a worker never attaches to a half-written set.
+    """
+    target = Path(directory)
+    staging = Path(tempfile.mkdtemp(prefix=f".{target.name}-", dir=target.parent))
+    for name, array in arrays.items():
+        np.save(staging / f"{name}.npy", np.ascontiguousarray(array))
+    (staging / META_FILE).write_text(json.dumps(meta, separators=(",", ":")))
+    if target.exists():
+        shutil.rmtree(target)
+    os.replace(staging, target)
+
+
+def attach(directory: os.PathLike) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Map every array published in ``directory`` read-only and decode its metadata."""
+    source = Path(directory)
+    meta = json.loads((source / META_FILE).read_text())
+    arrays = {path.stem: np.load(path, mmap_mode="r") for path in sorted(source.glob("*.npy"))}
+    return arrays, meta
+
+
+def pack_records(records: Iterable[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """JSON-encode ``records`` into one ``uint8`` blob and the ``int64`` offsets bounding each."""
+    encoded = [json.dumps(record, separators=(",", ":")).encode() for record in records]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class PackedRecords(Sequence[Any]):
+    """Read-only sequence over records written by ``pack_records``, decoded per access."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[Any]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        start, stop = int(self._offsets[index]), int(self._offsets[index + 1])
+        return json.loads(self._blob[start:stop].tobytes())
@@ -0,0 +1,429 @@
+"""Distributed tracing with W3C ``traceparent`` propagation.
+
+``trace_requests(app, tracer)`` continues the trace of each incoming request (or
+starts one) in a server span. ``tracer.span(name)`` opens a child span of whatever
+span is current in the task or thread, and ``inject(headers)`` adds the current
+``traceparent`` to an outgoing request.
+
+Sampling is decided once, where a trace starts, from the trace id and
+``<PREFIX>_SAMPLE_RATIO``. Downstream services follow the decision carried in the
+``traceparent`` flags, so a trace is either complete or absent. Unsampled requests
+allocate no spans. Finished spans are queued without a lock and written in batches
+by a background thread to a JSONL file (``<PREFIX>_EXPORTER=jsonl``) or an
+OpenTelemetry collector over OTLP/HTTP JSON (``<PREFIX>_EXPORTER=otlp``). When the
+queue is full, spans are dropped instead of slowing requests down. With the
+exporter set to ``none`` (the default), incoming trace context is still passed on
+unchanged, so the services around this one can trace through it.
+"""
+import atexit
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, MutableMapping, Optional, Sequence
+
+from starlette.routing import Match
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+INVALID_TRACE_ID = "0" * 32
+INVALID_SPAN_ID = "0" * 16
+
+# OTLP span kinds
+KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+    @classmethod
+    def parse(cls, header: Optional[str]) -> Optional["SpanContext"]:
+        """Context from a version 00 ``traceparent`` header, or None if it is absent or invalid."""
+        match = TRACEPARENT.match(header.strip().lower()) if header else None
+        if match is None:
+            return None
+        trace_id, span_id, flags = match.groups()
+        if trace_id == INVALID_TRACE_ID or span_id == INVALID_SPAN_ID:
+            return None
+        return cls(trace_id, span_id, bool(int(flags, 16) & 1))
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+_current: ContextVar[Optional[SpanContext]] = ContextVar("trace_context", default=None)
+
+
+def current_context() -> Optional[SpanContext]:
+    return _current.get()
+
+
+def inject(headers: MutableMapping[str, str]) -> MutableMapping[str, str]:
+    """Add the current ``traceparent`` to ``headers``, if a trace is active."""
+    context = _current.get()
+    if context is not None:
+        headers["traceparent"] = context.traceparent
+    return headers
+
+
+def new_trace_id() -> str:
+    return f"{random.getrandbits(128) or 1:032x}"
+
+
+def new_span_id() -> str:
+    return f"{random.getrandbits(64) or 1:016x}"
+
+
+class Span:
+    """One timed operation of a sampled trace; the current span while its ``with`` block runs."""
+
+    __slots__ = ("name", "kind", "context", "parent_id", "attributes", "start_ns", "end_ns",
+                 "error", "_exporter", "_token")
+
+    def __init__(self, name: str, kind: str, context: SpanContext, parent_id: Optional[str],
+                 exporter: "SpanExporter", attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.kind = kind
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes = attributes or {}
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self._exporter = exporter
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def fail(self, message: str) -> None:
+        """Mark the span as failed without an exception passing through it."""
+        self.error = message
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current.set(self.context)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        _current.reset(self._token)
+        if exc is not None and self.error is None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self._exporter.export(self)
+
+    def to_dict(self, service: str) -> Dict[str, Any]:
+        return {
+            "service": service,
+            "name": self.name,
+            "kind": self.kind,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class NoopSpan:
+    """Stand-in for spans of unsampled requests: records nothing."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def fail(self, message: str) -> None:
+        pass
+
+    def __enter__(self) -> "NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class SpanExporter:
+    """Receives every finished sampled span."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class BatchExporter(SpanExporter):
+    """Queues spans and hands them to ``write`` in batches from a background thread."""
+
+    def __init__(self, service: str, max_queue: int = 10_000, batch_size: int = 512, interval: float = 1.0):
+        self.service = service
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self.failed = 0
+        self._queue: deque = deque()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"{service}-trace-export", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def export(self, span: Span) -> None:
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        # deque.append is atomic, so request threads never wait for the exporter
+        self._queue.append(span)
+
+    def flush(self) -> None:
+        """Write every queued span now."""
+        while self._queue:
+            batch: List[Span] = []
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.popleft())
+            except IndexError:
+                # Drained, possibly by a concurrent flush
+                pass
+            if not batch:
+                break
+            try:
+                self.write(batch)
+            except Exception:  # noqa: BLE001 - exporters are pluggable, any failure is theirs
+                # Tracing must never take the service down; count the loss and go on
+                self.failed += len(batch)
+
+    def write(self, spans: Sequence[Span]) -> None:
+        raise NotImplementedError
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self.flush()
+
+
+class JsonlExporter(BatchExporter):
+    """Appends one JSON object per span to a file, shared safely by several worker processes."""
+
+    def __init__(self, service: str, path: str, **options: Any):
+        self.path = path
+        super().__init__(service, **options)
+
+    def write(self, spans: Sequence[Span]) -> None:
+        data = "".join(json.dumps(span.to_dict(self.service), default=str) + "\n" for span in spans).encode()
+        # One O_APPEND write per batch keeps lines from different processes whole
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class OtlpHttpExporter(BatchExporter):
+    """Posts spans to an OpenTelemetry collector's OTLP/HTTP JSON endpoint."""
+
+    def __init__(self, service: str, endpoint: str, timeout: float = 2.0, **options: Any):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        super().__init__(service, **options)
+
+    def encode(self, spans: Sequence[Span]) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": self.service})},
+            "scopeSpans": [{
+                "scope": {"name": "tri-database-chatbot"},
+                "spans": [
+                    {
+                        "traceId": span.context.trace_id,
+                        "spanId": span.context.span_id,
+                        **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                        "name": span.name,
+                        "kind": KINDS[span.kind],
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": _otlp_attributes(span.attributes),
+                        "status": {"code": 2, "message": span.error} if span.error else {},
+                    }
+                    for span in spans
+                ],
+            }],
+        }]}
+
+    def write(self, spans: Sequence[Span]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self.encode(spans), default=str).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+@dataclass(frozen=True)
+class TraceSettings:
+    service: str
+    exporter: str = "none"
+    sample_ratio: float = 0.1
+    path: str = ""
+    endpoint: str = "http://localhost:4318/v1/traces"
+    max_queue: int = 10_000
+
+    @classmethod
+    def from_env(cls, prefix: str, service: str) -> "TraceSettings":
+        """Settings from ``<prefix>_EXPORTER`` (none, jsonl or otlp), ``_SAMPLE_RATIO``,
+        ``_FILE``, ``_ENDPOINT`` and ``_MAX_QUEUE``."""
+        return cls(
+            service=service,
+            exporter=os.getenv(f"{prefix}_EXPORTER", cls.exporter).lower(),
+            sample_ratio=min(1.0, max(0.0, float(os.getenv(f"{prefix}_SAMPLE_RATIO", str(cls.sample_ratio))))),
+            path=os.getenv(f"{prefix}_FILE", f"/tmp/{service}-spans.jsonl"),
+            endpoint=os.getenv(f"{prefix}_ENDPOINT", cls.endpoint),
+            max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", str(cls.max_queue))),
+        )
+
+    def build_exporter(self) -> Optional[SpanExporter]:
+        if self.exporter == "jsonl":
+            return JsonlExporter(self.service, self.path, max_queue=self.max_queue)
+        if self.exporter == "otlp":
+            return OtlpHttpExporter(self.service, self.endpoint, max_queue=self.max_queue)
+        if self.exporter != "none":
+            raise ValueError(f"Unknown trace exporter {self.exporter!r}; expected none, jsonl or otlp")
+        return None
+
+
+class Tracer:
+    """Creates the spans of one service and decides which new traces are sampled."""
+
+    def __init__(self, settings: TraceSettings, exporter: Optional[SpanExporter] = None):
+        self.settings = settings
+        self.exporter = exporter if exporter is not None else settings.build_exporter()
+        # Trace ids whose low 64 bits fall below this bound are sampled
+        self._bound = int(settings.sample_ratio * (1 << 64))
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def should_sample(self, trace_id: str) -> bool:
+        return int(trace_id[16:], 16) < self._bound
+
+    def span(self, name: str, kind: str = "internal", **attributes: Any):
+        """Child span of the current span, or a no-op when the trace is not sampled."""
+        parent = _current.get()
+        if parent is None or not parent.sampled or self.exporter is None:
+            return NOOP_SPAN
+        return Span(name, kind, SpanContext(parent.trace_id, new_span_id(), True), parent.span_id,
+                    self.exporter, attributes)
+
+    def server_span(self, name: str, traceparent: Optional[str], **attributes: Any):
+        """Span continuing the caller's trace, or the root of a new one.
+
+        Unsampled requests get no span; their context is made current so that the
+        decision still travels downstream.
+        """
+        incoming = SpanContext.parse(traceparent)
+        if self.exporter is None:
+            return _Propagate(incoming) if incoming is not None else NOOP_SPAN
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming.trace_id, incoming.span_id, incoming.sampled
+        else:
+            trace_id, parent_id = new_trace_id(), None
+            sampled = self.should_sample(trace_id)
+        context = SpanContext(trace_id, new_span_id(), sampled)
+        if not sampled:
+            return _Propagate(context)
+        return Span(name, "server", context, parent_id, self.exporter, attributes)
+
+
+class _Propagate(NoopSpan):
+    """Makes a context current without recording a span."""
+
+    __slots__ = ("context", "_token")
+
+    def __init__(self, context: SpanContext):
+        self.context = context
+
+    def __enter__(self) -> "_Propagate":
+        self._token = _current.set(self.context)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _current.reset(self._token)
+
+
+class TracingMiddleware:
+    """ASGI middleware running every HTTP request inside a server span."""
+
+    def __init__(self, app, routes: Sequence, tracer: Tracer):
+        self.app = app
+        self.routes = routes
+        self.tracer = tracer
+
+    def route_template(self, scope) -> str:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", scope["path"])
+        return scope["path"]
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        span = self.tracer.server_span(scope["method"], traceparent)
+        if isinstance(span, Span):
+            route = self.route_template(scope)
+            span.name = f"{scope['method']} {route}"
+            span.attributes.update({"http.method": scope["method"], "http.route": route})
+
+        async def send_with_status(message) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.fail(f"HTTP {message['status']}")
+            await send(message)
+
+        with span:
+            await self.app(scope, receive, send_with_status)
+
+
+def trace_requests(app, tracer: Tracer) -> None:
+    """Trace every HTTP request served by ``app``."""
+    app.add_middleware(TracingMiddleware, routes=app.router.routes, tracer=tracer)
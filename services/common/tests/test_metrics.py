@@ -0,0 +1,142 @@
+import threading
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from service_common.metrics import PROCESS_STARTED_AT, Histogram, Registry, instrument, process_start_time
+
+
+def test_histogram_buckets_and_sum() -> None:
+    """Test that observations land in the first bucket whose bound covers them.
+
+    Expected Outcome:
+        - Values equal to a bound count in that bucket; values above all bounds in +Inf
+        - The sum adds up every observation
+    """
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    counts, total = histogram.collect()
+    assert counts == [2, 1, 1]
+    assert total == pytest.approx(3.65)
+
+
+def test_histogram_loses_no_observations_across_threads() -> None:
+    """Test lock-free recording from many threads at once.
+
+    Expected Outcome:
+        - Every thread records into its own shard, so the total count is exact
+    """
+    histogram = Histogram()
+
+    def record() -> None:
+        for _ in range(10_000):
+            histogram.observe(0.001)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(histogram.collect()[0]) == 80_000
+
+
+def test_registry_renders_prometheus_text() -> None:
+    """Test the text exposition format.
+
+    Expected Outcome:
+        - Buckets are cumulative and end with +Inf, followed by _sum and _count
+        - Gauges render their current value; label values are escaped
+    """
+    registry = Registry()
+    stages = registry.histogram("stage_seconds", "Stage time.", ("stage",), buckets=(0.5,))
+    with stages.labels("parse").time():
+        pass
+    stages.labels("parse").observe(2.0)
+    registry.gauge("queue", "Queued items.", ("name",)).labels('a"b').set(3)
+
+    text = registry.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="parse",le="0.5"} 1' in text
+    assert 'stage_seconds_bucket{stage="parse",le="+Inf"} 2' in text
+    assert 'stage_seconds_count{stage="parse"} 2' in text
+    assert 'queue{name="a\\"b"} 3' in text
+
+
+def test_registry_rejects_conflicting_definitions() -> None:
+    """Test that a metric name keeps one type and label set.
+
+    Expected Outcome:
+        - Re-registering the same definition returns the existing family
+        - A different definition under the same name raises ValueError
+    """
+    registry = Registry()
+    family = registry.histogram("latency", "Latency.", ("route",))
+    assert registry.histogram("latency", "Latency.", ("route",)) is family
+    with pytest.raises(ValueError):
+        registry.gauge("latency", "Latency.", ("route",))
+    with pytest.raises(ValueError):
+        family.labels("a", "b")
+
+
+def test_instrumented_app_reports_route_templates() -> None:
+    """Test the middleware and /metrics endpoint on a bare app.
+
+    Expected Outcome:
+        - Requests are labelled with the route's path template and status
+        - Unknown paths share one label; nothing is left in flight afterwards
+    """
+    app = FastAPI()
+    registry = Registry()
+    instrument(app, registry)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int) -> dict:
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nowhere")
+    text = client.get("/metrics").text
+
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"} 2' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1' in text
+    assert 'http_requests_in_flight{method="GET",route="/items/{item_id}"} 0.0' in text
+
+
+def test_startup_gauges_report_time_to_first_healthy() -> None:
+    """Test process_start_time_seconds and process_time_to_ready_seconds.
+
+    Expected Outcome:
+        - The start time is in the past, and re-reading it gives the same value
+        - Time to ready is only set by the first 200 on /health and never moves after it
+    """
+    app = FastAPI()
+    registry = Registry()
+    instrument(app, registry)
+    healthy = False
+
+    @app.get("/health")
+    async def health() -> dict:
+        if not healthy:
+            raise HTTPException(status_code=503)
+        return {"status": "healthy"}
+
+    assert process_start_time() == pytest.approx(PROCESS_STARTED_AT, abs=0.05)
+    client = TestClient(app)
+    assert client.get("/health").status_code == 503
+    assert "\nprocess_time_to_ready_seconds " not in client.get("/metrics").text
+
+    healthy = True
+    client.get("/health")
+    first = client.get("/metrics").text
+    client.get("/health")
+    ready = [line for line in first.splitlines() if line.startswith("process_time_to_ready_seconds ")]
+
+    assert f"process_start_time_seconds {PROCESS_STARTED_AT!r}" in first
+    assert len(ready) == 1 and 0 < float(ready[0].split()[1]) < 600
+    assert ready[0] in client.get("/metrics").text
@@ -0,0 +1,106 @@
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from service_common.profiling import ProfilingSettings, StackSampler, enable_profiling
+
+TOKEN = {"X-Admin-Token": "secret"}
+
+
+def spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_collapses_main_thread_stacks() -> None:
+    """Test the signal-timer stack sampler.
+
+    Expected Outcome:
+        - A busy function shows up in collapsed stacks rooted at the thread name
+        - Every line ends with its sample count
+    """
+    sampler = StackSampler(interval=0.001, mode="cpu")
+    sampler.start()
+    try:
+        spin(0.2)
+    finally:
+        sampler.stop()
+
+    lines = sampler.collapsed().splitlines()
+    assert sampler.samples > 0
+    assert any(line.startswith("MainThread;") and "spin (tests/test_profiling.py" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_sampler_rejects_unknown_mode() -> None:
+    """Test mode validation.
+
+    Expected Outcome:
+        - Only cpu and wall timers are accepted
+    """
+    with pytest.raises(ValueError):
+        StackSampler(mode="gpu")
+
+
+def make_app(token: str = "secret") -> FastAPI:
+    app = FastAPI()
+    enable_profiling(app, ProfilingSettings("test", token=token, max_seconds=5))
+
+    @app.get("/busy")
+    async def busy() -> dict:
+        spin(0.2)
+        return {"ok": True}
+
+    return app
+
+
+async def test_profile_endpoint_requires_admin_token() -> None:
+    """Test access control of the profiling endpoints.
+
+    Expected Outcome:
+        - Without a configured token profiling is disabled (403)
+        - A wrong token is rejected; overlong runs are refused with 422
+    """
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(make_app(token="")), base_url="http://test") as client:
+        assert (await client.post("/admin/profile", headers=TOKEN)).status_code == 403
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(make_app()), base_url="http://test") as client:
+        assert (await client.post("/admin/profile", headers={"X-Admin-Token": "nope"})).status_code == 403
+        assert (await client.post("/admin/profile?seconds=10", headers=TOKEN)).status_code == 422
+
+
+async def test_profile_endpoint_returns_collapsed_stacks() -> None:
+    """Test a timed profile of the whole service.
+
+    Expected Outcome:
+        - The response is a collapsed-stack attachment including the sampled wait
+    """
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(make_app()), base_url="http://test") as client:
+        response = await client.post("/admin/profile?seconds=0.2&interval=0.001&mode=wall", headers=TOKEN)
+
+    assert response.status_code == 200
+    assert response.headers["content-disposition"].startswith('attachment; filename="test-')
+    assert int(response.headers["x-profile-samples"]) > 0
+    assert "MainThread;" in response.text
+
+
+async def test_request_profile_captures_one_request() -> None:
+    """Test the per-request profile mode.
+
+    Expected Outcome:
+        - A request sent with X-Profile gets an X-Profile-Id naming its profile
+        - The stored profile contains the request's own busy handler
+        - Requests without a valid token are served but not profiled
+    """
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(make_app()), base_url="http://test") as client:
+        response = await client.get("/busy", headers={"X-Profile": "1", **TOKEN})
+        profile = await client.get(f"/admin/profile/{response.headers['x-profile-id']}", headers=TOKEN)
+        unprofiled = await client.get("/busy", headers={"X-Profile": "1", "X-Admin-Token": "nope"})
+        missing = await client.get("/admin/profile/unknown", headers=TOKEN)
+
+    assert response.json() == {"ok": True}
+    assert "busy (tests/test_profiling.py" in profile.text
+    assert unprofiled.status_code == 200 and "x-profile-id" not in unprofiled.headers
+    assert missing.status_code == 404
@@ -0,0 +1,144 @@
+import json
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from service_common.tracing import (
+    JsonlExporter, Span, SpanContext, SpanExporter, TraceSettings, Tracer, inject, trace_requests,
+)
+
+PARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+class ListExporter(SpanExporter):
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+def test_traceparent_parsing() -> None:
+    """Test W3C traceparent parsing and formatting.
+
+    Expected Outcome:
+        - Valid headers round-trip; the sampled flag is read from bit 0
+        - Malformed headers and all-zero ids are rejected
+    """
+    context = SpanContext.parse(PARENT)
+    assert context == SpanContext("0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331", True)
+    assert context.traceparent == PARENT
+    assert SpanContext.parse(PARENT[:-2] + "00").sampled is False
+    for header in (None, "", "garbage", "01-" + PARENT[3:], "00-" + "0" * 32 + PARENT[35:]):
+        assert SpanContext.parse(header) is None
+
+
+def test_spans_nest_and_propagate() -> None:
+    """Test span parenting and header injection.
+
+    Expected Outcome:
+        - A child span shares the trace id and points at the server span
+        - Injected headers carry the innermost span; nothing is injected outside a trace
+    """
+    exporter = ListExporter()
+    tracer = Tracer(TraceSettings("test"), exporter)
+
+    with tracer.server_span("GET /", PARENT) as server:
+        with tracer.span("parse", rows=3) as child:
+            headers = inject({})
+    assert inject({}) == {}
+
+    assert [span.name for span in exporter.spans] == ["parse", "GET /"]
+    assert server.parent_id == "b7ad6b7169203331"
+    assert child.parent_id == server.context.span_id
+    assert child.context.trace_id == server.context.trace_id
+    assert child.attributes == {"rows": 3}
+    assert headers == {"traceparent": child.context.traceparent}
+
+
+def test_sampling_follows_parent_and_ratio() -> None:
+    """Test sampling decisions.
+
+    Expected Outcome:
+        - An unsampled parent produces no spans but still propagates its decision
+        - New traces are sampled in proportion to the configured ratio
+    """
+    exporter = ListExporter()
+    tracer = Tracer(TraceSettings("test", sample_ratio=0.25), exporter)
+
+    with tracer.server_span("GET /", PARENT[:-2] + "00"):
+        with tracer.span("parse"):
+            assert inject({})["traceparent"].endswith("-00")
+    assert exporter.spans == []
+
+    for _ in range(4000):
+        with tracer.server_span("GET /", None):
+            pass
+    assert 800 < len(exporter.spans) < 1200
+
+
+def test_disabled_tracer_passes_context_through() -> None:
+    """Test a service with no exporter configured.
+
+    Expected Outcome:
+        - The caller's traceparent is forwarded unchanged; no spans are created
+    """
+    tracer = Tracer(TraceSettings("test"))
+    assert not tracer.enabled
+    with tracer.server_span("GET /", PARENT):
+        with tracer.span("parse"):
+            assert inject({}) == {"traceparent": PARENT}
+
+
+def test_jsonl_exporter_writes_batches(tmp_path) -> None:
+    """Test the JSONL exporter.
+
+    Expected Outcome:
+        - Each span becomes one JSON line with its ids, timing and attributes
+        - A full queue drops spans instead of growing
+    """
+    path = tmp_path / "spans.jsonl"
+    exporter = JsonlExporter("test", str(path), max_queue=2, interval=60)
+    tracer = Tracer(TraceSettings("test"), exporter)
+    for _ in range(3):
+        with tracer.server_span("GET /", PARENT) as span:
+            span.set_attribute("http.status_code", 200)
+    exporter.flush()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 2 and exporter.dropped == 1
+    assert lines[0]["service"] == "test"
+    assert lines[0]["trace_id"] == "0af7651916cd43dd8448eb211c80319c"
+    assert lines[0]["end_time_unix_nano"] >= lines[0]["start_time_unix_nano"]
+    assert lines[0]["attributes"] == {"http.status_code": 200}
+    exporter.shutdown()
+
+
+def test_middleware_records_server_spans() -> None:
+    """Test request tracing on a bare app.
+
+    Expected Outcome:
+        - The server span is named after the route template and continues the caller's trace
+        - Server errors mark the span as failed
+    """
+    exporter = ListExporter()
+    app = FastAPI()
+    trace_requests(app, Tracer(TraceSettings("test"), exporter))
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int) -> dict:
+        if item_id == 0:
+            return JSONResponse(status_code=503, content={})
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/items/1", headers={"traceparent": PARENT})
+    client.get("/items/0", headers={"traceparent": PARENT})
+
+    ok, failed = exporter.spans
+    assert ok.name == "GET /items/{item_id}" and ok.kind == "server"
+    assert ok.context.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert ok.attributes["http.status_code"] == 200 and ok.error is None
+    assert failed.error == "HTTP 503"
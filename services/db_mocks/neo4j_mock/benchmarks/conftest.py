@@ -0,0 +1,30 @@
+"""Synthetic power-law graphs (see src/seeding.py) for the neo4j_mock micro-benchmarks.
+
+Run with ``pytest benchmarks`` (plain ``pytest`` only collects tests/). Graph sizes
+range from the three-node sample graph up to 10^6 nodes; set BENCHMARK_MAX_SIZE to
+stop earlier, e.g. ``BENCHMARK_MAX_SIZE=10000 pytest benchmarks``.
+"""
+import os
+
+import networkx as nx
+import pytest
+
+from src import main
+from src.seeding import GraphSeed, seed_graph
+
+MAX_SIZE = int(os.getenv("BENCHMARK_MAX_SIZE", str(10**6)))
+SIZES = [size for size in (3, 10**2, 10**3, 10**4, 10**5, 10**6) if size <= MAX_SIZE]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"nodes={size}")
+def graph(request) -> nx.DiGraph:
+    graph = nx.DiGraph()
+    seed_graph(graph, GraphSeed(nodes=request.param))
+    return graph
+
+
+@pytest.fixture
+def use_graph(graph, monkeypatch) -> nx.DiGraph:
+    """Serve requests from the synthetic graph instead of the sample graph."""
+    monkeypatch.setattr(main, "mock_graph", graph)
+    return graph
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from src import main
+from src.query_cache import QueryCache
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_validate_parameters(benchmark, use_graph):
+    """Parameter type check against the property-type index of the current graph version."""
+    benchmark(main.validate_parameters, {"name": "person-1", "age": 30})
+
+
+def test_execute_query_uncached(benchmark, use_graph, loop, monkeypatch):
+    """Full-graph read: traversal and serialization, with the query cache disabled."""
+    monkeypatch.setattr(main, "query_cache", QueryCache(max_entries=0))
+    request = main.QueryRequest(query="MATCH (n) RETURN n")
+    response = benchmark(lambda: loop.run_until_complete(main.execute_query(request)))
+    assert response.headers["X-Cache"] == "miss"
+
+
+def test_execute_query_cached(benchmark, use_graph, loop, monkeypatch):
+    """Repeated full-graph read answered from the query cache."""
+    monkeypatch.setattr(main, "query_cache", QueryCache())
+    request = main.QueryRequest(query="MATCH (n) RETURN n")
+    loop.run_until_complete(main.execute_query(request))
+    response = benchmark(lambda: loop.run_until_complete(main.execute_query(request)))
+    assert response.headers["X-Cache"] == "hit"
@@ -0,0 +1,235 @@
+"""Vectorized graph analytics over a sparse adjacency matrix.
+
+The graph is converted once into a CSR matrix; PageRank, degree centrality and
+Louvain-style community detection then run as NumPy/SciPy array operations instead
+of per-node Python loops.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+
+from .analytics_cache import Algorithm
+
+
+@dataclass
+class AnalyticsResult:
+    """Scores for every node, pre-ranked so top-k lookups are slices."""
+    algorithm: Algorithm
+    version: int
+    node_ids: np.ndarray
+    scores: np.ndarray
+    order: np.ndarray
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+# Node ids and (source, target) edges, copied from the graph without their attributes
+Topology = Tuple[List[int], List[Tuple[int, int]]]
+
+
+def graph_topology(graph: nx.DiGraph) -> Topology:
+    """Copy the node ids and edges of ``graph``; cheap enough for the event loop."""
+    return list(graph), list(graph.edges)
+
+
+def topology_to_csr(topology: Topology) -> Tuple[np.ndarray, sparse.csr_array]:
+    """Return node ids and the directed adjacency matrix of ``topology`` in CSR form."""
+    nodes, edges = topology
+    node_ids = np.array(nodes, dtype=np.int64)
+    index = {node_id: i for i, node_id in enumerate(nodes)}
+    edge_count = len(edges)
+    rows = np.fromiter((index[source] for source, _ in edges), dtype=np.int64, count=edge_count)
+    cols = np.fromiter((index[target] for _, target in edges), dtype=np.int64, count=edge_count)
+    n = node_ids.size
+    adjacency = sparse.csr_array((np.ones(edge_count), (rows, cols)), shape=(n, n))
+    return node_ids, adjacency
+
+
+def graph_to_csr(graph: nx.DiGraph) -> Tuple[np.ndarray, sparse.csr_array]:
+    """Return node ids and the directed adjacency matrix in CSR form."""
+    return topology_to_csr(graph_topology(graph))
+
+
+def pagerank(adjacency: sparse.csr_array, alpha: float = 0.85, tol: float = 1.0e-8,
+             max_iter: int = 100) -> np.ndarray:
+    """Power-iteration PageRank with uniform redistribution of dangling mass."""
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_degree == 0
+    inv_out = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    # Row-normalised transition matrix, transposed so one step is a mat-vec
+    transition = (sparse.diags_array(inv_out) @ adjacency).T.tocsr()
+    ranks = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        previous = ranks
+        ranks = alpha * (transition @ ranks + previous[dangling].sum() / n) + (1.0 - alpha) / n
+        if np.abs(ranks - previous).sum() < n * tol:
+            break
+    return ranks / ranks.sum()
+
+
+def degree_centrality(adjacency: sparse.csr_array) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (in_degree, out_degree) arrays."""
+    in_degree = np.asarray(adjacency.sum(axis=0)).ravel()
+    out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    return in_degree, out_degree
+
+
+def _local_moving(adjacency: sparse.csr_array, rng: np.random.Generator,
+                  max_iter: int, tolerance: float = 1.0e-3) -> np.ndarray:
+    """One Louvain level: move nodes to the neighbouring community with the best modularity gain.
+
+    All nodes are evaluated at once; a random half of the improving nodes moves per
+    round, which prevents pairs of nodes from swapping communities forever.
+    """
+    n = adjacency.shape[0]
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    self_loops = adjacency.diagonal()
+    total_weight = degree.sum()
+    labels = np.arange(n)
+    if total_weight == 0:
+        # No edges: nothing can improve on singleton communities
+        return labels
+    min_moves = int(n * tolerance)
+
+    for _ in range(max_iter):
+        membership = sparse.csr_array((np.ones(n), (np.arange(n), labels)), shape=(n, n))
+        # links[i, c]: weight from node i into community c
+        links = (adjacency @ membership).tocsr()
+        community_total = np.bincount(labels, weights=degree, minlength=n)
+
+        link_rows = np.repeat(np.arange(n), np.diff(links.indptr))
+        link_comms = links.indices
+        own = link_comms == labels[link_rows]
+        weight = links.data - np.where(own, self_loops[link_rows], 0.0)
+        total = community_total[link_comms] - np.where(own, degree[link_rows], 0.0)
+        gain = weight - degree[link_rows] * total / total_weight
+
+        own_gain = -degree * (community_total[labels] - degree) / total_weight
+        own_gain[link_rows[own]] = gain[own]
+
+        # Best candidate per row: row-wise max, then the first entry reaching it
+        nonempty = np.diff(links.indptr) > 0
+        row_max = np.full(n, -np.inf)
+        row_max[nonempty] = np.maximum.reduceat(gain, links.indptr[:-1][nonempty])
+        candidates = np.flatnonzero(gain >= row_max[link_rows])
+        candidate_rows = link_rows[candidates]
+        first = np.ones(candidates.size, dtype=bool)
+        first[1:] = candidate_rows[1:] != candidate_rows[:-1]
+        best = candidates[first]
+        best_rows = candidate_rows[first]
+        improving = gain[best] > own_gain[best_rows] + 1.0e-12
+        # Stop once only a negligible share of nodes would still move
+        if improving.sum() <= min_moves:
+            break
+        improving &= rng.random(improving.size) < 0.5
+        labels[best_rows[improving]] = link_comms[best[improving]]
+
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def modularity(adjacency: sparse.csr_array, labels: np.ndarray) -> float:
+    """Newman modularity of ``labels`` on the (symmetric) adjacency matrix."""
+    total_weight = adjacency.sum()
+    if total_weight == 0:
+        return 0.0
+    k = labels.max() + 1
+    membership = sparse.csr_array((np.ones(labels.size), (np.arange(labels.size), labels)),
+                                  shape=(labels.size, k))
+    internal = (membership.T @ adjacency @ membership).diagonal()
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    community_total = np.bincount(labels, weights=degree, minlength=k)
+    return float((internal / total_weight - (community_total / total_weight) ** 2).sum())
+
+
+def louvain_communities(adjacency: sparse.csr_array, seed: int = 0,
+                        max_levels: int = 10, max_iter: int = 50) -> np.ndarray:
+    """Multi-level Louvain on the undirected view of ``adjacency``; returns a label per node."""
+    n = adjacency.shape[0]
+    rng = np.random.default_rng(seed)
+    symmetric = (adjacency + adjacency.T).tocsr()
+    labels = np.arange(n)
+    level_graph = symmetric
+    for _ in range(max_levels):
+        level_labels = _local_moving(level_graph, rng, max_iter)
+        communities = level_labels.max() + 1 if level_labels.size else 0
+        labels = level_labels[labels]
+        if communities == level_graph.shape[0]:
+            break
+        # Collapse every community into a single weighted node and repeat
+        membership = sparse.csr_array(
+            (np.ones(level_labels.size), (np.arange(level_labels.size), level_labels)),
+            shape=(level_labels.size, communities),
+        )
+        level_graph = (membership.T @ level_graph @ membership).tocsr()
+    return labels
+
+
+def _rank(scores: np.ndarray) -> np.ndarray:
+    return np.argsort(-scores, kind="stable")
+
+
+def _run_pagerank(node_ids: np.ndarray, adjacency: sparse.csr_array,
+                  version: int) -> AnalyticsResult:
+    scores = pagerank(adjacency)
+    return AnalyticsResult(Algorithm.PAGERANK, version, node_ids, scores, _rank(scores))
+
+
+def _run_degree(node_ids: np.ndarray, adjacency: sparse.csr_array,
+                version: int) -> AnalyticsResult:
+    in_degree, out_degree = degree_centrality(adjacency)
+    scores = in_degree + out_degree
+    return AnalyticsResult(Algorithm.DEGREE, version, node_ids, scores, _rank(scores),
+                           {"in_degree": in_degree, "out_degree": out_degree})
+
+
+def _run_communities(node_ids: np.ndarray, adjacency: sparse.csr_array,
+                     version: int) -> AnalyticsResult:
+    labels = louvain_communities(adjacency)
+    sizes = np.bincount(labels) if labels.size else np.zeros(0, dtype=np.int64)
+    community_order = _rank(sizes.astype(float))
+    score = modularity((adjacency + adjacency.T).tocsr(), labels) if labels.size else 0.0
+    return AnalyticsResult(
+        Algorithm.COMMUNITIES, version, node_ids, labels.astype(float),
+        np.argsort(labels, kind="stable"),
+        {"labels": labels, "sizes": sizes, "community_order": community_order, "modularity": score},
+    )
+
+
+ALGORITHMS: Dict[Algorithm, Callable[[np.ndarray, sparse.csr_array, int], AnalyticsResult]] = {
+    Algorithm.PAGERANK: _run_pagerank,
+    Algorithm.DEGREE: _run_degree,
+    Algorithm.COMMUNITIES: _run_communities,
+}
+
+
+def analyze(algorithm: Algorithm, topology: Topology, version: int) -> AnalyticsResult:
+    """Build the adjacency matrix of ``topology`` and run ``algorithm`` on it."""
+    node_ids, adjacency = topology_to_csr(topology)
+    return ALGORITHMS[algorithm](node_ids, adjacency, version)
+
+
+def summarize(result: AnalyticsResult, limit: int) -> List[Dict[str, Any]]:
+    """Top ``limit`` entries of a result in response form."""
+    if result.algorithm == Algorithm.COMMUNITIES:
+        labels = result.extra["labels"]
+        boundaries = np.cumsum(result.extra["sizes"])[:-1]
+        members_by_label = np.split(result.node_ids[result.order], boundaries)
+        return [
+            {"community": int(label), "size": int(result.extra["sizes"][label]),
+             "members": members_by_label[label].tolist()}
+            for label in result.extra["community_order"][:limit]
+        ] if labels.size else []
+
+    entries = []
+    for idx in result.order[:limit]:
+        entry = {"id": int(result.node_ids[idx]), "score": float(result.scores[idx])}
+        if result.algorithm == Algorithm.DEGREE:
+            entry["in_degree"] = int(result.extra["in_degree"][idx])
+            entry["out_degree"] = int(result.extra["out_degree"][idx])
+        entries.append(entry)
+    return entries
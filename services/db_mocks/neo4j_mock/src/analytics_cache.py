@@ -0,0 +1,48 @@
+"""Per-version cache of analytics results.
+
+Kept apart from analytics.py so the service can route and cache analytics requests
+without importing NumPy and SciPy; those load with the first recompute.
+"""
+from enum import Enum
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from .analytics import AnalyticsResult
+
+
+class Algorithm(str, Enum):
+    PAGERANK = "pagerank"
+    DEGREE = "degree"
+    COMMUNITIES = "communities"
+
+
+class AnalyticsCache:
+    """Latest result per algorithm plus the versions currently being recomputed."""
+
+    def __init__(self) -> None:
+        self._results: Dict[Algorithm, "AnalyticsResult"] = {}
+        self._pending: Dict[Algorithm, int] = {}
+
+    def get(self, algorithm: Algorithm) -> Optional["AnalyticsResult"]:
+        return self._results.get(algorithm)
+
+    def mark_pending(self, algorithm: Algorithm, version: int) -> bool:
+        """Claim a recompute for ``version``; False if one is already scheduled."""
+        if self._pending.get(algorithm, -1) >= version:
+            return False
+        self._pending[algorithm] = version
+        return True
+
+    def is_pending(self, algorithm: Algorithm) -> bool:
+        return algorithm in self._pending
+
+    def store(self, result: "AnalyticsResult") -> None:
+        current = self._results.get(result.algorithm)
+        if current is None or current.version <= result.version:
+            self._results[result.algorithm] = result
+        if self._pending.get(result.algorithm) == result.version:
+            del self._pending[result.algorithm]
+
+    def discard_pending(self, algorithm: Algorithm, version: int) -> None:
+        if self._pending.get(algorithm) == version:
+            del self._pending[algorithm]
@@ -0,0 +1,181 @@
+"""Minimal Cypher parsing helpers for the Neo4j mock.
+
+Only the handful of write forms the mock supports are recognised:
+
+    CREATE (n:Label {key: 'value', other: 42})
+    UNWIND $rows AS row CREATE (n:Label {key: row.key})
+    UNWIND $rows AS row CREATE (n:Label) SET n = row
+
+All patterns are compiled once at import time so the request path only runs
+pre-built regular expressions.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# A quoted string may contain commas, colons and braces, so every pattern that
+# spans a property map has to skip over quoted sections explicitly.
+_QUOTED = r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\""
+_PROPERTY_MAP = rf"\{{(?:[^{{}}'\"]|{_QUOTED})*\}}"
+
+CREATE_PATTERN = re.compile(
+    rf"\bCREATE\s*\(\s*(?P<var>\w+)?\s*(?P<labels>(?::\s*`?\w+`?\s*)*)"
+    rf"(?P<props>{_PROPERTY_MAP})?\s*\)",
+    re.IGNORECASE,
+)
+UNWIND_PATTERN = re.compile(
+    r"^\s*UNWIND\s+\$(?P<param>\w+)\s+AS\s+(?P<alias>\w+)\s+(?P<body>.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+SET_ALL_PATTERN = re.compile(r"\bSET\s+(?P<var>\w+)\s*\+?=\s*(?P<source>\w+)\b", re.IGNORECASE)
+LABEL_PATTERN = re.compile(r"`?(\w+)`?")
+PROPERTY_PAIR_PATTERN = re.compile(
+    rf"""\s*(?P<key>`[^`]+`|\w+)\s*:\s*
+    (?P<value>{_QUOTED}
+        |-?\d+\.\d*(?:[eE][-+]?\d+)?|-?\.\d+(?:[eE][-+]?\d+)?|-?\d+[eE][-+]?\d+
+        |-?\d+
+        |\$\w+
+        |\w+(?:\.\w+)?
+    )\s*(?P<sep>,|$)""",
+    re.VERBOSE,
+)
+_INTEGER = re.compile(r"-?\d+")
+_ESCAPE = re.compile(r"\\(.)")
+
+# Value kinds produced by compile_property_map
+LITERAL = "literal"
+PARAMETER = "parameter"
+VARIABLE = "variable"
+
+
+@dataclass
+class CreateClause:
+    """Parsed ``CREATE (var:Label {...})`` node pattern."""
+    variable: Optional[str]
+    labels: List[str]
+    properties: List[Tuple[str, str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class UnwindCreate:
+    """Parsed ``UNWIND $param AS alias CREATE ...`` batch statement."""
+    parameter: str
+    alias: str
+    create: CreateClause
+    set_from_alias: bool = False
+
+
+def _parse_literal(token: str) -> Any:
+    """Convert a Cypher literal token into the matching Python value."""
+    if token[0] in "'\"":
+        return _ESCAPE.sub(r"\1", token[1:-1])
+    lowered = token.lower()
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+    if lowered == "null":
+        return None
+    if _INTEGER.fullmatch(token):
+        return int(token)
+    return float(token)
+
+
+def compile_property_map(text: str) -> List[Tuple[str, str, Any]]:
+    """Parse a ``{key: value, ...}`` map into ``(key, kind, payload)`` entries.
+
+    Literals are converted once here; ``$param`` and ``alias.key`` references are
+    kept symbolic so a batch statement can evaluate them per row cheaply.
+    """
+    body = text.strip()
+    if body.startswith("{") and body.endswith("}"):
+        body = body[1:-1]
+    entries: List[Tuple[str, str, Any]] = []
+    if not body.strip():
+        return entries
+
+    pos = 0
+    while pos < len(body):
+        match = PROPERTY_PAIR_PATTERN.match(body, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Invalid property map near: {body[pos:pos + 30]!r}")
+        key = match.group("key").strip("`")
+        token = match.group("value")
+        if token.startswith("$"):
+            entries.append((key, PARAMETER, token[1:]))
+        elif "." in token and token[0].isalpha() and token.split(".")[0].isidentifier():
+            entries.append((key, VARIABLE, tuple(token.split(".", 1))))
+        elif token[0] in "'\"" or token[0] in "-.0123456789" or token.lower() in ("true", "false", "null"):
+            entries.append((key, LITERAL, _parse_literal(token)))
+        else:
+            raise ValueError(f"Unsupported property value {token!r} for key '{key}'")
+        pos = match.end()
+        if match.group("sep") != ",":
+            break
+
+    if body[pos:].strip():
+        raise ValueError(f"Invalid property map near: {body[pos:pos + 30]!r}")
+    return entries
+
+
+def evaluate_property_map(
+    entries: List[Tuple[str, str, Any]],
+    parameters: Optional[Dict[str, Any]] = None,
+    bindings: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Resolve compiled property entries against query parameters and row bindings."""
+    properties: Dict[str, Any] = {}
+    for key, kind, payload in entries:
+        if kind == LITERAL:
+            properties[key] = payload
+        elif kind == PARAMETER:
+            if not parameters or payload not in parameters:
+                raise ValueError(f"Missing parameter '${payload}'")
+            properties[key] = parameters[payload]
+        else:
+            alias, attribute = payload
+            if not bindings or alias not in bindings:
+                raise ValueError(f"Unknown variable '{alias}'")
+            properties[key] = bindings[alias].get(attribute)
+    return properties
+
+
+def parse_property_map(text: str, parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Parse a literal property map such as ``{name: 'Alice', age: 25}``."""
+    return evaluate_property_map(compile_property_map(text), parameters)
+
+
+def parse_create(query: str) -> Optional[CreateClause]:
+    """Return the first CREATE node pattern in ``query``, if any."""
+    match = CREATE_PATTERN.search(query)
+    if not match:
+        return None
+    labels = LABEL_PATTERN.findall(match.group("labels") or "")
+    props = match.group("props")
+    return CreateClause(
+        variable=match.group("var"),
+        labels=labels,
+        properties=compile_property_map(props) if props else [],
+    )
+
+
+def parse_unwind_create(query: str) -> Optional[UnwindCreate]:
+    """Return the parsed batch form ``UNWIND $rows AS row CREATE ...``, if present."""
+    match = UNWIND_PATTERN.match(query)
+    if not match:
+        return None
+    body = match.group("body")
+    create = parse_create(body)
+    if create is None:
+        raise ValueError("UNWIND is only supported in front of a CREATE clause")
+    alias = match.group("alias")
+    set_match = SET_ALL_PATTERN.search(body, CREATE_PATTERN.search(body).end())
+    set_from_alias = bool(
+        set_match and set_match.group("var") == create.variable and set_match.group("source") == alias
+    )
+    return UnwindCreate(
+        parameter=match.group("param"),
+        alias=alias,
+        create=create,
+        set_from_alias=set_from_alias,
+    )
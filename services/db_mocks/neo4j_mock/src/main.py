@@ -1,25 +1,159 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import Dict, List, Any, Optional
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Any, Optional, Set, Tuple
+import asyncio
+import json
+import os
+import time
 import networkx as nx
+from service_common.metrics import instrument, stage
+from service_common.profiling import ProfilingSettings, enable_profiling
+from service_common.tracing import TraceSettings, Tracer, trace_requests
+
+# NumPy and SciPy load with the first analytics recompute, seed or snapshot, not at startup
+from .analytics_cache import Algorithm, AnalyticsCache
+from .cypher import CreateClause, evaluate_property_map, parse_create, parse_unwind_create
+from .query_cache import GraphVersion, QueryCache, make_cache_key
+from .snapshot import GraphSnapshotStore
 
 app = FastAPI(title="Neo4j Mock Service")
+instrument(app)
+
+# Request traces continued from the MCP service
+# (NEO4J_MOCK_TRACE_EXPORTER, NEO4J_MOCK_TRACE_SAMPLE_RATIO)
+tracer = Tracer(TraceSettings.from_env("NEO4J_MOCK_TRACE", "neo4j-mock"))
+trace_requests(app, tracer)
+
+# POST /admin/profile and X-Profile: 1 requests, enabled by NEO4J_MOCK_PROFILING_TOKEN
+profiler = enable_profiling(app, ProfilingSettings.from_env("NEO4J_MOCK", "neo4j-mock"))
+
+# Hot-path stages of /query, exported as stage_duration_seconds on /metrics
+PARSE_STAGE = stage("parse")
+EXECUTE_STAGE = stage("execute")
+SERIALIZE_STAGE = stage("serialize")
+
+
+class NodeIdAllocator:
+    """Monotonic node id allocator, so inserts never scan the graph for max(id)."""
+
+    def __init__(self, start: int = 1):
+        self._next = start
+
+    @property
+    def next_id(self) -> int:
+        """The id the next allocation will return."""
+        return self._next
+
+    def allocate(self) -> int:
+        """Return a single fresh node id."""
+        node_id = self._next
+        self._next += 1
+        return node_id
+
+    def allocate_block(self, count: int) -> range:
+        """Reserve ``count`` consecutive ids in one step (used by batched CREATE)."""
+        block = range(self._next, self._next + count)
+        self._next += count
+        return block
+
+    def observe(self, node_id: int) -> None:
+        """Make sure ids handed out later never collide with an externally added node."""
+        if node_id >= self._next:
+            self._next = node_id + 1
+
+
+# Directory for graph snapshots and the mutation log; persistence is off when unset.
+# NEO4J_MOCK_LOG_FSYNC=true fsyncs every logged mutation before it is acknowledged.
+DATA_DIR = os.getenv("NEO4J_MOCK_DATA_DIR")
+LOG_FSYNC = os.getenv("NEO4J_MOCK_LOG_FSYNC", "false").lower() in ("1", "true", "yes")
+snapshot_store = GraphSnapshotStore(DATA_DIR, fsync=LOG_FSYNC) if DATA_DIR else None
 
-# Create a sample graph for mock responses
+
+def load_sample_graph(graph: nx.DiGraph) -> None:
+    """Populate ``graph`` with the built-in sample data"""
+    graph.add_nodes_from([
+        (1, {"labels": ["Person"], "properties": {"name": "John", "age": 30}}),
+        (2, {"labels": ["Person"], "properties": {"name": "Jane", "age": 28}}),
+        (3, {"labels": ["Company"], "properties": {"name": "TechCorp", "founded": 2020}})
+    ])
+    graph.add_edges_from([
+        (1, 2, {"type": "KNOWS", "properties": {"since": 2019}}),
+        (1, 3, {"type": "WORKS_AT", "properties": {"role": "Developer"}})
+    ])
+
+
+# Without a snapshot, NEO4J_MOCK_SEED_NODES > 0 starts from a synthetic power-law graph
+SEED_NODES = int(os.getenv("NEO4J_MOCK_SEED_NODES", "0"))
+
+# Warm start from the latest snapshot when one exists, otherwise use the seed or sample graph
 mock_graph = nx.DiGraph()
-mock_graph.add_nodes_from([
-    (1, {"labels": ["Person"], "properties": {"name": "John", "age": 30}}),
-    (2, {"labels": ["Person"], "properties": {"name": "Jane", "age": 28}}),
-    (3, {"labels": ["Company"], "properties": {"name": "TechCorp", "founded": 2020}})
-])
-mock_graph.add_edges_from([
-    (1, 2, {"type": "KNOWS", "properties": {"since": 2019}}),
-    (1, 3, {"type": "WORKS_AT", "properties": {"role": "Developer"}})
-])
+next_node_id = snapshot_store.load_into(mock_graph) if snapshot_store else None
+if next_node_id is None:
+    if SEED_NODES > 0:
+        from .seeding import GraphSeed, seed_graph
+
+        seed_graph(mock_graph, GraphSeed(
+            nodes=SEED_NODES,
+            edges_per_node=int(os.getenv("NEO4J_MOCK_SEED_EDGES_PER_NODE", "2")),
+            seed=int(os.getenv("NEO4J_MOCK_SEED", "0")),
+        ))
+    else:
+        load_sample_graph(mock_graph)
+node_ids = NodeIdAllocator(start=next_node_id or max(mock_graph.nodes(), default=0) + 1)
+if snapshot_store and next_node_id is None:
+    # Give the mutation log a base snapshot to replay against
+    snapshot_store.save(mock_graph, node_ids.next_id)
+
+
+# Every mutation bumps the version, which invalidates all cached read results
+graph_version = GraphVersion()
+query_cache = QueryCache(max_entries=int(os.getenv("NEO4J_MOCK_QUERY_CACHE_SIZE", "256")))
+
+
+# Set to "seed" or "snapshot" while the whole graph is replaced or written out; CREATEs
+# are rejected meanwhile, since a seed would discard them and a snapshot would miss them
+graph_maintenance: Optional[str] = None
+
+
+@contextmanager
+def writes_paused(operation: str) -> Iterator[None]:
+    """Reject graph writes for the duration of ``operation``, one operation at a time"""
+    global graph_maintenance
+    if graph_maintenance is not None:
+        raise HTTPException(status_code=409,
+                            detail=f"A graph {graph_maintenance} is already running")
+    graph_maintenance = operation
+    try:
+        yield
+    finally:
+        graph_maintenance = None
+
+
+def ensure_writable() -> None:
+    if graph_maintenance is not None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Writes are paused while a graph {graph_maintenance} runs; retry later",
+        )
+
+
+def record_mutation(mutation: Dict[str, Any]) -> None:
+    """Bump the graph version and append the mutation to the persistent log, if enabled"""
+    graph_version.bump()
+    if snapshot_store:
+        snapshot_store.append(mutation)
+
 
 class QueryRequest(BaseModel):
     query: str
     parameters: Optional[Dict[str, Any]] = None
+    # A CREATE returns the whole graph, like every other query; bulk loaders opt in to
+    # getting back only the nodes they created
+    created_only: bool = Field(default=False, description="Return only the nodes a CREATE added")
 
 class GraphResponse(BaseModel):
     nodes: List[Dict[str, Any]]
@@ -30,62 +164,133 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "neo4j-mock"}
 
+class PropertyTypeIndex:
+    """Types stored under each property key, rebuilt at most once per graph version"""
+
+    def __init__(self) -> None:
+        self._graph: Optional[nx.DiGraph] = None
+        self._version = -1
+        self._types: Dict[str, Set[type]] = {}
+
+    def get(self, graph: nx.DiGraph, version: int) -> Dict[str, Set[type]]:
+        if graph is not self._graph or version != self._version:
+            types: Dict[str, Set[type]] = {}
+            for _, data in graph.nodes(data=True):
+                for key, value in data.get("properties", {}).items():
+                    types.setdefault(key, set()).add(type(value))
+            self._graph, self._version, self._types = graph, version, types
+        return self._types
+
+
+property_types = PropertyTypeIndex()
+
+
 def validate_parameters(parameters: Dict[str, Any]):
-    """Validate parameter types against graph schema"""
+    """Validate parameter types against the property types stored in the graph"""
     if not parameters:
         return
-        
-    # Check type compatibility with existing node properties
-    for node_id, data in mock_graph.nodes(data=True):
-        props = data.get("properties", {})
-        for key, value in props.items():
-            if key in parameters:
-                param_value = parameters[key]
-                if not isinstance(param_value, type(value)):
-                    raise HTTPException(
-                        status_code=422,
-                        detail=f"Parameter '{key}' type mismatch. Expected {type(value)}, got {type(param_value)}"
-                    )
 
-@app.post("/query", response_model=GraphResponse)
-async def execute_query(request: QueryRequest):
-    """Mock endpoint for executing Cypher-like queries"""
-    
-    # Validate parameters if provided
-    if request.parameters:
+    types = property_types.get(mock_graph, graph_version.value)
+    for key, param_value in parameters.items():
+        for expected in types.get(key, ()):
+            if not isinstance(param_value, expected):
+                raise HTTPException(
+                    status_code=422,
+                    detail=(f"Parameter '{key}' type mismatch. "
+                            f"Expected {expected}, got {type(param_value)}"),
+                )
+
+def serialize_node(node_id: int) -> Dict[str, Any]:
+    """Build the response representation of a single node"""
+    data = mock_graph.nodes[node_id]
+    return {"id": node_id, "labels": data["labels"], "properties": data["properties"]}
+
+
+def create_nodes(query: str, parameters: Optional[Dict[str, Any]]) -> Optional[List[int]]:
+    """Apply a CREATE or ``UNWIND $rows AS row CREATE`` statement.
+
+    Returns the ids of the created nodes, or None when the query is not a write.
+    """
+    unwind = parse_unwind_create(query)
+    if unwind is not None:
+        rows = (parameters or {}).get(unwind.parameter)
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError(f"Parameter '${unwind.parameter}' must be a list of maps")
+        return create_node_batch(unwind.create, rows, parameters, unwind.alias,
+                                 unwind.set_from_alias)
+
+    create = parse_create(query)
+    if create is None:
+        return None
+    properties = evaluate_property_map(create.properties, parameters)
+    ensure_writable()
+    node_id = node_ids.allocate()
+    mock_graph.add_node(node_id, labels=list(create.labels), properties=properties)
+    record_mutation({"op": "add_nodes", "nodes": [[node_id, create.labels, properties]]})
+    return [node_id]
+
+
+def create_node_batch(
+    create: CreateClause,
+    rows: List[Dict[str, Any]],
+    parameters: Optional[Dict[str, Any]],
+    alias: str,
+    set_from_alias: bool,
+) -> List[int]:
+    """Create one node per row with a single bulk insert into the graph"""
+    ensure_writable()
+    ids = node_ids.allocate_block(len(rows))
+    nodes = []
+    for node_id, row in zip(ids, rows):
+        properties = dict(row) if set_from_alias else {}
+        properties.update(evaluate_property_map(create.properties, parameters, {alias: row}))
+        nodes.append((node_id, {"labels": list(create.labels), "properties": properties}))
+    mock_graph.add_nodes_from(nodes)
+    record_mutation({
+        "op": "add_nodes",
+        "nodes": [[node_id, data["labels"], data["properties"]] for node_id, data in nodes],
+    })
+    return list(ids)
+
+
+def apply_writes(request: QueryRequest) -> Optional[List[int]]:
+    """Apply any CREATE in the request, or validate the parameters of a read.
+
+    Returns the created node ids, or None for read-only queries. Writes skip the type
+    check, so a bulk load does not pay for a property-type rebuild on every batch.
+    """
+    try:
+        created = create_nodes(request.query, request.parameters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if created is None and request.parameters:
         validate_parameters(request.parameters)
-    
-    # Handle CREATE operations
-    if "CREATE" in request.query.upper():
-        # Extract node properties from query (simple parsing)
-        import re
-        props_match = re.search(r'{(.*?)}', request.query)
-        if props_match:
-            props_str = props_match.group(1)
-            props = {}
-            for pair in props_str.split(','):
-                key, value = pair.strip().split(':')
-                key = key.strip()
-                value = value.strip(' \'\"')
-                # Convert value to appropriate type
-                if value.isdigit():
-                    value = int(value)
-                props[key] = value
-            
-            # Add new node
-            new_id = max(mock_graph.nodes()) + 1
-            mock_graph.add_node(new_id, labels=["Person"], properties=props)
-    
-    # Return current graph state
+    return created
+
+
+# Reads returning at least this many nodes plus relationships are serialized in the offload
+# pool, so encoding a large graph does not stall every other request on the event loop
+OFFLOAD_THRESHOLD = int(os.getenv("NEO4J_MOCK_OFFLOAD_THRESHOLD", "10000"))
+offload_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("NEO4J_MOCK_OFFLOAD_THREADS", "4")),
+    thread_name_prefix="neo4j-offload",
+)
+
+
+def encode_graph(
+    node_data: List[Tuple[int, Dict[str, Any]]],
+    edge_data: List[Tuple[int, int, Dict[str, Any]]],
+) -> bytes:
+    """Encode captured nodes and edges as a /query response body"""
     nodes = [
         {
             "id": node_id,
             "labels": data["labels"],
             "properties": data["properties"]
         }
-        for node_id, data in mock_graph.nodes(data=True)
+        for node_id, data in node_data
     ]
-    
+
     relationships = [
         {
             "id": idx,
@@ -94,10 +299,242 @@ async def execute_query(request: QueryRequest):
             "endNode": target,
             "properties": data["properties"]
         }
-        for idx, (source, target, data) in enumerate(mock_graph.edges(data=True))
+        for idx, (source, target, data) in enumerate(edge_data)
     ]
-    
-    return GraphResponse(nodes=nodes, relationships=relationships)
+    graph_body = {"nodes": nodes, "relationships": relationships}
+    return json.dumps(graph_body, separators=(",", ":")).encode()
+
+
+@app.post("/query", response_model=GraphResponse)
+async def execute_query(request: QueryRequest):
+    """Mock endpoint for executing Cypher-like queries"""
+
+    # Repeated reads between writes are answered from the cache without traversal
+    cache_key = make_cache_key(request.query, request.parameters)
+    cached = query_cache.get(cache_key, graph_version.value)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json", headers={"X-Cache": "hit"})
+
+    # Handle CREATE operations
+    with PARSE_STAGE.time(), tracer.span("parse"):
+        created = apply_writes(request)
+    if created is not None and request.created_only:
+        # Mirror Cypher's "CREATE ... RETURN n": only the new nodes are returned
+        return GraphResponse(nodes=[serialize_node(node_id) for node_id in created],
+                             relationships=[])
+
+    # Return current graph state. The node and edge views are captured on the event loop,
+    # where no CREATE can interleave; large graphs are then encoded in the offload pool.
+    with EXECUTE_STAGE.time(), tracer.span("execute") as span:
+        node_data = list(mock_graph.nodes(data=True))
+        edge_data = list(mock_graph.edges(data=True))
+        span.set_attribute("nodes", len(node_data))
+        span.set_attribute("relationships", len(edge_data))
+    with SERIALIZE_STAGE.time(), tracer.span("serialize"):
+        if len(node_data) + len(edge_data) < OFFLOAD_THRESHOLD:
+            payload = encode_graph(node_data, edge_data)
+        else:
+            payload = await asyncio.get_running_loop().run_in_executor(
+                offload_pool, encode_graph, node_data, edge_data
+            )
+    if created is None:
+        # Never cache a write's response: a repeat of the CREATE must create again
+        query_cache.put(cache_key, graph_version.value, payload)
+    return Response(content=payload, media_type="application/json", headers={"X-Cache": "miss"})
+
+
+# Number of NDJSON records encoded into one chunk of the streaming response
+STREAM_CHUNK_SIZE = 500
+
+
+def _encode_record(record: Dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":"))
+
+
+async def stream_graph_records(
+    node_list: List[int],
+    edge_list: Optional[List[Tuple[int, int]]],
+) -> AsyncIterator[bytes]:
+    """Yield NDJSON chunks for ``node_list`` followed by ``edge_list``.
+
+    Only ids are captured up front; attribute dicts are read from the graph as each
+    chunk is encoded, so a large result is never materialised as one list of dicts.
+    The graph is bound once, so a seed that installs a new graph mid-stream cannot
+    mix records of two graphs.
+    """
+    graph = mock_graph
+    nodes, edges = graph.nodes, graph.edges
+    lines: List[str] = []
+    for node_id in node_list:
+        if node_id not in nodes:
+            continue
+        data = nodes[node_id]
+        lines.append(_encode_record({
+            "record": "node",
+            "id": node_id,
+            "labels": data["labels"],
+            "properties": data["properties"],
+        }))
+        if len(lines) >= STREAM_CHUNK_SIZE:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+
+    for idx, (source, target) in enumerate(edge_list or ()):
+        data = edges.get((source, target))
+        if data is None:
+            continue
+        lines.append(_encode_record({
+            "record": "relationship",
+            "id": idx,
+            "type": data["type"],
+            "startNode": source,
+            "endNode": target,
+            "properties": data["properties"],
+        }))
+        if len(lines) >= STREAM_CHUNK_SIZE:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+@app.post("/query/stream")
+async def execute_query_stream(request: QueryRequest) -> StreamingResponse:
+    """Streaming variant of /query returning newline-delimited JSON.
+
+    Each line is one node or relationship, shaped like the /query items and tagged with
+    ``"record": "node"`` or ``"record": "relationship"``; nodes are emitted first. The
+    response bypasses pydantic response validation.
+    """
+    created = apply_writes(request)
+    if created is not None and request.created_only:
+        records = stream_graph_records(created, None)
+    else:
+        records = stream_graph_records(list(mock_graph.nodes), list(mock_graph.edges))
+    return StreamingResponse(records, media_type="application/x-ndjson")
+
+@app.post("/admin/snapshot", dependencies=[Depends(profiler.require_admin)])
+async def save_snapshot():
+    """Write a snapshot of the current graph and truncate the mutation log.
+
+    The snapshot is written in the offload pool; writes are rejected until it is done.
+    """
+    if snapshot_store is None:
+        raise HTTPException(status_code=409,
+                            detail="Persistence is disabled; set NEO4J_MOCK_DATA_DIR")
+    with writes_paused("snapshot"):
+        return await asyncio.get_running_loop().run_in_executor(
+            offload_pool, snapshot_store.save, mock_graph, node_ids.next_id
+        )
+
+
+# Sized for tests and benchmarks; bigger graphs are precomputed with `python -m src.seeding`
+class SeedRequest(BaseModel):
+    nodes: int = Field(..., gt=0, le=200_000, description="Number of nodes to generate")
+    edges_per_node: int = Field(default=2, ge=0, le=10,
+                                description="Relationships started by each node")
+    exponent: float = Field(default=2.5, gt=1.0,
+                            description="Power-law exponent of the in-degree distribution")
+    seed: int = Field(default=0, description="Random seed; equal seeds generate equal graphs")
+
+
+@app.post("/admin/seed", dependencies=[Depends(profiler.require_admin)])
+async def seed(request: SeedRequest):
+    """Replace the graph with a synthetic power-law graph, bulk-inserted in one step.
+
+    The graph is built in the offload pool and swapped in whole on the event loop,
+    where the version bump happens like every other write. With persistence enabled
+    a fresh snapshot is then written in the pool, so the mutation log does not have
+    to carry the load. Writes are rejected with 409 until both are done.
+    """
+    global mock_graph
+    from .seeding import GraphSeed, seed_graph
+
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    with writes_paused("seed"):
+        graph = nx.DiGraph()
+        relationships = await loop.run_in_executor(
+            offload_pool, seed_graph, graph, GraphSeed(**request.model_dump())
+        )
+        mock_graph = graph
+        node_ids.observe(request.nodes)
+        graph_version.bump()
+        query_cache.clear()
+        snapshot = None
+        if snapshot_store:
+            snapshot = await loop.run_in_executor(
+                offload_pool, snapshot_store.save, graph, node_ids.next_id
+            )
+    return {
+        "nodes": request.nodes,
+        "relationships": relationships,
+        "seconds": time.perf_counter() - started,
+        "snapshot_generation": snapshot["generation"] if snapshot else None,
+    }
+
+
+analytics_cache = AnalyticsCache()
+
+
+async def recompute_analytics(algorithm: Algorithm, scheduled_version: int) -> None:
+    """Recompute one algorithm off the request path.
+
+    The graph version is read together with a copy of the node ids and edges on the
+    event loop, where no write can interleave, so the result is stored under the
+    version it was computed from even if writes landed after ``scheduled_version`` was
+    claimed. Building the adjacency matrix and the computation run in the thread pool.
+    """
+    from .analytics import analyze, graph_topology
+
+    try:
+        version = graph_version.value
+        topology = graph_topology(mock_graph)
+        result = await run_in_threadpool(analyze, algorithm, topology, version)
+        analytics_cache.store(result)
+    finally:
+        analytics_cache.discard_pending(algorithm, scheduled_version)
+
+
+@app.get("/analytics/{algorithm}")
+async def run_analytics(
+    algorithm: Algorithm,
+    background_tasks: BackgroundTasks,
+    limit: int = Query(default=10, gt=0, le=1000),
+):
+    """Most central nodes (pagerank, degree) or largest communities (communities).
+
+    Results are cached per graph version. When the graph has changed, the previous
+    result is returned marked as stale while a background task recomputes it; the
+    very first request for an algorithm returns 202 until a result is available.
+    """
+    version = graph_version.value
+    result = analytics_cache.get(algorithm)
+    if result is None or result.version != version:
+        if analytics_cache.mark_pending(algorithm, version):
+            background_tasks.add_task(recompute_analytics, algorithm, version)
+
+    if result is None:
+        return JSONResponse(
+            status_code=202,
+            content={"algorithm": algorithm.value, "status": "pending", "graph_version": version},
+        )
+
+    from .analytics import summarize
+
+    body = {
+        "algorithm": algorithm.value,
+        "status": "ready" if result.version == version else "stale",
+        "graph_version": version,
+        "computed_at_version": result.version,
+        "results": summarize(result, limit),
+    }
+    if algorithm == Algorithm.COMMUNITIES:
+        body["modularity"] = result.extra["modularity"]
+        body["communities"] = int(result.extra["sizes"].size)
+    return body
+
 
 if __name__ == "__main__":
     import uvicorn
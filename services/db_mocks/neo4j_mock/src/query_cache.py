@@ -0,0 +1,79 @@
+"""Read-query result cache invalidated by a monotonically increasing graph version."""
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+CacheKey = Tuple[str, str]
+
+
+class GraphVersion:
+    """Counter bumped by every graph mutation; cached results are tagged with it."""
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def bump(self) -> int:
+        self.value += 1
+        return self.value
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so formatting differences share one cache entry."""
+    return " ".join(query.split())
+
+
+def make_cache_key(query: str, parameters: Optional[Dict[str, Any]]) -> CacheKey:
+    """Build the cache key from the normalized query and canonical parameters."""
+    params = json.dumps(parameters or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return normalize_query(query), params
+
+
+class QueryCache:
+    """LRU cache of serialized query results bounded by entry count and total bytes.
+
+    An entry is only served while its version equals the current graph version, so
+    any mutation invalidates every cached result without touching the cache.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[int, bytes]]" = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey, version: int) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            if entry is not None:
+                self._discard(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: CacheKey, version: int, payload: bytes) -> None:
+        if len(payload) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._discard(key)
+        self._entries[key] = (version, payload)
+        self._bytes += len(payload)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+    def _discard(self, key: CacheKey) -> None:
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
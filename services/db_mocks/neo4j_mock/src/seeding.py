@@ -0,0 +1,93 @@
+"""Deterministic synthetic graphs for load and scaling tests.
+
+Edges are generated with NumPy in one pass (Chung-Lu model): every node starts
+``edges_per_node`` edges, and targets are drawn with probability proportional to a
+per-node weight that follows a power law. In-degrees therefore follow a power law
+with the given exponent, as in social and citation graphs. The graph is then
+bulk-inserted, so loading N nodes costs two ``add_*_from`` calls rather than N
+CREATE queries.
+
+Generating a large graph at every pod start costs seconds; write it once as a
+snapshot instead and point ``NEO4J_MOCK_DATA_DIR`` at it::
+
+    python -m src.seeding /data/neo4j --nodes 1000000
+"""
+import argparse
+import json
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from .snapshot import GraphSnapshotStore, _gc_paused
+
+RELATIONSHIP_TYPES = ("KNOWS", "FOLLOWS", "WORKS_WITH")
+
+
+@dataclass(frozen=True)
+class GraphSeed:
+    nodes: int
+    edges_per_node: int = 2
+    exponent: float = 2.5
+    seed: int = 0
+
+
+def power_law_edges(spec: GraphSeed) -> Tuple[np.ndarray, np.ndarray]:
+    """Edge endpoints over node ids 1..nodes, without self loops."""
+    rng = np.random.default_rng(spec.seed)
+    node_ids = np.arange(1, spec.nodes + 1)
+    # Shuffle which ids become hubs so degree does not simply follow id order
+    weights = np.empty(spec.nodes)
+    weights[rng.permutation(spec.nodes)] = np.arange(1, spec.nodes + 1) ** (-1.0 / (spec.exponent - 1))
+    count = spec.nodes * spec.edges_per_node
+    sources = np.repeat(node_ids, spec.edges_per_node)
+    targets = rng.choice(node_ids, size=count, p=weights / weights.sum())
+    keep = sources != targets
+    return sources[keep], targets[keep]
+
+
+def seed_graph(graph: nx.DiGraph, spec: GraphSeed) -> int:
+    """Replace the contents of ``graph`` with a synthetic power-law graph.
+
+    Returns the number of relationships created (parallel edges collapse).
+    """
+    sources, targets = power_law_edges(spec)
+    rng = np.random.default_rng(spec.seed + 1)
+    ages = rng.integers(18, 80, spec.nodes).tolist()
+    since = rng.integers(1990, 2025, sources.size).tolist()
+    types = rng.integers(0, len(RELATIONSHIP_TYPES), sources.size).tolist()
+    with _gc_paused():
+        graph.clear()
+        graph.add_nodes_from(
+            (node_id, {"labels": ["Person"], "properties": {"name": f"person-{node_id}", "age": age}})
+            for node_id, age in zip(range(1, spec.nodes + 1), ages)
+        )
+        graph.add_edges_from(
+            (source, target, {"type": RELATIONSHIP_TYPES[kind], "properties": {"since": year}})
+            for source, target, kind, year in zip(sources.tolist(), targets.tolist(), types, since)
+        )
+    return graph.number_of_edges()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.seeding",
+                                     description="Write a synthetic graph as a snapshot in a data directory.")
+    parser.add_argument("directory", help="Data directory, as NEO4J_MOCK_DATA_DIR")
+    parser.add_argument("--nodes", type=int, required=True)
+    parser.add_argument("--edges-per-node", type=int, default=GraphSeed.edges_per_node)
+    parser.add_argument("--exponent", type=float, default=GraphSeed.exponent)
+    parser.add_argument("--seed", type=int, default=GraphSeed.seed)
+    args = parser.parse_args(argv)
+
+    graph = nx.DiGraph()
+    seed_graph(graph, GraphSeed(args.nodes, args.edges_per_node, args.exponent, args.seed))
+    store = GraphSnapshotStore(args.directory)
+    try:
+        print(json.dumps(store.save(graph, args.nodes + 1)))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import pytest
+
+from src.cypher import parse_create, parse_property_map, parse_unwind_create
+
+
+def test_parse_property_map_typed_literals():
+    """Test conversion of Cypher literals to Python values.
+
+    Purpose:
+        Verify that integers, floats, booleans, null and quoted strings keep their types.
+
+    Expected Outcome:
+        - Every literal is converted to the matching Python type
+    """
+    props = parse_property_map("{name: 'Alice', age: 25, score: 1.5, active: true, manager: null}")
+    assert props == {"name": "Alice", "age": 25, "score": 1.5, "active": True, "manager": None}
+
+
+def test_parse_property_map_quoted_commas():
+    """Test property maps whose string values contain separators.
+
+    Purpose:
+        Verify that commas, colons and braces inside quotes do not split the map.
+
+    Expected Outcome:
+        - Quoted values are returned intact, including escaped quotes
+    """
+    props = parse_property_map("{title: 'Smith, John: {CEO}', quote: \"He said \\\"hi\\\"\"}")
+    assert props == {"title": "Smith, John: {CEO}", "quote": 'He said "hi"'}
+
+
+def test_parse_property_map_parameters():
+    """Test ``$param`` references inside a property map.
+
+    Expected Outcome:
+        - Parameters are substituted from the request
+        - A missing parameter raises ValueError
+    """
+    assert parse_property_map("{name: $name}", {"name": "Bob"}) == {"name": "Bob"}
+    with pytest.raises(ValueError):
+        parse_property_map("{name: $name}", {})
+
+
+def test_parse_property_map_invalid():
+    """Test that malformed property maps are rejected.
+
+    Expected Outcome:
+        - ValueError is raised instead of silently dropping properties
+    """
+    with pytest.raises(ValueError):
+        parse_property_map("{name 'Alice'}")
+
+
+def test_parse_create_labels():
+    """Test extraction of variable, labels and properties from a CREATE pattern.
+
+    Expected Outcome:
+        - All labels of the node pattern are returned in order
+    """
+    create = parse_create("CREATE (c:Company:Startup {name: 'Acme'}) RETURN c")
+    assert create.variable == "c"
+    assert create.labels == ["Company", "Startup"]
+    assert parse_create("MATCH (n) WHERE n.note = 'create something' RETURN n") is None
+
+
+def test_parse_unwind_create():
+    """Test parsing of the batched ``UNWIND $rows AS row CREATE`` form.
+
+    Expected Outcome:
+        - Parameter name, alias and SET shorthand are detected
+    """
+    unwind = parse_unwind_create("UNWIND $rows AS row CREATE (n:Person) SET n = row")
+    assert unwind.parameter == "rows"
+    assert unwind.alias == "row"
+    assert unwind.set_from_alias is True
+    assert parse_unwind_create("MATCH (n) RETURN n") is None
@@ -289,4 +289,481 @@ def test_invalid_parameter_type():
     }
     
     response = client.post("/query", json=request_data)
-    assert response.status_code in [400, 422]  # Either bad request or validation error
\ No newline at end of file
+    assert response.status_code in [400, 422]  # Either bad request or validation error
+
+def test_create_with_quoted_commas():
+    """Test CREATE with string values containing commas.
+
+    Purpose:
+        Verify that the property map parser keeps quoted commas and typed literals.
+
+    Expected Outcome:
+        - Status code should be 200
+        - With created_only, only the created node is returned, with its label and typed properties
+    """
+    request_data = {
+        "query": "CREATE (c:Company {name: 'Acme, Inc.', founded: 1999, public: false}) RETURN c",
+        "created_only": True,
+    }
+
+    response = client.post("/query", json=request_data)
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["nodes"]) == 1
+    node = data["nodes"][0]
+    assert node["labels"] == ["Company"]
+    assert node["properties"] == {"name": "Acme, Inc.", "founded": 1999, "public": False}
+
+
+def test_create_returns_full_graph_by_default():
+    """Test the response of a CREATE without ``created_only``.
+
+    Expected Outcome:
+        - The whole graph is returned, new node included, as before bulk CREATE existed
+        - Repeating the same CREATE creates another node instead of hitting the query cache
+    """
+    from src import main
+
+    before = main.mock_graph.number_of_nodes()
+    query = {"query": "CREATE (p:Person {name: 'Full'})"}
+    first = client.post("/query", json=query).json()
+    second = client.post("/query", json=query).json()
+    try:
+        assert len(first["nodes"]) == before + 1
+        assert len(second["nodes"]) == before + 2
+        assert len(first["relationships"]) == main.mock_graph.number_of_edges()
+    finally:
+        main.mock_graph.remove_nodes_from(
+            node["id"] for node in second["nodes"] if node["properties"].get("name") == "Full"
+        )
+        main.graph_version.bump()
+
+
+def test_create_invalid_property_map():
+    """Test CREATE with a malformed property map.
+
+    Expected Outcome:
+        - Status code should be 400 instead of a server error
+    """
+    response = client.post("/query", json={"query": "CREATE (p:Person {name 'Eve'})"})
+    assert response.status_code == 400
+
+
+def test_unwind_bulk_create():
+    """Test batched node creation through ``UNWIND $rows AS row CREATE``.
+
+    Purpose:
+        Verify that a bulk load of 10^5 rows allocates unique ids and finishes quickly.
+
+    Expected Outcome:
+        - Status code should be 200
+        - One node per row with monotonically increasing ids
+        - Completes in a few seconds
+    """
+    import time
+    from src import main
+    from src.main import mock_graph
+
+    rows = [{"name": f"user{i}", "age": i % 90} for i in range(100_000)]
+    request_data = {
+        "query": "UNWIND $rows AS row CREATE (p:Person {name: row.name, age: row.age})",
+        "parameters": {"rows": rows},
+        "created_only": True,
+    }
+
+    start_time = time.time()
+    response = client.post("/query", json=request_data)
+    elapsed = time.time() - start_time
+
+    assert response.status_code == 200
+    nodes = response.json()["nodes"]
+    try:
+        assert len(nodes) == len(rows)
+        ids = [node["id"] for node in nodes]
+        assert ids == sorted(set(ids))
+        assert nodes[-1]["properties"] == {"name": "user99999", "age": 99999 % 90}
+        assert elapsed < 10
+    finally:
+        mock_graph.remove_nodes_from(node["id"] for node in nodes)
+        main.graph_version.bump()
+
+
+def test_bulk_batches_skip_the_parameter_type_scan(monkeypatch):
+    """Test that writes do not rebuild the property-type index.
+
+    Expected Outcome:
+        - Consecutive UNWIND batches never consult the index
+        - The next parameterized read consults it and still rejects a wrong type
+    """
+    from src import main
+
+    lookups = []
+    original = main.property_types.get
+    monkeypatch.setattr(main.property_types, "get", lambda *args: lookups.append(args) or original(*args))
+
+    created = []
+    try:
+        for batch in range(3):
+            rows = [{"name": f"batch{batch}-{i}", "age": i} for i in range(100)]
+            response = client.post("/query", json={
+                "query": "UNWIND $rows AS row CREATE (n:Person) SET n = row",
+                "parameters": {"rows": rows},
+                "created_only": True,
+            })
+            created += response.json()["nodes"]
+        assert lookups == []
+
+        query = "MATCH (p:Person) WHERE p.age > $age RETURN p"
+        assert client.post("/query", json={"query": query, "parameters": {"age": "x"}}).status_code == 422
+        assert len(lookups) == 1
+    finally:
+        main.mock_graph.remove_nodes_from(node["id"] for node in created)
+        main.graph_version.bump()
+
+
+def test_query_stream_ndjson():
+    """Test the streaming /query/stream endpoint.
+
+    Purpose:
+        Verify that graph results are streamed as newline-delimited JSON records.
+
+    Expected Outcome:
+        - Status code should be 200 with an NDJSON content type
+        - Node records come before relationship records
+        - Records carry the same fields as the /query response items
+    """
+    import json
+
+    response = client.post("/query/stream", json={"query": "MATCH (n) RETURN n"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    kinds = [record["record"] for record in records]
+    assert kinds == sorted(kinds, key=lambda kind: kind != "node")
+    assert {"id", "labels", "properties"} <= set(records[0])
+    relationships = [record for record in records if record["record"] == "relationship"]
+    assert {"KNOWS", "WORKS_AT"} <= {rel["type"] for rel in relationships}
+
+
+def test_query_stream_chunks_large_result():
+    """Test that large streamed results match the buffered endpoint.
+
+    Expected Outcome:
+        - The stream spans several chunks and contains every node exactly once
+    """
+    import json
+    from src import main
+
+    rows = [{"name": f"stream{i}"} for i in range(3 * main.STREAM_CHUNK_SIZE)]
+    created = client.post("/query", json={
+        "query": "UNWIND $rows AS row CREATE (n:Person) SET n = row",
+        "parameters": {"rows": rows},
+        "created_only": True,
+    }).json()["nodes"]
+    try:
+        with client.stream("POST", "/query/stream", json={"query": "MATCH (n) RETURN n"}) as response:
+            chunks = list(response.iter_bytes())
+        records = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        node_ids = [record["id"] for record in records if record["record"] == "node"]
+        assert len(node_ids) == len(set(node_ids)) == main.mock_graph.number_of_nodes()
+    finally:
+        main.mock_graph.remove_nodes_from(node["id"] for node in created)
+        main.graph_version.bump()
+
+
+def test_snapshot_endpoint_requires_data_dir(monkeypatch):
+    """Test the /admin/snapshot endpoint when persistence is not configured.
+
+    Expected Outcome:
+        - Without the admin token the request is refused with 403
+        - Status code should be 409 with a hint about NEO4J_MOCK_DATA_DIR
+    """
+    from dataclasses import replace
+    from src import main
+
+    monkeypatch.setattr(main.profiler, "settings", replace(main.profiler.settings, token="secret"))
+    assert client.post("/admin/snapshot").status_code == 403
+
+    response = client.post("/admin/snapshot", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 409
+    assert "NEO4J_MOCK_DATA_DIR" in response.json()["detail"]
+
+
+def test_snapshot_endpoint_writes_in_offload_pool(monkeypatch, tmp_path):
+    """Test /admin/snapshot with persistence configured.
+
+    Expected Outcome:
+        - The snapshot is written on a neo4j-offload thread, with writes paused meanwhile
+        - The write barrier is lifted once it is done
+    """
+    import threading
+    from dataclasses import replace
+    from src import main
+    from src.snapshot import GraphSnapshotStore
+
+    store = GraphSnapshotStore(tmp_path)
+    save = store.save
+    seen = []
+
+    def recording_save(graph, next_node_id):
+        seen.append((threading.current_thread().name, main.graph_maintenance))
+        return save(graph, next_node_id)
+
+    monkeypatch.setattr(store, "save", recording_save)
+    monkeypatch.setattr(main, "snapshot_store", store)
+    monkeypatch.setattr(main.profiler, "settings", replace(main.profiler.settings, token="secret"))
+
+    response = client.post("/admin/snapshot", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["generation"] == 1
+    assert seen[0][0].startswith("neo4j-offload")
+    assert seen[0][1] == "snapshot"
+    assert main.graph_maintenance is None
+    store.close()
+
+
+def test_repeated_read_served_from_cache():
+    """Test that identical reads between writes are served from the query cache.
+
+    Purpose:
+        Verify cache keys ignore whitespace differences and hits skip traversal.
+
+    Expected Outcome:
+        - Second request is a cache hit with an identical body
+        - A CREATE invalidates the entry and the next read reflects the new node
+    """
+    from src import main
+
+    first = client.post("/query", json={"query": "MATCH (n)  RETURN n", "parameters": {"name": "John"}})
+    second = client.post("/query", json={"query": "MATCH (n)\nRETURN n", "parameters": {"name": "John"}})
+    assert first.headers["X-Cache"] == "miss"
+    assert second.headers["X-Cache"] == "hit"
+    assert first.content == second.content
+
+    created = client.post("/query", json={
+        "query": "CREATE (p:Person {name: 'Cached', age: 40})", "created_only": True,
+    })
+    try:
+        third = client.post("/query", json={"query": "MATCH (n) RETURN n", "parameters": {"name": "John"}})
+        assert third.headers["X-Cache"] == "miss"
+        names = {node["properties"].get("name") for node in third.json()["nodes"]}
+        assert "Cached" in names
+    finally:
+        main.mock_graph.remove_nodes_from(node["id"] for node in created.json()["nodes"])
+        main.graph_version.bump()
+
+
+def test_cache_key_includes_parameters():
+    """Test that different parameters do not share a cache entry.
+
+    Expected Outcome:
+        - An invalid parameter type is still rejected after a valid read was cached
+    """
+    query = "MATCH (p:Person) WHERE p.age > $age RETURN p"
+    assert client.post("/query", json={"query": query, "parameters": {"age": 20}}).status_code == 200
+    response = client.post("/query", json={"query": query, "parameters": {"age": "twenty"}})
+    assert response.status_code == 422
+
+
+def test_analytics_computed_in_background():
+    """Test the /analytics endpoints and their per-version result cache.
+
+    Purpose:
+        Verify results are computed in a background task and reused until the graph changes.
+
+    Expected Outcome:
+        - First request returns 202 while the background task computes the result
+        - Next request returns ready results, with John as the most connected node
+        - After a write, the previous result is served as stale
+    """
+    from src import main
+
+    first = client.get("/analytics/degree")
+    assert first.status_code == 202
+    assert first.json()["status"] == "pending"
+
+    ready = client.get("/analytics/degree", params={"limit": 1})
+    assert ready.status_code == 200
+    data = ready.json()
+    assert data["status"] == "ready"
+    assert data["results"][0]["id"] == 1
+    assert data["results"][0]["out_degree"] == 2
+
+    created = client.post("/query", json={
+        "query": "CREATE (p:Person {name: 'Stale'})", "created_only": True,
+    }).json()["nodes"]
+    try:
+        stale = client.get("/analytics/degree")
+        assert stale.json()["status"] == "stale"
+        assert stale.json()["computed_at_version"] < stale.json()["graph_version"]
+    finally:
+        main.mock_graph.remove_nodes_from(node["id"] for node in created)
+        main.graph_version.bump()
+
+
+def test_analytics_result_is_stored_under_the_version_it_was_computed_from():
+    """Test a recompute whose graph changed between scheduling and running.
+
+    Expected Outcome:
+        - The result carries the graph version read together with the adjacency
+        - It includes the node written after the recompute was scheduled
+        - The scheduled version's pending claim is released
+    """
+    import asyncio
+
+    from src import main
+    from src.analytics_cache import Algorithm
+
+    scheduled = main.graph_version.value
+    assert main.analytics_cache.mark_pending(Algorithm.DEGREE, scheduled)
+    created = client.post("/query", json={
+        "query": "CREATE (p:Person {name: 'Late'})", "created_only": True,
+    }).json()["nodes"]
+    try:
+        asyncio.run(main.recompute_analytics(Algorithm.DEGREE, scheduled))
+        result = main.analytics_cache.get(Algorithm.DEGREE)
+        assert result.version == main.graph_version.value > scheduled
+        assert created[0]["id"] in result.node_ids.tolist()
+        assert not main.analytics_cache.is_pending(Algorithm.DEGREE)
+    finally:
+        main.mock_graph.remove_nodes_from(node["id"] for node in created)
+        main.graph_version.bump()
+
+
+def test_analytics_pagerank_and_communities():
+    """Test PageRank and community detection through the API.
+
+    Expected Outcome:
+        - PageRank scores form a probability distribution
+        - Communities cover every node in the graph
+        - Unknown algorithms are rejected with 422
+    """
+    from src import main
+
+    for algorithm in ("pagerank", "communities"):
+        client.get(f"/analytics/{algorithm}")
+
+    pagerank = client.get("/analytics/pagerank", params={"limit": 1000}).json()
+    assert abs(sum(entry["score"] for entry in pagerank["results"]) - 1.0) < 1e-6
+
+    communities = client.get("/analytics/communities", params={"limit": 1000}).json()
+    members = [node for community in communities["results"] for node in community["members"]]
+    assert sorted(members) == sorted(main.mock_graph.nodes)
+
+    assert client.get("/analytics/betweenness").status_code == 422
+
+
+def test_large_read_encoded_off_the_event_loop(monkeypatch):
+    """Test that reads above the offload threshold are serialized in the offload pool.
+
+    Expected Outcome:
+        - A small graph is encoded inline; above the threshold a neo4j-offload thread encodes it
+        - The response body is the same either way
+    """
+    import threading
+    from src import main
+
+    threads = []
+    encode_graph = main.encode_graph
+
+    def recording_encode(node_data, edge_data):
+        threads.append(threading.current_thread().name)
+        return encode_graph(node_data, edge_data)
+
+    monkeypatch.setattr(main, "encode_graph", recording_encode)
+    main.graph_version.bump()
+    inline = client.post("/query", json={"query": "MATCH (n) RETURN n"})
+
+    monkeypatch.setattr(main, "OFFLOAD_THRESHOLD", 1)
+    main.graph_version.bump()
+    offloaded = client.post("/query", json={"query": "MATCH (n) RETURN n"})
+
+    assert not threads[0].startswith("neo4j-offload")
+    assert threads[1].startswith("neo4j-offload")
+    assert offloaded.content == inline.content
+
+
+def test_metrics_endpoint_reports_query_stages():
+    """Test that /metrics exposes request latency and /query stage timings.
+
+    Expected Outcome:
+        - /query appears in the request latency histogram under its status
+        - Parsing, execution and serialization of an uncached read are timed as stages
+    """
+    from src import main
+
+    main.graph_version.bump()
+    client.post("/query", json={"query": "MATCH (n) RETURN n"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="POST",route="/query",status="200"}' in response.text
+    for name in ("parse", "execute", "serialize"):
+        assert f'stage_duration_seconds_count{{stage="{name}"}}' in response.text
+
+
+def test_query_continues_caller_trace(monkeypatch):
+    """Test that /query records its stages as spans of the caller's trace.
+
+    Expected Outcome:
+        - The server span continues the trace of the incoming traceparent
+        - Parse, execute and serialize spans are children of the server span
+    """
+    from src import main
+    from service_common.tracing import SpanExporter
+
+    class ListExporter(SpanExporter):
+        def __init__(self):
+            self.spans = []
+
+        def export(self, span):
+            self.spans.append(span)
+
+    monkeypatch.setattr(main.tracer, "exporter", ListExporter())
+    main.graph_version.bump()
+    trace_id = "0af7651916cd43dd8448eb211c80319c"
+    client.post("/query", json={"query": "MATCH (n) RETURN n"},
+                headers={"traceparent": f"00-{trace_id}-b7ad6b7169203331-01"})
+
+    spans = {span.name: span for span in main.tracer.exporter.spans}
+    server = spans["POST /query"]
+    assert server.parent_id == "b7ad6b7169203331"
+    for name in ("parse", "execute", "serialize"):
+        assert spans[name].context.trace_id == trace_id
+        assert spans[name].parent_id == server.context.span_id
+
+
+def test_profiling_disabled_without_token():
+    """Test that the profiling endpoint is admin-only.
+
+    Expected Outcome:
+        - Without NEO4J_MOCK_PROFILING_TOKEN, profiling is refused with 403
+    """
+    assert client.post("/admin/profile?seconds=1", headers={"X-Admin-Token": "x"}).status_code == 403
+
+
+def test_startup_defers_numeric_imports():
+    """Test that starting the service does not import NumPy or SciPy.
+
+    Expected Outcome:
+        - A fresh interpreter importing the app has loaded neither, nor the analytics module
+        - Both load with the first analytics recompute
+    """
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    script = (
+        "import sys\n"
+        "from fastapi.testclient import TestClient\n"
+        "from src.main import app\n"
+        "loaded = lambda: [m for m in ('numpy', 'scipy', 'src.analytics') if m in sys.modules]\n"
+        "print(loaded())\n"
+        "client = TestClient(app)\n"
+        "client.get('/analytics/degree')\n"
+        "print(loaded())\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], cwd=Path(__file__).parents[1],
+                            capture_output=True, text=True, check=True).stdout
+    assert output.splitlines() == ["[]", "['numpy', 'scipy', 'src.analytics']"]
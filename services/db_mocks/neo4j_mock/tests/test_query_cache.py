@@ -0,0 +1,44 @@
+from src.query_cache import QueryCache, make_cache_key
+
+
+def test_cache_entry_invalidated_by_version():
+    """Test that entries are only served for the version they were stored under.
+
+    Expected Outcome:
+        - Lookup with a newer graph version misses and drops the stale entry
+    """
+    cache = QueryCache()
+    key = make_cache_key("MATCH (n) RETURN n", None)
+    cache.put(key, 1, b"{}")
+    assert cache.get(key, 1) == b"{}"
+    assert cache.get(key, 2) is None
+    assert len(cache) == 0
+
+
+def test_cache_key_canonical_parameters():
+    """Test that parameter order does not change the cache key.
+
+    Expected Outcome:
+        - Equal parameter maps in different order produce the same key
+    """
+    assert make_cache_key("RETURN 1", {"a": 1, "b": 2}) == make_cache_key(" RETURN  1 ", {"b": 2, "a": 1})
+
+
+def test_cache_bounded_by_entries_and_bytes():
+    """Test LRU eviction by entry count and by total payload size.
+
+    Expected Outcome:
+        - Least recently used entries are evicted first
+        - Total cached bytes never exceed the configured budget
+    """
+    cache = QueryCache(max_entries=2, max_bytes=10)
+    cache.put(("a", ""), 0, b"1234")
+    cache.put(("b", ""), 0, b"1234")
+    cache.get(("a", ""), 0)
+    cache.put(("c", ""), 0, b"1234")
+    assert cache.get(("b", ""), 0) is None
+    assert cache.get(("a", ""), 0) == b"1234"
+
+    cache.put(("d", ""), 0, b"12345678")
+    assert cache.stats()["bytes"] <= 10
+    assert cache.get(("d", ""), 0) == b"12345678"
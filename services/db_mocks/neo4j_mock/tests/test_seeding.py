@@ -0,0 +1,138 @@
+from dataclasses import replace
+
+import networkx as nx
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src import main
+from src.seeding import GraphSeed, main as seeding_main, power_law_edges, seed_graph
+from src.snapshot import GraphSnapshotStore
+
+client = TestClient(main.app)
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def test_power_law_edges_are_deterministic_and_skewed():
+    """Test the synthetic edge generator.
+
+    Expected Outcome:
+        - Equal seeds give equal edges, different seeds different ones
+        - No self loops, and in-degrees are heavy-tailed (hubs far above the mean)
+    """
+    spec = GraphSeed(nodes=10_000, edges_per_node=3, seed=7)
+    sources, targets = power_law_edges(spec)
+    again = power_law_edges(spec)
+    assert np.array_equal(sources, again[0]) and np.array_equal(targets, again[1])
+    assert not np.array_equal(targets, power_law_edges(GraphSeed(nodes=10_000, edges_per_node=3, seed=8))[1])
+
+    assert not np.any(sources == targets)
+    in_degree = np.bincount(targets, minlength=spec.nodes + 1)
+    assert in_degree.max() > 20 * in_degree.mean()
+
+
+def test_seed_graph_replaces_contents():
+    """Test bulk-loading a synthetic graph into an existing one."""
+    graph = nx.DiGraph([(1, 5000)])
+    relationships = seed_graph(graph, GraphSeed(nodes=1000))
+    assert graph.number_of_nodes() == 1000
+    assert graph.number_of_edges() == relationships > 1000
+    assert 5000 not in graph and not graph.has_edge(1, 5000)
+    assert graph.nodes[1]["labels"] == ["Person"]
+
+
+def test_admin_seed_endpoint(monkeypatch):
+    """Test POST /admin/seed.
+
+    Expected Outcome:
+        - Only requests carrying the admin token may seed
+        - The served graph is replaced and cached reads are invalidated
+        - New CREATEs get ids after the seeded nodes
+        - Invalid sizes are rejected with 422
+    """
+    monkeypatch.setattr(main, "mock_graph", main.mock_graph.copy())
+    client.post("/query", json={"query": "MATCH (n) RETURN n"})
+
+    monkeypatch.setattr(main.profiler, "settings", replace(main.profiler.settings, token="secret"))
+    spec = {"nodes": 500, "edges_per_node": 2, "seed": 1}
+    assert client.post("/admin/seed", json=spec).status_code == 403
+    assert client.post("/admin/seed", json=spec, headers={"X-Admin-Token": "x"}).status_code == 403
+
+    response = client.post("/admin/seed", json=spec, headers=ADMIN)
+    assert response.status_code == 200
+    assert response.json()["nodes"] == 500
+    assert response.json()["snapshot_generation"] is None
+
+    nodes = client.post("/query", json={"query": "MATCH (n) RETURN n"}).json()["nodes"]
+    assert len(nodes) == 500
+    created = client.post("/query", json={
+        "query": "CREATE (p:Person {name: 'New', age: 1})", "created_only": True,
+    }).json()
+    assert created["nodes"][0]["id"] > 500
+
+    assert client.post("/admin/seed", json={"nodes": 0}, headers=ADMIN).status_code == 422
+
+
+def test_writes_are_rejected_while_seeding(monkeypatch):
+    """Test CREATEs that arrive while /admin/seed is building the new graph.
+
+    Expected Outcome:
+        - The CREATE is rejected with 409 instead of being acknowledged and then discarded
+        - A second seed is rejected too; writes are accepted again once the seed is done
+    """
+    import asyncio
+    import threading
+
+    import httpx
+
+    monkeypatch.setattr(main, "mock_graph", main.mock_graph.copy())
+    monkeypatch.setattr(main.profiler, "settings", replace(main.profiler.settings, token="secret"))
+    building = threading.Event()
+    release = threading.Event()
+
+    def slow_seed_graph(graph, spec):
+        building.set()
+        release.wait(5)
+        return seed_graph(graph, spec)
+
+    monkeypatch.setattr("src.seeding.seed_graph", slow_seed_graph)
+    create = {"query": "CREATE (p:Person {name: 'Late'})"}
+
+    async def seed_with_concurrent_writes():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://neo4j") as http:
+            seeding = asyncio.create_task(
+                http.post("/admin/seed", json={"nodes": 50}, headers=ADMIN))
+            while not building.is_set():
+                await asyncio.sleep(0.001)
+            during = await http.post("/query", json=create)
+            second = await http.post("/admin/seed", json={"nodes": 50}, headers=ADMIN)
+            release.set()
+            seeded = await seeding
+            after = await http.post("/query", json=create)
+            return during, second, seeded, after
+
+    during, second, seeded, after = asyncio.run(seed_with_concurrent_writes())
+    assert during.status_code == 409
+    assert second.status_code == 409
+    assert seeded.status_code == 200
+    assert after.status_code == 200
+    names = [data["properties"].get("name") for _, data in main.mock_graph.nodes(data=True)]
+    assert names.count("Late") == 1
+
+
+def test_seeding_cli_writes_warm_start_snapshot(tmp_path, capsys):
+    """Test `python -m src.seeding`, which precomputes a graph for NEO4J_MOCK_DATA_DIR.
+
+    Expected Outcome:
+        - The snapshot loads back as the same graph seed_graph builds
+        - New node ids start after the seeded ones
+    """
+    seeding_main([str(tmp_path), "--nodes", "300", "--seed", "2"])
+    assert '"generation": 1' in capsys.readouterr().out
+
+    expected = nx.DiGraph()
+    seed_graph(expected, GraphSeed(nodes=300, seed=2))
+    loaded = nx.DiGraph()
+    assert GraphSnapshotStore(tmp_path).load_into(loaded) == 301
+    assert sorted(loaded.edges) == sorted(expected.edges)
+    assert loaded.nodes[7] == expected.nodes[7]
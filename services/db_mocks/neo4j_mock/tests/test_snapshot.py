@@ -0,0 +1,163 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.snapshot import GraphSnapshotStore
+
+
+def build_graph(node_count: int) -> nx.DiGraph:
+    graph = nx.DiGraph()
+    graph.add_nodes_from(
+        (i, {"labels": ["Person"], "properties": {"name": f"p{i}", "age": i % 80}})
+        for i in range(1, node_count + 1)
+    )
+    graph.add_edges_from(
+        (i, i + 1, {"type": "KNOWS", "properties": {"since": 2000 + i % 20}})
+        for i in range(1, node_count)
+    )
+    return graph
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Test saving and loading a graph snapshot.
+
+    Purpose:
+        Verify that topology, attributes and the id allocator position survive a restart.
+
+    Expected Outcome:
+        - Loaded graph has identical nodes, edges and attributes
+        - Topology is stored as int64 NumPy arrays
+    """
+    graph = build_graph(1000)
+    store = GraphSnapshotStore(tmp_path)
+    meta = store.save(graph, next_node_id=1001)
+    assert meta["nodes"] == 1000 and meta["edges"] == 999
+
+    assert np.load(tmp_path / "snapshot-1" / "edge_src.npy").dtype == np.int64
+
+    restored = nx.DiGraph()
+    assert GraphSnapshotStore(tmp_path).load_into(restored) == 1001
+    assert dict(restored.nodes(data=True)) == dict(graph.nodes(data=True))
+    assert list(restored.edges(data=True)) == list(graph.edges(data=True))
+
+
+def test_mutation_log_replay(tmp_path):
+    """Test replay of mutations appended after the last snapshot.
+
+    Expected Outcome:
+        - Logged nodes and edges are applied on load
+        - The returned next id is past every replayed node
+    """
+    store = GraphSnapshotStore(tmp_path)
+    store.save(build_graph(3), next_node_id=4)
+    store.append({"op": "add_nodes", "nodes": [[10, ["Company"], {"name": "Acme, Inc."}]]})
+    store.append({"op": "add_edges", "edges": [[1, 10, "WORKS_AT", {"role": "CTO"}]]})
+    store.close()
+
+    restored = nx.DiGraph()
+    assert GraphSnapshotStore(tmp_path).load_into(restored) == 11
+    assert restored.nodes[10] == {"labels": ["Company"], "properties": {"name": "Acme, Inc."}}
+    assert restored.edges[1, 10]["type"] == "WORKS_AT"
+
+
+def test_torn_final_log_line_is_dropped(tmp_path, caplog):
+    """Test loading a log whose last append was cut short by a crash.
+
+    Expected Outcome:
+        - Complete lines are replayed and the torn tail is logged and truncated away
+        - Appends after the load start on a line of their own
+    """
+    store = GraphSnapshotStore(tmp_path, fsync=True)
+    store.save(build_graph(3), next_node_id=4)
+    store.append({"op": "add_nodes", "nodes": [[10, ["Company"], {}]]})
+    store.close()
+    with open(tmp_path / "mutations-1.log", "a") as f:
+        f.write('{"op":"add_nodes","nodes":[[11,')
+
+    restored = nx.DiGraph()
+    assert GraphSnapshotStore(tmp_path).load_into(restored) == 11
+    assert 11 not in restored
+    assert "torn final line" in caplog.text
+
+    store = GraphSnapshotStore(tmp_path)
+    store.append({"op": "add_nodes", "nodes": [[12, ["Company"], {}]]})
+    store.close()
+    restored = nx.DiGraph()
+    assert GraphSnapshotStore(tmp_path).load_into(restored) == 13
+
+
+def test_corrupt_log_line_fails_loudly(tmp_path):
+    """Test that a damaged line before the end of the log is not skipped.
+
+    Expected Outcome:
+        - Loading raises ValueError naming the line
+    """
+    store = GraphSnapshotStore(tmp_path)
+    store.save(build_graph(3), next_node_id=4)
+    store.close()
+    (tmp_path / "mutations-1.log").write_text(
+        '{"op":"add_nodes","nodes":[[10,["Company"],{}]]}\n'
+        '{"op":"add_no\n'
+        '{"op":"add_nodes","nodes":[]}\n'
+    )
+
+    with pytest.raises(ValueError, match="line 2"):
+        GraphSnapshotStore(tmp_path).load_into(nx.DiGraph())
+
+
+def test_failed_save_closes_log(tmp_path, monkeypatch):
+    """Test that a save failing midway leaves the store usable.
+
+    Expected Outcome:
+        - The log handle is closed and the next append reopens the still-current log
+    """
+    store = GraphSnapshotStore(tmp_path)
+    store.save(build_graph(3), next_node_id=4)
+    store.append({"op": "add_nodes", "nodes": [[4, ["Person"], {}]]})
+
+    def failing_save(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(np, "save", failing_save)
+    with pytest.raises(OSError):
+        store.save(build_graph(4), next_node_id=5)
+    monkeypatch.undo()
+
+    assert store._log_fd is None
+    store.append({"op": "add_nodes", "nodes": [[5, ["Person"], {}]]})
+    store.close()
+    restored = nx.DiGraph()
+    assert GraphSnapshotStore(tmp_path).load_into(restored) == 6
+
+
+def test_new_snapshot_truncates_log(tmp_path):
+    """Test that saving a new generation supersedes the old snapshot and log.
+
+    Expected Outcome:
+        - Only the newest generation remains on disk
+        - Its mutation log starts empty
+    """
+    store = GraphSnapshotStore(tmp_path)
+    graph = build_graph(3)
+    store.save(graph, next_node_id=4)
+    store.append({"op": "add_nodes", "nodes": [[4, ["Person"], {}]]})
+    graph.add_node(4, labels=["Person"], properties={})
+    store.save(graph, next_node_id=5)
+
+    assert store.generation == 2
+    assert not (tmp_path / "snapshot-1").exists()
+    assert not (tmp_path / "mutations-1.log").exists()
+    restored = nx.DiGraph()
+    assert store.load_into(restored) == 5
+    assert restored.number_of_nodes() == 4
+
+
+def test_empty_directory_has_no_snapshot(tmp_path):
+    """Test loading from a directory without a snapshot.
+
+    Expected Outcome:
+        - load_into returns None and leaves the graph untouched
+    """
+    graph = nx.DiGraph()
+    assert GraphSnapshotStore(tmp_path).load_into(graph) is None
+    assert graph.number_of_nodes() == 0
@@ -0,0 +1,42 @@
+"""Synthetic tables (see src/seeding.py) for the relational_mock micro-benchmarks.
+
+Run with ``pytest benchmarks`` (plain ``pytest`` only collects tests/). Table sizes
+range from the three sample rows up to 10^6 rows; set BENCHMARK_MAX_SIZE to stop
+earlier, e.g. ``BENCHMARK_MAX_SIZE=10000 pytest benchmarks``.
+"""
+import os
+from typing import Dict
+
+import pytest
+
+from src import main
+from src.columns import ColumnTable
+from src.seeding import TableSeed, relational_tables
+
+MAX_SIZE = int(os.getenv("BENCHMARK_MAX_SIZE", str(10**6)))
+SIZES = [size for size in (3, 10**2, 10**3, 10**4, 10**5, 10**6) if size <= MAX_SIZE]
+# The JOIN materialises every joined row, so it stops at 10^5 rows each
+JOIN_SIZES = [size for size in SIZES if size <= 10**5]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"rows={size}")
+def tables(request) -> Dict[str, ColumnTable]:
+    return relational_tables(TableSeed(users=request.param, posts_per_user=1, comments_per_post=1))
+
+
+@pytest.fixture(scope="module", params=JOIN_SIZES, ids=lambda size: f"rows={size}")
+def join_tables(request) -> Dict[str, ColumnTable]:
+    return relational_tables(TableSeed(users=request.param, posts_per_user=1, comments_per_post=1))
+
+
+@pytest.fixture
+def use_tables(tables, monkeypatch) -> Dict[str, ColumnTable]:
+    """Query the synthetic tables instead of the sample data."""
+    monkeypatch.setattr(main, "mock_data", tables)
+    return tables
+
+
+@pytest.fixture
+def use_join_tables(join_tables, monkeypatch) -> Dict[str, ColumnTable]:
+    monkeypatch.setattr(main, "mock_data", join_tables)
+    return join_tables
@@ -0,0 +1,35 @@
+import pytest
+
+from src import main
+
+
+@pytest.mark.parametrize("columns", [1, 10, 100])
+def test_parse_select_columns(benchmark, columns):
+    """SELECT-list parsing, by number of selected columns."""
+    query = f"SELECT {', '.join(f'u.col_{index}' for index in range(columns))} FROM users u"
+    assert len(benchmark(main.parse_select_columns, query)) == columns
+
+
+@pytest.mark.parametrize("joins", [1, 10, 100])
+def test_parse_join_tables(benchmark, joins):
+    """FROM/JOIN table parsing, by number of joined tables."""
+    query = "SELECT * FROM users u " + " ".join(f"JOIN posts p{index} ON u.id = p{index}.user_id" for index in range(joins))
+    assert len(benchmark(main.parse_join_tables, query)) == joins + 1
+
+
+def test_select_point_lookup(benchmark, use_tables):
+    """`WHERE id = ?` lookup: a whole-column comparison plus one materialised row."""
+    request = main.QueryRequest(query="SELECT * FROM users WHERE id = 2", query_type="SELECT")
+    assert len(benchmark(main.run_query, request).results) == 1
+
+
+def test_select_all(benchmark, use_tables):
+    """Full-table SELECT, materialising every row."""
+    request = main.QueryRequest(query="SELECT username, email FROM users", query_type="SELECT")
+    assert len(benchmark(main.run_query, request).results) == len(use_tables["users"])
+
+
+def test_join(benchmark, use_join_tables):
+    """users JOIN posts: an equi-join on the id columns plus the joined rows."""
+    request = main.QueryRequest(query="SELECT * FROM users u JOIN posts p ON u.id = p.user_id", query_type="SELECT")
+    assert len(benchmark(main.run_query, request).results) == len(use_join_tables["posts"])
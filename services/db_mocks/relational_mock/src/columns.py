@@ -0,0 +1,85 @@
+"""Column-oriented storage for the mock tables.
+
+Each table keeps one NumPy array per column instead of a list of row dicts. Rows are
+only materialised for the rows a query returns, filters compare whole columns at
+once, and the arrays can be memory-mapped so several worker processes share them.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+class ColumnTable:
+    """A read-only table stored as equally long, typed column arrays."""
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        lengths = {len(array) for array in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Columns must all have the same length")
+        self.columns = columns
+        self.size = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "ColumnTable":
+        """Build a table from row dicts that all share the first row's columns."""
+        names = list(rows[0]) if rows else []
+        columns = {}
+        for name in names:
+            array = np.array([row[name] for row in rows])
+            if array.dtype == object:
+                raise ValueError(f"Column '{name}' mixes types or contains NULLs")
+            columns[name] = array
+        return cls(columns)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # Materialises every row; loops over a whole table should call rows() once instead
+        return iter(self.rows())
+
+    def rows(self, indices: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Materialise the rows at ``indices`` (all rows when None) as plain dicts."""
+        names = list(self.columns)
+        values = [
+            (array if indices is None else array[indices]).tolist()
+            for array in self.columns.values()
+        ]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    def select(self, column: str, values: List[Any]) -> np.ndarray:
+        """Indices of the rows whose ``column`` equals any of ``values``.
+
+        Matching follows Python equality, so a string never matches a number even
+        though NumPy would happily coerce one into the other.
+        """
+        array = self.columns.get(column)
+        mask = np.zeros(self.size, dtype=bool)
+        if array is None:
+            return np.flatnonzero(mask)
+        is_text = array.dtype.kind == "U"
+        for value in values:
+            if isinstance(value, (str, int, float)) and isinstance(value, str) == is_text:
+                mask |= array == value
+        return np.flatnonzero(mask)
+
+
+def equi_join(left: np.ndarray, right: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Index pairs ``(i, j)`` with ``left[i] == right[j]``.
+
+    Pairs come in nested-loop order: by ``i``, then by ``j``. The right column is
+    sorted once and every left key finds its matches by binary search, so the join
+    costs O((n + m) log m + matches) instead of n * m row comparisons. As in
+    ``select``, text never matches numbers.
+    """
+    empty = np.zeros(0, dtype=np.intp)
+    if (left.dtype.kind == "U") != (right.dtype.kind == "U") or not left.size or not right.size:
+        return empty, empty
+    order = np.argsort(right, kind="stable")
+    ordered = right[order]
+    starts = np.searchsorted(ordered, left, side="left")
+    counts = np.searchsorted(ordered, left, side="right") - starts
+    left_indices = np.repeat(np.arange(left.size), counts)
+    # Position of every match within its left key's run of equal right keys
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return left_indices, order[np.repeat(starts, counts) + offsets]
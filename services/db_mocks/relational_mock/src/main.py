@@ -1,13 +1,38 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from pydantic import BaseModel, Field
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional
 from enum import Enum
+import asyncio
+import contextvars
+import os
+import time
 import re
+from service_common import shared_data
+from service_common.metrics import instrument, stage
+from service_common.profiling import ProfilingSettings, enable_profiling
+from service_common.tracing import TraceSettings, Tracer, trace_requests
+
+from .columns import ColumnTable, equi_join
+from .seeding import TableSeed, relational_tables
 
 app = FastAPI(title="Relational Mock Service")
+instrument(app)
+
+# Request traces continued from the MCP service (RELATIONAL_MOCK_TRACE_EXPORTER, RELATIONAL_MOCK_TRACE_SAMPLE_RATIO)
+tracer = Tracer(TraceSettings.from_env("RELATIONAL_MOCK_TRACE", "relational-mock"))
+trace_requests(app, tracer)
+
+# POST /admin/profile and X-Profile: 1 requests, enabled by RELATIONAL_MOCK_PROFILING_TOKEN
+profiler = enable_profiling(app, ProfilingSettings.from_env("RELATIONAL_MOCK", "relational-mock"))
 
-# Mock database tables with sample data
-mock_data = {
+# Hot-path stages of /query, exported as stage_duration_seconds on /metrics
+PARSE_STAGE = stage("parse")
+PLAN_STAGE = stage("plan")
+EXECUTE_STAGE = stage("execute")
+
+# Sample data, one list of rows per table
+sample_rows = {
     "users": [
         {"id": 1, "username": "john_doe", "email": "john@example.com", "active": True},
         {"id": 2, "username": "jane_smith", "email": "jane@example.com", "active": True},
@@ -25,6 +50,28 @@ mock_data = {
     ]
 }
 
+def attach_tables(directory: str) -> Dict[str, ColumnTable]:
+    """Map the tables published by the serving process"""
+    arrays, meta = shared_data.attach(directory)
+    return {
+        name: ColumnTable({column: arrays[f"{name}.{column}"] for column in columns})
+        for name, columns in meta["tables"].items()
+    }
+
+# Mock database tables stored column-wise. Workers started by `python -m src.serve`
+# map the columns published by the serving process instead of holding their own copy.
+SHARED_DIR = os.getenv("RELATIONAL_MOCK_SHARED_DIR")
+# Tables precomputed with `python -m src.seeding`, mapped instead of generated
+SNAPSHOT_DIR = os.getenv("RELATIONAL_MOCK_SNAPSHOT_DIR")
+# RELATIONAL_MOCK_SEED_USERS > 0 starts from synthetic tables with that many users
+SEED_USERS = int(os.getenv("RELATIONAL_MOCK_SEED_USERS", "0"))
+if SHARED_DIR or SNAPSHOT_DIR:
+    mock_data = attach_tables(SHARED_DIR or SNAPSHOT_DIR)
+elif SEED_USERS > 0:
+    mock_data = relational_tables(TableSeed(users=SEED_USERS, seed=int(os.getenv("RELATIONAL_MOCK_SEED", "0"))))
+else:
+    mock_data = {name: ColumnTable.from_rows(rows) for name, rows in sample_rows.items()}
+
 class QueryType(str, Enum):
     SELECT = "SELECT"
     INSERT = "INSERT"
@@ -87,19 +134,61 @@ def parse_join_tables(query: str) -> List[str]:
     
     return tables
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "relational-mock"}
+WHERE_FILTER = re.compile(
+    r"\bWHERE\s+(?:\w+\.)?(\w+)\s*(=|IN)\s*(\([^)]*\)|'[^']*'|:\w+|-?\d+|true|false)\s*;?\s*$",
+    re.IGNORECASE,
+)
 
-@app.post("/query", response_model=QueryResponse)
-async def execute_query(request: QueryRequest):
-    """Mock endpoint for executing SQL queries"""
+def parse_literal(token: str, parameters: Optional[Dict[str, Any]]) -> Any:
+    """Convert a SQL literal or :parameter reference into a Python value."""
+    token = token.strip()
+    if token.startswith(":"):
+        name = token[1:]
+        if not parameters or name not in parameters:
+            raise ValueError(f"Missing parameter '{name}'")
+        return parameters[name]
+    if token.startswith("'") and token.endswith("'"):
+        return token[1:-1]
+    if token.lower() in ("true", "false"):
+        return token.lower() == "true"
     try:
-        if request.query_type == QueryType.SELECT:
+        return int(token)
+    except ValueError:
+        raise ValueError(f"Unsupported literal: {token}")
+
+def parse_where_filter(query: str, parameters: Optional[Dict[str, Any]]) -> Optional[tuple]:
+    """Parse a single trailing `WHERE col = value` or `WHERE col IN (...)` condition.
+
+    Returns (column, allowed values) or None when the query has no such condition.
+    """
+    match = WHERE_FILTER.search(query)
+    if not match:
+        return None
+    column, operator, operand = match.groups()
+    if operator.upper() == "IN":
+        values = [parse_literal(token, parameters) for token in operand[1:-1].split(",") if token.strip()]
+    else:
+        values = [parse_literal(operand, parameters)]
+    return column, values
+
+class BatchQueryRequest(BaseModel):
+    queries: List[QueryRequest] = Field(..., min_length=1, description="Queries to run in one round trip")
+
+class BatchQueryResult(BaseModel):
+    status_code: int = Field(..., description="HTTP status the query would have returned on its own")
+    response: Optional[QueryResponse] = Field(default=None, description="Result of a successful query")
+    detail: Optional[str] = Field(default=None, description="Error detail of a failed query")
+
+class BatchQueryResponse(BaseModel):
+    results: List[BatchQueryResult]
+
+def run_query(request: QueryRequest) -> QueryResponse:
+    """Execute one mock query; raises ValueError for invalid queries"""
+    if request.query_type == QueryType.SELECT:
+        with PARSE_STAGE.time(), tracer.span("parse"):
             columns = parse_select_columns(request.query)
             tables = parse_join_tables(request.query)
-            
+
             if not tables:
                 raise ValueError("No tables specified in query")
 
@@ -110,10 +199,17 @@ async def execute_query(request: QueryRequest):
                     results=[],
                     message="No data found"
                 )
+            where = parse_where_filter(request.query, request.parameters) if len(tables) == 1 else None
 
+        with EXECUTE_STAGE.time(), tracer.span("execute", tables=",".join(tables)):
             if len(tables) == 1:
-                # Simple SELECT
-                results = mock_data[primary_table]
+                # Simple SELECT, optionally filtered by a single `col = value` / `col IN (...)` condition
+                table = mock_data[primary_table]
+                if where is not None:
+                    column, values = where
+                    results = table.rows(table.select(column, values))
+                else:
+                    results = table.rows()
                 if columns != ["*"]:
                     # Filter columns
                     results = [{k: row[k] for k in columns if k in row} for row in results]
@@ -123,74 +219,156 @@ async def execute_query(request: QueryRequest):
                 if join_table not in mock_data:
                     raise ValueError(f"Table {join_table} not found")
 
-                # Perform JOIN
-                for primary_row in mock_data[primary_table]:
-                    for join_row in mock_data[join_table]:
-                        if (join_table == "posts" and join_row["user_id"] == primary_row["id"]) or \
-                           (join_table == "comments" and join_row["user_id"] == primary_row["id"]):
-                            # Create joined result
-                            result = {}
-                            if columns == ["*"]:
-                                result.update(primary_row)
-                                result.update(join_row)
-                            else:
-                                for col in columns:
-                                    if col in primary_row:
-                                        result[col] = primary_row[col]
-                                    if col in join_row:
-                                        result[col] = join_row[col]
-                            if "active" in request.query.lower():
-                                if primary_row.get("active", True):  # Only include if active is True
-                                    results.append(result)
-                            else:
-                                results.append(result)
-            
-            return QueryResponse(
-                results=results,
-                message="No data found" if not results else None
-            )
-        
-        elif request.query_type == QueryType.INSERT:
-            # Check if we're testing data types
-            if "test_types" in request.query:
-                expected_types = {
-                    "int_val": int,
-                    "float_val": float,
-                    "text_val": str,
-                    "bool_val": bool,
-                }
-                validate_parameters(request.parameters, expected_types)
-            elif "users" in request.query:
-                expected_types = {
-                    "id": int,
-                    "active": bool
-                }
-                if not validate_parameters(request.parameters, expected_types):
-                    raise ValueError("Invalid parameter types")
-            
-            return QueryResponse(
-                affected_rows=1,
-                message="Record inserted successfully"
-            )
-        
-        elif request.query_type == QueryType.UPDATE:
-            return QueryResponse(
-                affected_rows=2,
-                message="Records updated successfully"
-            )
-        
-        elif request.query_type == QueryType.DELETE:
-            return QueryResponse(
-                affected_rows=1,
-                message="Record deleted successfully"
-            )
-        
-        raise HTTPException(status_code=400, detail="Invalid query type")
-        
+                # Perform JOIN: users with their posts or comments, matched on user_id
+                primary, joined = mock_data[primary_table], mock_data[join_table]
+                if join_table in ("posts", "comments") and "id" in primary.columns and "user_id" in joined.columns:
+                    primary_indices, join_indices = equi_join(primary.columns["id"], joined.columns["user_id"])
+                    if "active" in request.query.lower() and "active" in primary.columns:
+                        # Only include users whose active flag is True
+                        keep = primary.columns["active"][primary_indices].astype(bool)
+                        primary_indices, join_indices = primary_indices[keep], join_indices[keep]
+                    for primary_row, join_row in zip(primary.rows(primary_indices), joined.rows(join_indices)):
+                        # Create joined result
+                        result = {}
+                        if columns == ["*"]:
+                            result.update(primary_row)
+                            result.update(join_row)
+                        else:
+                            for col in columns:
+                                if col in primary_row:
+                                    result[col] = primary_row[col]
+                                if col in join_row:
+                                    result[col] = join_row[col]
+                        results.append(result)
+
+        return QueryResponse(
+            results=results,
+            message="No data found" if not results else None
+        )
+
+    elif request.query_type == QueryType.INSERT:
+        # Check if we're testing data types
+        if "test_types" in request.query:
+            expected_types = {
+                "int_val": int,
+                "float_val": float,
+                "text_val": str,
+                "bool_val": bool,
+            }
+            validate_parameters(request.parameters, expected_types)
+        elif "users" in request.query:
+            expected_types = {
+                "id": int,
+                "active": bool
+            }
+            if not validate_parameters(request.parameters, expected_types):
+                raise ValueError("Invalid parameter types")
+
+        return QueryResponse(
+            affected_rows=1,
+            message="Record inserted successfully"
+        )
+
+    elif request.query_type == QueryType.UPDATE:
+        return QueryResponse(
+            affected_rows=2,
+            message="Records updated successfully"
+        )
+
+    elif request.query_type == QueryType.DELETE:
+        return QueryResponse(
+            affected_rows=1,
+            message="Record deleted successfully"
+        )
+
+    raise HTTPException(status_code=400, detail="Invalid query type")
+
+# SELECTs scanning at least this many rows (both tables' for a JOIN) run in the offload pool,
+# so one large scan or join does not stall every other request on the loop
+OFFLOAD_THRESHOLD = int(os.getenv("RELATIONAL_MOCK_OFFLOAD_THRESHOLD", "10000"))
+offload_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RELATIONAL_MOCK_OFFLOAD_THREADS", "4")),
+    thread_name_prefix="relational-offload",
+)
+
+def query_cost(request: QueryRequest) -> int:
+    """Rows a query has to visit; a JOIN visits each row of both tables once"""
+    if request.query_type != QueryType.SELECT:
+        return 0
+    return sum(len(mock_data.get(table, ())) for table in parse_join_tables(request.query)[:2])
+
+async def run_sized(requests: List[QueryRequest], func: Callable[..., Any], *args: Any) -> Any:
+    """Call func inline for cheap requests, in the bounded offload pool for expensive ones"""
+    with PLAN_STAGE.time(), tracer.span("plan") as span:
+        cost = sum(query_cost(request) for request in requests)
+        span.set_attribute("cost", cost)
+    if cost < OFFLOAD_THRESHOLD:
+        return func(*args)
+    # Run in a copy of the request's context so spans recorded in the pool join its trace
+    return await asyncio.get_running_loop().run_in_executor(
+        offload_pool, contextvars.copy_context().run, func, *args
+    )
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint"""
+    return {"status": "healthy", "service": "relational-mock"}
+
+@app.post("/query", response_model=QueryResponse)
+async def execute_query(request: QueryRequest):
+    """Mock endpoint for executing SQL queries; unexpected errors surface as FastAPI's 500"""
+    try:
+        return await run_sized([request], run_query, request)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+
+def run_batch(batch: BatchQueryRequest) -> BatchQueryResponse:
+    """Execute every query of a batch, capturing each rejected query as that query's result.
+
+    Only the failures /query reports as client errors are captured; anything else is a
+    bug and fails the whole batch with 500, as it would fail /query.
+    """
+    results = []
+    for request in batch.queries:
+        try:
+            results.append(BatchQueryResult(status_code=200, response=run_query(request)))
+        except HTTPException as e:
+            results.append(BatchQueryResult(status_code=e.status_code, detail=str(e.detail)))
+        except ValueError as e:
+            results.append(BatchQueryResult(status_code=422, detail=str(e)))
+    return BatchQueryResponse(results=results)
+
+@app.post("/query/batch", response_model=BatchQueryResponse)
+async def execute_query_batch(batch: BatchQueryRequest):
+    """Run several queries in one round trip; each result carries its own status"""
+    return await run_sized(batch.queries, run_batch, batch)
+
+# Sized for tests and benchmarks; bigger tables are generated at startup (RELATIONAL_MOCK_SEED_USERS)
+class SeedRequest(BaseModel):
+    users: int = Field(..., gt=0, le=200_000, description="Number of users to generate")
+    posts_per_user: float = Field(default=3.0, gt=0, le=10, description="Average posts per user")
+    comments_per_post: float = Field(default=2.0, ge=0, le=10, description="Average comments per post")
+    skew: float = Field(default=1.1, ge=0, description="Zipf exponent of foreign-key popularity")
+    active_ratio: float = Field(default=0.8, ge=0, le=1, description="Share of active users")
+    seed: int = Field(default=0, description="Random seed; equal seeds generate equal tables")
+
+@app.post("/admin/seed", dependencies=[Depends(profiler.require_admin)])
+async def seed(request: SeedRequest):
+    """Replace all tables with synthetic data, generated column-wise in the offload pool"""
+    global mock_data
+    if SHARED_DIR:
+        raise HTTPException(
+            status_code=409,
+            detail="Workers share the tables published at startup; set RELATIONAL_MOCK_SEED_USERS instead",
+        )
+    started = time.perf_counter()
+    mock_data = await asyncio.get_running_loop().run_in_executor(
+        offload_pool, relational_tables, TableSeed(**request.model_dump())
+    )
+    return {
+        "rows": {name: len(table) for name, table in mock_data.items()},
+        "seconds": time.perf_counter() - started,
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,106 @@
+"""Deterministic synthetic tables for load and scaling tests.
+
+Generates users, posts and comments shaped like the sample data. Foreign keys are
+skewed the way real activity is: the user (or post) of rank r is referenced with
+probability proportional to r ** -skew, so a few authors write most posts and a few
+posts collect most comments. Columns are built directly as NumPy arrays, so loading
+N rows never materialises N row dicts.
+
+A pod started with ``RELATIONAL_MOCK_SEED_USERS`` generates its tables on every
+start. Write them once as a snapshot instead and point ``RELATIONAL_MOCK_SNAPSHOT_DIR``
+at it, so startup only maps the columns::
+
+    python -m src.seeding /data/relational --users 100000
+"""
+import argparse
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from service_common import shared_data
+
+from .columns import ColumnTable
+
+
+@dataclass(frozen=True)
+class TableSeed:
+    users: int
+    posts_per_user: float = 3.0
+    comments_per_post: float = 2.0
+    skew: float = 1.1
+    active_ratio: float = 0.8
+    seed: int = 0
+
+
+def skewed_keys(rng: np.random.Generator, keys: np.ndarray, count: int, skew: float) -> np.ndarray:
+    """``count`` references to ``keys`` with Zipf-like popularity over a shuffled ranking."""
+    weights = np.empty(keys.size)
+    weights[rng.permutation(keys.size)] = np.arange(1, keys.size + 1) ** -skew
+    return rng.choice(keys, size=count, p=weights / weights.sum())
+
+
+def labelled(prefix: str, ids: np.ndarray, suffix: str = "") -> np.ndarray:
+    """String column ``<prefix><id><suffix>`` for every id."""
+    text = np.char.add(prefix, ids.astype(str))
+    return np.char.add(text, suffix) if suffix else text
+
+
+def relational_tables(spec: TableSeed) -> Dict[str, ColumnTable]:
+    """users, posts and comments tables sized and skewed according to ``spec``."""
+    rng = np.random.default_rng(spec.seed)
+    user_ids = np.arange(1, spec.users + 1)
+    post_count = max(1, round(spec.users * spec.posts_per_user))
+    post_ids = np.arange(1, post_count + 1)
+    comment_ids = np.arange(1, round(post_count * spec.comments_per_post) + 1)
+
+    users = ColumnTable({
+        "id": user_ids,
+        "username": labelled("user_", user_ids),
+        "email": labelled("user_", user_ids, "@example.com"),
+        "active": rng.random(spec.users) < spec.active_ratio,
+    })
+    posts = ColumnTable({
+        "id": post_ids,
+        "user_id": skewed_keys(rng, user_ids, post_ids.size, spec.skew),
+        "title": labelled("Post ", post_ids),
+        "content": labelled("Synthetic post ", post_ids),
+    })
+    comments = ColumnTable({
+        "id": comment_ids,
+        "post_id": skewed_keys(rng, post_ids, comment_ids.size, spec.skew),
+        "user_id": skewed_keys(rng, user_ids, comment_ids.size, spec.skew),
+        "content": labelled("Comment ", comment_ids),
+    })
+    return {"users": users, "posts": posts, "comments": comments}
+
+
+def publish_tables(directory: os.PathLike, tables: Dict[str, ColumnTable]) -> None:
+    """Publish every column of ``tables`` in the layout the service attaches to."""
+    shared_data.publish(
+        directory,
+        {f"{name}.{column}": array for name, table in tables.items() for column, array in table.columns.items()},
+        {"tables": {name: list(table.columns) for name, table in tables.items()}},
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.seeding",
+                                     description="Write synthetic tables as a snapshot directory.")
+    parser.add_argument("directory", help="Snapshot directory, as RELATIONAL_MOCK_SNAPSHOT_DIR")
+    parser.add_argument("--users", type=int, required=True)
+    parser.add_argument("--posts-per-user", type=float, default=TableSeed.posts_per_user)
+    parser.add_argument("--comments-per-post", type=float, default=TableSeed.comments_per_post)
+    parser.add_argument("--skew", type=float, default=TableSeed.skew)
+    parser.add_argument("--active-ratio", type=float, default=TableSeed.active_ratio)
+    parser.add_argument("--seed", type=int, default=TableSeed.seed)
+    args = parser.parse_args(argv)
+
+    tables = relational_tables(TableSeed(args.users, args.posts_per_user, args.comments_per_post,
+                                         args.skew, args.active_ratio, args.seed))
+    publish_tables(args.directory, tables)
+    print(f"Wrote {', '.join(f'{len(table)} {name}' for name, table in tables.items())} to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Run the mock with one or more uvicorn worker processes.
+
+With ``RELATIONAL_MOCK_WORKERS`` > 1 this process owns the tables: it publishes
+their columns as memory-mapped arrays once and points every worker at them through
+``RELATIONAL_MOCK_SHARED_DIR``, so workers share one copy of the data. The mock
+never mutates its tables (writes only report affected rows), so the published
+columns stay valid for the lifetime of the server. Tables precomputed with
+``python -m src.seeding`` and named by ``RELATIONAL_MOCK_SNAPSHOT_DIR`` are already
+in that layout, so workers then attach to them directly.
+
+    python -m src.serve
+"""
+import os
+import shutil
+import tempfile
+
+import uvicorn
+from service_common import shared_data
+
+HOST = os.getenv("RELATIONAL_MOCK_HOST", "0.0.0.0")
+PORT = int(os.getenv("RELATIONAL_MOCK_PORT", "8004"))
+WORKERS = int(os.getenv("RELATIONAL_MOCK_WORKERS", "1"))
+SNAPSHOT_DIR = os.getenv("RELATIONAL_MOCK_SNAPSHOT_DIR")
+
+
+def main() -> None:
+    if WORKERS <= 1:
+        uvicorn.run("src.main:app", host=HOST, port=PORT)
+        return
+    if SNAPSHOT_DIR:
+        os.environ["RELATIONAL_MOCK_SHARED_DIR"] = SNAPSHOT_DIR
+        uvicorn.run("src.main:app", host=HOST, port=PORT, workers=WORKERS)
+        return
+    from .main import mock_data
+    from .seeding import publish_tables
+
+    directory = tempfile.mkdtemp(prefix="relational-mock-", dir=shared_data.default_shared_root())
+    try:
+        publish_tables(directory, mock_data)
+        os.environ["RELATIONAL_MOCK_SHARED_DIR"] = directory
+        uvicorn.run("src.main:app", host=HOST, port=PORT, workers=WORKERS)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
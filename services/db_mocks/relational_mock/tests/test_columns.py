@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from src.columns import ColumnTable, equi_join
+from src.main import attach_tables, sample_rows
+from src.seeding import publish_tables
+
+
+def test_column_table_round_trips_rows():
+    """Test that rows stored column-wise come back as the original Python values.
+
+    Expected Outcome:
+        - ints, strings and booleans keep their Python types
+        - Columns with NULLs are rejected rather than stored as objects
+    """
+    table = ColumnTable.from_rows(sample_rows["users"])
+    assert len(table) == 3
+    assert table.rows() == sample_rows["users"]
+    assert type(table.rows()[0]["active"]) is bool
+
+    with pytest.raises(ValueError):
+        ColumnTable.from_rows([{"id": 1, "name": None}, {"id": 2, "name": "x"}])
+
+
+def test_column_table_select_uses_python_equality():
+    """Test filtering whole columns.
+
+    Expected Outcome:
+        - Matching rows are found for every value in the list
+        - A string never matches a numeric column, and unknown columns match nothing
+    """
+    table = ColumnTable.from_rows(sample_rows["posts"])
+    assert table.select("user_id", [1]).tolist() == [0, 1]
+    assert table.select("id", [1, 3]).tolist() == [0, 2]
+    assert table.select("id", ["1"]).tolist() == []
+    assert table.select("title", ["Jane's Post"]).tolist() == [2]
+    assert table.select("missing", [1]).tolist() == []
+
+
+def test_published_tables_are_shared_read_only(tmp_path):
+    """Test publishing the tables for worker processes.
+
+    Expected Outcome:
+        - Attached tables return the same rows from memory-mapped columns
+    """
+    tables = {name: ColumnTable.from_rows(rows) for name, rows in sample_rows.items()}
+    publish_tables(str(tmp_path / "tables"), tables)
+    attached = attach_tables(str(tmp_path / "tables"))
+
+    assert attached["comments"].rows() == sample_rows["comments"]
+    assert isinstance(attached["users"].columns["username"], np.memmap)
+
+
+def test_equi_join_matches_nested_loop_order():
+    """Test the column join used by SELECT ... JOIN.
+
+    Expected Outcome:
+        - The same (left, right) pairs as a nested loop, in nested-loop order
+        - Keys without a partner and text against numbers match nothing
+    """
+    rng = np.random.default_rng(0)
+    left = rng.permutation(np.arange(1, 301))
+    right = rng.integers(0, 320, 900)
+    left_indices, right_indices = equi_join(left, right)
+    expected = [(i, j) for i in range(left.size) for j in range(right.size) if left[i] == right[j]]
+    assert list(zip(left_indices.tolist(), right_indices.tolist())) == expected
+
+    assert equi_join(np.array([1, 2]), np.array(["1", "2"]))[0].size == 0
+    assert equi_join(np.array([1, 2]), np.array([], dtype=np.int64))[0].size == 0
+
+
+def test_join_query_matches_nested_loop(monkeypatch):
+    """Test SELECT ... JOIN on seeded tables against a naive nested loop.
+
+    Expected Outcome:
+        - Every user is paired with each of its posts, in user order then post order
+        - The active filter keeps only the pairs of active users
+    """
+    from src import main
+    from src.seeding import TableSeed, relational_tables
+
+    tables = relational_tables(TableSeed(users=300, posts_per_user=3))
+    monkeypatch.setattr(main, "mock_data", tables)
+    users, posts = tables["users"].rows(), tables["posts"].rows()
+    expected = [{**user, **post} for user in users for post in posts if post["user_id"] == user["id"]]
+
+    query = "SELECT * FROM users u JOIN posts p ON u.id = p.user_id"
+    request = main.QueryRequest(query=query, query_type=main.QueryType.SELECT)
+    assert main.run_query(request).results == expected
+
+    request = main.QueryRequest(query=query + " WHERE u.active = true", query_type=main.QueryType.SELECT)
+    active_ids = {user["id"] for user in users if user["active"]}
+    assert main.run_query(request).results == [row for row in expected if row["user_id"] in active_ids]
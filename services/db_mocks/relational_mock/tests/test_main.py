@@ -449,4 +449,127 @@ def test_invalid_query_type():
     }
     
     response = client.post("/query", json=request_data)
-    assert response.status_code == 422  # Validation error
\ No newline at end of file
+    assert response.status_code == 422  # Validation error
+def test_select_point_lookup_and_in_filter():
+    """Test single-condition WHERE filters on simple SELECT queries.
+
+    Purpose:
+        Verify point lookups (`col = value`) and IN lists return only matching rows.
+
+    Expected Outcome:
+        - `WHERE id = 2` returns just that row
+        - `WHERE id IN (...)` and :parameter references filter the same way
+        - Unknown keys return no data
+    """
+    def select(query, parameters=None):
+        response = client.post("/query", json={"query": query, "query_type": "SELECT", "parameters": parameters})
+        assert response.status_code == 200
+        return response.json()
+
+    assert [row["id"] for row in select("SELECT * FROM users WHERE id = 2")["results"]] == [2]
+    assert [row["id"] for row in select("SELECT * FROM users WHERE id IN (1, 3)")["results"]] == [1, 3]
+    rows = select("SELECT * FROM users WHERE username = :name", {"name": "jane_smith"})["results"]
+    assert [row["id"] for row in rows] == [2]
+    assert select("SELECT * FROM users WHERE id = 99")["message"] == "No data found"
+
+def test_query_batch():
+    """Test the /query/batch endpoint.
+
+    Purpose:
+        Verify several queries run in one round trip with a status per query.
+
+    Expected Outcome:
+        - Results come back in request order
+        - A failing query reports its own status without failing the batch
+    """
+    response = client.post("/query/batch", json={"queries": [
+        {"query": "SELECT * FROM posts WHERE id = 1", "query_type": "SELECT"},
+        {"query": "SELECT * FROM users WHERE id = :id", "query_type": "SELECT"},
+        {"query": "DELETE FROM users WHERE id = 1", "query_type": "DELETE"},
+    ]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["status_code"] == 200
+    assert results[0]["response"]["results"][0]["title"] == "First Post"
+    assert results[1]["status_code"] == 422
+    assert "id" in results[1]["detail"]
+    assert results[2]["response"]["affected_rows"] == 1
+
+def test_large_query_runs_off_the_event_loop(monkeypatch):
+    """Test that queries above the offload threshold run in the offload pool.
+
+    Expected Outcome:
+        - A cheap lookup runs inline; a scan above the threshold runs on a relational-offload thread
+        - Results are the same either way
+    """
+    import threading
+    from src import main
+
+    threads = []
+    run_query = main.run_query
+
+    def recording_run_query(request):
+        threads.append(threading.current_thread().name)
+        return run_query(request)
+
+    monkeypatch.setattr(main, "run_query", recording_run_query)
+    query = {"query": "SELECT * FROM users u JOIN posts p ON u.id = p.user_id", "query_type": "SELECT"}
+    inline = client.post("/query", json=query).json()
+
+    monkeypatch.setattr(main, "OFFLOAD_THRESHOLD", 6)
+    offloaded = client.post("/query", json=query).json()
+
+    assert not threads[0].startswith("relational-offload")
+    assert threads[1].startswith("relational-offload")
+    assert offloaded == inline
+
+def test_metrics_endpoint_reports_query_stages():
+    """Test that /metrics exposes request latency and /query stage timings.
+
+    Expected Outcome:
+        - /query appears in the request latency histogram under its status
+        - Parsing, planning and execution of a SELECT are timed as stages
+    """
+    client.post("/query", json={"query": "SELECT * FROM users WHERE id = 1", "query_type": "SELECT"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="POST",route="/query",status="200"}' in response.text
+    for name in ("parse", "plan", "execute"):
+        assert f'stage_duration_seconds_count{{stage="{name}"}}' in response.text
+
+def test_query_continues_caller_trace(monkeypatch):
+    """Test that /query records its stages as spans of the caller's trace.
+
+    Expected Outcome:
+        - Plan, parse and execute spans belong to the incoming trace
+        - Spans recorded in the offload pool still join the request's trace
+    """
+    from src import main
+    from service_common.tracing import SpanExporter
+
+    class ListExporter(SpanExporter):
+        def __init__(self):
+            self.spans = []
+
+        def export(self, span):
+            self.spans.append(span)
+
+    monkeypatch.setattr(main.tracer, "exporter", ListExporter())
+    monkeypatch.setattr(main, "OFFLOAD_THRESHOLD", 1)
+    trace_id = "0af7651916cd43dd8448eb211c80319c"
+    client.post("/query", json={"query": "SELECT * FROM users", "query_type": "SELECT"},
+                headers={"traceparent": f"00-{trace_id}-b7ad6b7169203331-01"})
+
+    spans = {span.name: span for span in main.tracer.exporter.spans}
+    assert {"plan", "parse", "execute", "POST /query"} <= set(spans)
+    assert all(span.context.trace_id == trace_id for span in spans.values())
+    assert spans["execute"].parent_id == spans["POST /query"].context.span_id
+
+def test_profiling_disabled_without_token():
+    """Test that the profiling endpoint is admin-only.
+
+    Expected Outcome:
+        - Without RELATIONAL_MOCK_PROFILING_TOKEN, profiling is refused with 403
+    """
+    assert client.post("/admin/profile?seconds=1", headers={"X-Admin-Token": "x"}).status_code == 403
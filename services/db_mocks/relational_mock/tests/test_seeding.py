@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src import main, seeding
+from src.seeding import TableSeed, relational_tables
+
+client = TestClient(main.app)
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def test_relational_tables_are_deterministic_with_skewed_keys():
+    """Test the synthetic table generator.
+
+    Expected Outcome:
+        - Equal seeds give equal tables of the requested sizes
+        - Every foreign key points at an existing row, and a few rows get most references
+    """
+    spec = TableSeed(users=1000, posts_per_user=5, comments_per_post=2, seed=4)
+    tables = relational_tables(spec)
+    assert tables["users"].rows() == relational_tables(spec)["users"].rows()
+    assert [len(tables[name]) for name in ("users", "posts", "comments")] == [1000, 5000, 10000]
+
+    post_authors = tables["posts"].columns["user_id"]
+    assert np.isin(post_authors, tables["users"].columns["id"]).all()
+    assert np.isin(tables["comments"].columns["post_id"], tables["posts"].columns["id"]).all()
+    posts_per_author = np.bincount(post_authors)
+    assert posts_per_author.max() > 10 * spec.posts_per_user
+    assert tables["users"].rows()[0]["email"] == "user_1@example.com"
+
+
+def test_admin_seed_endpoint(monkeypatch):
+    """Test POST /admin/seed.
+
+    Expected Outcome:
+        - Only requests carrying the admin token may seed
+        - Queries run against the generated tables
+        - Seeding is refused when workers share published tables
+    """
+    monkeypatch.setattr(main, "mock_data", main.mock_data)
+    monkeypatch.setattr(main.profiler, "settings", replace(main.profiler.settings, token="secret"))
+    spec = {"users": 200, "posts_per_user": 2, "comments_per_post": 1}
+    assert client.post("/admin/seed", json=spec).status_code == 403
+    assert client.post("/admin/seed", json=spec, headers={"X-Admin-Token": "x"}).status_code == 403
+
+    response = client.post("/admin/seed", json=spec, headers=ADMIN)
+    assert response.status_code == 200
+    assert response.json()["rows"] == {"users": 200, "posts": 400, "comments": 400}
+
+    rows = client.post("/query", json={"query": "SELECT * FROM users WHERE id = 150", "query_type": "SELECT"})
+    assert rows.json()["results"][0]["username"] == "user_150"
+
+    monkeypatch.setattr(main, "SHARED_DIR", "/dev/shm/relational-mock-test")
+    assert client.post("/admin/seed", json={"users": 10}, headers=ADMIN).status_code == 409
+
+
+def test_service_starts_from_snapshot(tmp_path):
+    """Test startup from tables precomputed with `python -m src.seeding`.
+
+    Expected Outcome:
+        - A process started with RELATIONAL_MOCK_SNAPSHOT_DIR serves the snapshot's rows
+    """
+    directory = tmp_path / "snapshot"
+    seeding.main([str(directory), "--users", "40", "--seed", "5"])
+    expected = relational_tables(TableSeed(users=40, seed=5))
+    worker = subprocess.run(
+        [sys.executable, "-c",
+         "from src.main import mock_data; print(len(mock_data['posts']), mock_data['comments'].rows()[-1])"],
+        cwd=Path(__file__).resolve().parents[1],
+        env={**os.environ, "RELATIONAL_MOCK_SNAPSHOT_DIR": str(directory)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    count, last_comment = worker.stdout.split(" ", 1)
+    assert int(count) == len(expected["posts"])
+    assert last_comment.strip() == str(expected["comments"].rows()[-1])
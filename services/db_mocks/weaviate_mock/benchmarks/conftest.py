@@ -0,0 +1,28 @@
+"""Synthetic collections (see src/seeding.py) for the weaviate_mock micro-benchmarks.
+
+Run with ``pytest benchmarks`` (plain ``pytest`` only collects tests/). Collection
+sizes range from the three sample objects up to 10^6 vectors; set BENCHMARK_MAX_SIZE
+to stop earlier, e.g. ``BENCHMARK_MAX_SIZE=10000 pytest benchmarks``.
+"""
+import os
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from src import main
+from src.seeding import CorpusSeed, clustered_corpus
+
+MAX_SIZE = int(os.getenv("BENCHMARK_MAX_SIZE", str(10**6)))
+SIZES = [size for size in (3, 10**2, 10**3, 10**4, 10**5, 10**6) if size <= MAX_SIZE]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"vectors={size}")
+def collection(request) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    return clustered_corpus(CorpusSeed(objects=request.param))
+
+
+@pytest.fixture
+def use_collection(collection, monkeypatch) -> None:
+    """Search the synthetic collection instead of the sample objects."""
+    monkeypatch.setattr(main, "collection", main.build_collection(*collection))
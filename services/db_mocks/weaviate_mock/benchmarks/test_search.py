@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from src import main
+
+
+def query_vector(seed: int = 1) -> list:
+    return np.random.default_rng(seed).random(128).tolist()
+
+
+def test_validate_float_vector(benchmark):
+    """Input validation of one query vector (fixed 128 dimensions, so not size dependent)."""
+    vector = query_vector()
+    assert benchmark(main.validate_float_vector, vector) == vector
+
+
+def test_vector_search(benchmark, use_collection):
+    """One similarity search over the whole collection, as run by /query."""
+    query = main.VectorQuery(vector=query_vector(), class_name="Document", limit=10, distance_threshold=1.0)
+    responses = benchmark(main.search_many, [query])
+    assert len(responses[0].results) == min(10, len(main.collection))
+
+
+@pytest.mark.parametrize("batch", [8, 64])
+def test_vector_search_batch(benchmark, use_collection, batch):
+    """A /query/batch of several searches sharing one matrix product."""
+    queries = [
+        main.VectorQuery(vector=query_vector(seed), class_name="Document", limit=10, distance_threshold=1.0)
+        for seed in range(batch)
+    ]
+    assert len(benchmark(main.search_many, queries)) == batch
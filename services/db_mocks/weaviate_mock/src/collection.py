@@ -0,0 +1,97 @@
+"""The searchable collection: objects, their vectors and the rows of each class.
+
+A Collection is immutable. A search binds the current one once and reads only from
+it, so ``/admin/seed`` swapping in a new collection with a single assignment never
+mixes the rows of one collection with the vectors of another.
+
+Rows are grouped by class, so every class is one contiguous row range and a search
+reads a slice view of the vectors instead of copying the rows it needs. Published
+collections keep that order; each worker maps the vectors, the norms and the packed
+object records, and decodes only the records of the objects it returns.
+"""
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from service_common import shared_data
+
+
+@dataclass(frozen=True)
+class Collection:
+    objects: Sequence[Dict[str, Any]]
+    vectors: np.ndarray
+    norms: np.ndarray
+    # Class name -> (start, stop) row range
+    classes: Mapping[str, Tuple[int, int]]
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def class_size(self, class_name: str) -> int:
+        start, stop = self.classes.get(class_name, (0, 0))
+        return stop - start
+
+
+def build_collection(
+    objects: List[Dict[str, Any]],
+    vectors: np.ndarray,
+    norms: Optional[np.ndarray] = None,
+) -> Collection:
+    """Collection of ``objects`` and their row-aligned ``vectors``.
+
+    Rows are regrouped by class, in order of first appearance, only if some class
+    is split; the order within a class is kept.
+    """
+    if norms is None:
+        norms = np.linalg.norm(vectors, axis=1)
+    names = [obj["class"] for obj in objects]
+    first_seen: Dict[str, int] = {}
+    for name in names:
+        first_seen.setdefault(name, len(first_seen))
+    order = sorted(range(len(names)), key=lambda row: first_seen[names[row]])
+    if order != list(range(len(names))):
+        objects = [objects[row] for row in order]
+        vectors, norms = vectors[order], norms[order]
+        names = [names[row] for row in order]
+    return Collection(objects, vectors, norms, class_ranges(names))
+
+
+def class_ranges(names: Sequence[str]) -> Dict[str, Tuple[int, int]]:
+    """Row range of each class in ``names``, which must be grouped by class."""
+    ranges: Dict[str, Tuple[int, int]] = {}
+    start = 0
+    for row in range(1, len(names) + 1):
+        if row == len(names) or names[row] != names[start]:
+            if names[start] in ranges:
+                raise ValueError(f"Rows of class {names[start]!r} are not contiguous")
+            ranges[names[start]] = (start, row)
+            start = row
+    return ranges
+
+
+def publish_collection(directory: os.PathLike, collection: Collection) -> None:
+    """Write ``collection`` in the layout ``attach_collection`` maps.
+
+    meta.json only holds the class ranges; the object records are one packed blob.
+    """
+    blob, offsets = shared_data.pack_records(collection.objects)
+    arrays = {
+        "vectors": collection.vectors,
+        "norms": collection.norms,
+        "objects": blob,
+        "object_offsets": offsets,
+    }
+    classes = {name: list(rows) for name, rows in collection.classes.items()}
+    shared_data.publish(directory, arrays, {"classes": classes})
+
+
+def attach_collection(directory: os.PathLike) -> Collection:
+    """Map a collection written by ``publish_collection``."""
+    arrays, meta = shared_data.attach(directory)
+    return Collection(
+        shared_data.PackedRecords(arrays["objects"], arrays["object_offsets"]),
+        arrays["vectors"],
+        arrays["norms"],
+        {name: (start, stop) for name, (start, stop) in meta["classes"].items()},
+    )
@@ -1,40 +1,96 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from pydantic import BaseModel, Field, field_validator, ValidationError
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+import asyncio
+import contextvars
+import os
+import time
 import numpy as np
+from service_common.metrics import instrument, stage
+from service_common.profiling import ProfilingSettings, enable_profiling
+from service_common.tracing import TraceSettings, Tracer, trace_requests
+
+from .collection import Collection, attach_collection, build_collection
+from .seeding import CorpusSeed, clustered_corpus
 
 app = FastAPI(title="Weaviate Mock Service")
+instrument(app)
 
-# Mock vector database with some sample data
-mock_objects = [
-    {
-        "id": "1",
-        "class": "Document",
-        "vector": np.random.rand(128).tolist(),  # 128-dimensional vector
-        "properties": {
-            "content": "Sample document about AI technology",
-            "category": "technology"
-        }
-    },
-    {
-        "id": "2",
-        "class": "Document",
-        "vector": np.random.rand(128).tolist(),
-        "properties": {
-            "content": "Article about machine learning applications",
-            "category": "technology"
-        }
-    },
-    {
-        "id": "3",
-        "class": "Document",
-        "vector": np.random.rand(128).tolist(),
-        "properties": {
-            "content": "Research paper on natural language processing",
-            "category": "research"
+# Request traces continued from the MCP service (WEAVIATE_MOCK_TRACE_EXPORTER, WEAVIATE_MOCK_TRACE_SAMPLE_RATIO)
+tracer = Tracer(TraceSettings.from_env("WEAVIATE_MOCK_TRACE", "weaviate-mock"))
+trace_requests(app, tracer)
+
+# POST /admin/profile and X-Profile: 1 requests, enabled by WEAVIATE_MOCK_PROFILING_TOKEN
+profiler = enable_profiling(app, ProfilingSettings.from_env("WEAVIATE_MOCK", "weaviate-mock"))
+
+# Hot-path stages of /query, exported as stage_duration_seconds on /metrics
+PLAN_STAGE = stage("plan")
+EXECUTE_STAGE = stage("execute")
+SERIALIZE_STAGE = stage("serialize")
+
+# Fixed seed, so every process and every restart serves the same sample vectors
+SAMPLE_SEED = 0
+
+def build_sample_collection() -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """Sample objects and their 128-dimensional vectors, one matrix row per object"""
+    objects = [
+        {
+            "id": "1",
+            "class": "Document",
+            "properties": {
+                "content": "Sample document about AI technology",
+                "category": "technology"
+            }
+        },
+        {
+            "id": "2",
+            "class": "Document",
+            "properties": {
+                "content": "Article about machine learning applications",
+                "category": "technology"
+            }
+        },
+        {
+            "id": "3",
+            "class": "Document",
+            "properties": {
+                "content": "Research paper on natural language processing",
+                "category": "research"
+            }
         }
-    }
-]
+    ]
+    return objects, np.random.default_rng(SAMPLE_SEED).random((len(objects), 128))
+
+# The collection searches are answered from, replaced as a whole by install_collection
+collection: Collection
+
+def install_collection(
+    objects: Sequence[Dict[str, Any]],
+    vectors: np.ndarray,
+    norms: Optional[np.ndarray] = None,
+) -> None:
+    """Serve searches from ``objects`` and their row-aligned ``vectors`` from now on"""
+    global collection
+    collection = build_collection(objects, vectors, norms)
+
+# Workers started by `python -m src.serve` map the collection published by the serving
+# process instead of each building and holding their own copy
+SHARED_DIR = os.getenv("WEAVIATE_MOCK_SHARED_DIR")
+# A collection precomputed with `python -m src.seeding`, mapped instead of generated
+SNAPSHOT_DIR = os.getenv("WEAVIATE_MOCK_SNAPSHOT_DIR")
+# WEAVIATE_MOCK_SEED_OBJECTS > 0 starts from a synthetic clustered corpus of that size
+SEED_OBJECTS = int(os.getenv("WEAVIATE_MOCK_SEED_OBJECTS", "0"))
+if SHARED_DIR or SNAPSHOT_DIR:
+    collection = attach_collection(SHARED_DIR or SNAPSHOT_DIR)
+elif SEED_OBJECTS > 0:
+    install_collection(*clustered_corpus(CorpusSeed(
+        objects=SEED_OBJECTS,
+        clusters=int(os.getenv("WEAVIATE_MOCK_SEED_CLUSTERS", "16")),
+        seed=int(os.getenv("WEAVIATE_MOCK_SEED", "0")),
+    )))
+else:
+    install_collection(*build_sample_collection())
 
 def validate_float_vector(v: Any) -> List[float]:
     """Validate that input is a list of valid floats."""
@@ -90,6 +146,103 @@ class SearchResult(BaseModel):
 class SearchResponse(BaseModel):
     results: List[SearchResult]
 
+class BatchVectorQuery(BaseModel):
+    queries: List[VectorQuery] = Field(..., min_length=1, description="Vector queries to run together")
+
+class BatchSearchResponse(BaseModel):
+    results: List[SearchResponse]
+
+def nearest(distances: np.ndarray, threshold: Optional[float], limit: Optional[int]) -> np.ndarray:
+    """Columns of ``distances`` within ``threshold``, nearest first, at most ``limit`` of them.
+
+    A partial partition finds the ``limit``-th distance, so only the candidates up to it
+    are sorted; ties keep column order.
+    """
+    within = distances <= threshold if threshold is not None else ~np.isnan(distances)
+    columns = np.flatnonzero(within)
+    near = distances[columns]
+    if limit is not None and limit < len(columns):
+        keep = near <= np.partition(near, limit - 1)[limit - 1]
+        columns, near = columns[keep], near[keep]
+    return columns[np.lexsort((columns, near))[:limit]]
+
+def search_many(
+    queries: List[VectorQuery],
+    current: Optional[Collection] = None,
+) -> List[SearchResponse]:
+    """Run several vector searches with one matrix product per class.
+
+    Reads only ``current`` (the installed collection by default), so a concurrent
+    install_collection cannot change the collection under a running search.
+    """
+    current = collection if current is None else current
+    responses: List[Optional[SearchResponse]] = [None] * len(queries)
+    indices_by_class: Dict[str, List[int]] = {}
+    for index, query in enumerate(queries):
+        indices_by_class.setdefault(query.class_name, []).append(index)
+
+    for class_name, indices in indices_by_class.items():
+        if class_name not in current.classes:
+            for index in indices:
+                responses[index] = SearchResponse(results=[])
+            continue
+        start, stop = current.classes[class_name]
+        with (
+            EXECUTE_STAGE.time(),
+            tracer.span("execute", class_name=class_name, objects=stop - start),
+        ):
+            query_vectors = np.array([queries[index].vector for index in indices])
+            # Cosine distance of every query to every object of the class; the class
+            # rows are contiguous, so these are views, not copies
+            vectors, norms = current.vectors[start:stop], current.norms[start:stop]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                distances = 1 - (query_vectors @ vectors.T) / (
+                    np.linalg.norm(query_vectors, axis=1)[:, None] * norms[None, :]
+                )
+            rankings = [
+                nearest(distances[row], queries[index].distance_threshold, queries[index].limit)
+                for row, index in enumerate(indices)
+            ]
+        with SERIALIZE_STAGE.time(), tracer.span("serialize"):
+            for row, index in enumerate(indices):
+                results = []
+                for column in rankings[row]:
+                    obj = current.objects[start + column]
+                    results.append(SearchResult(
+                        id=obj["id"],
+                        class_name=obj["class"],
+                        distance=float(distances[row, column]),
+                        properties=obj["properties"]
+                    ))
+                responses[index] = SearchResponse(results=results)
+    return responses
+
+# Searches comparing at least this many query/object pairs run in the offload pool, so a
+# large batch does not hold up every other request on the event loop. NumPy releases the
+# GIL inside the matrix product, letting the loop keep serving meanwhile.
+OFFLOAD_THRESHOLD = int(os.getenv("WEAVIATE_MOCK_OFFLOAD_THRESHOLD", "10000"))
+offload_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("WEAVIATE_MOCK_OFFLOAD_THREADS", "4")),
+    thread_name_prefix="weaviate-offload",
+)
+
+def search_cost(queries: List[VectorQuery], current: Collection) -> int:
+    """Number of query/object distance computations a search of ``current`` needs"""
+    return sum(current.class_size(query.class_name) for query in queries)
+
+async def run_search(queries: List[VectorQuery]) -> List[SearchResponse]:
+    """search_many inline for small searches, in the bounded offload pool for large ones"""
+    current = collection
+    with PLAN_STAGE.time(), tracer.span("plan") as span:
+        cost = search_cost(queries, current)
+        span.set_attribute("cost", cost)
+    if cost < OFFLOAD_THRESHOLD:
+        return search_many(queries, current)
+    # Run in a copy of the request's context so spans recorded in the pool join its trace
+    return await asyncio.get_running_loop().run_in_executor(
+        offload_pool, contextvars.copy_context().run, search_many, queries, current
+    )
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -100,36 +253,45 @@ async def vector_search(query: VectorQuery):
     """Mock endpoint for vector similarity search"""
     try:
         # Query vector is already validated by Pydantic model
-        query_vector = np.array(query.vector)
-        
-        # Calculate mock distances
-        results = []
-        for obj in mock_objects:
-            if obj["class"] == query.class_name:
-                # Calculate cosine similarity
-                obj_vector = np.array(obj["vector"])
-                distance = 1 - np.dot(query_vector, obj_vector) / (
-                    np.linalg.norm(query_vector) * np.linalg.norm(obj_vector)
-                )
-                
-                if distance <= query.distance_threshold:
-                    results.append(SearchResult(
-                        id=obj["id"],
-                        class_name=obj["class"],
-                        distance=float(distance),
-                        properties=obj["properties"]
-                    ))
-        
-        # Sort by distance and limit results
-        results.sort(key=lambda x: x.distance)
-        results = results[:query.limit]
-        
-        return SearchResponse(results=results)
-        
+        return (await run_search([query]))[0]
     except ValidationError as e:
         raise HTTPException(status_code=422, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/query/batch", response_model=BatchSearchResponse)
+async def vector_search_batch(batch: BatchVectorQuery):
+    """Run several vector similarity searches in one round trip; results keep the request order"""
+    return BatchSearchResponse(results=await run_search(batch.queries))
+
+# Sized for tests and benchmarks; bigger corpora are generated at startup (WEAVIATE_MOCK_SEED_OBJECTS)
+class SeedRequest(BaseModel):
+    objects: int = Field(..., gt=0, le=200_000, description="Number of objects to generate")
+    clusters: int = Field(default=16, gt=0, le=1_000, description="Number of topics")
+    spread: float = Field(default=0.05, ge=0, description="Standard deviation of vectors around their topic")
+    class_name: str = Field(default="Document", description="Class of the generated objects")
+    seed: int = Field(default=0, description="Random seed; equal seeds generate equal corpora")
+
+@app.post("/admin/seed", dependencies=[Depends(profiler.require_admin)])
+async def seed(request: SeedRequest):
+    """Replace the collection with a synthetic clustered corpus.
+
+    The corpus is generated in the offload pool and swapped in on the event loop.
+    """
+    if SHARED_DIR:
+        raise HTTPException(
+            status_code=409,
+            detail="Workers share the collection published at startup; set WEAVIATE_MOCK_SEED_OBJECTS instead",
+        )
+    started = time.perf_counter()
+    objects, vectors = await asyncio.get_running_loop().run_in_executor(
+        offload_pool, clustered_corpus, CorpusSeed(**request.model_dump())
+    )
+    install_collection(objects, vectors)
+    installed = collection
+    return {
+        "objects": len(installed),
+        "classes": {name: installed.class_size(name) for name in installed.classes},
+        "seconds": time.perf_counter() - started,
+    }
 
 if __name__ == "__main__":
     import uvicorn
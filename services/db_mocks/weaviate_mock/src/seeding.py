@@ -0,0 +1,70 @@
+"""Deterministic synthetic corpora for load and scaling tests.
+
+Objects are grouped into topics of very different sizes (topic k gets a share
+proportional to 1 / (k + 1)). Each vector is its topic centroid plus Gaussian noise,
+so similarity searches find real neighbours instead of uniform noise. Vectors are
+generated as one float32 matrix, so loading N objects is a few array operations.
+
+A pod started with ``WEAVIATE_MOCK_SEED_OBJECTS`` generates its corpus on every
+start. Write it once as a snapshot instead and point ``WEAVIATE_MOCK_SNAPSHOT_DIR``
+at it, so startup only maps the vectors::
+
+    python -m src.seeding /data/weaviate --objects 1000000
+"""
+import argparse
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .collection import build_collection, publish_collection
+
+VECTOR_DIM = 128
+
+
+@dataclass(frozen=True)
+class CorpusSeed:
+    objects: int
+    clusters: int = 16
+    spread: float = 0.05
+    class_name: str = "Document"
+    seed: int = 0
+
+
+def clustered_corpus(spec: CorpusSeed) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """Objects and their row-aligned vectors, as ``build_sample_collection`` returns them."""
+    rng = np.random.default_rng(spec.seed)
+    centroids = rng.random((spec.clusters, VECTOR_DIM), dtype=np.float32)
+    shares = 1.0 / np.arange(1, spec.clusters + 1)
+    topics = rng.choice(spec.clusters, size=spec.objects, p=shares / shares.sum())
+    vectors = centroids[topics] + rng.normal(0.0, spec.spread, (spec.objects, VECTOR_DIM)).astype(np.float32)
+    objects = [
+        {
+            "id": str(index),
+            "class": spec.class_name,
+            "properties": {"content": f"Synthetic document {index} on topic {topic}", "category": f"topic-{topic}"},
+        }
+        for index, topic in enumerate(topics.tolist(), start=1)
+    ]
+    return objects, vectors
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.seeding",
+                                     description="Write a synthetic corpus as a snapshot directory.")
+    parser.add_argument("directory", help="Snapshot directory, as WEAVIATE_MOCK_SNAPSHOT_DIR")
+    parser.add_argument("--objects", type=int, required=True)
+    parser.add_argument("--clusters", type=int, default=CorpusSeed.clusters)
+    parser.add_argument("--spread", type=float, default=CorpusSeed.spread)
+    parser.add_argument("--class-name", default=CorpusSeed.class_name)
+    parser.add_argument("--seed", type=int, default=CorpusSeed.seed)
+    args = parser.parse_args(argv)
+
+    objects, vectors = clustered_corpus(CorpusSeed(args.objects, args.clusters, args.spread, args.class_name, args.seed))
+    publish_collection(args.directory, build_collection(objects, vectors))
+    print(f"Wrote {len(objects)} objects to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
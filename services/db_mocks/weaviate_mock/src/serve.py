@@ -0,0 +1,52 @@
+"""Run the mock with one or more uvicorn worker processes.
+
+With ``WEAVIATE_MOCK_WORKERS`` > 1 this process owns the collection: it builds the
+object vectors once, publishes them as memory-mapped arrays and points every worker
+at them through ``WEAVIATE_MOCK_SHARED_DIR``, so all workers answer from the same
+vectors without each holding a copy. A collection precomputed with
+``python -m src.seeding`` and named by ``WEAVIATE_MOCK_SNAPSHOT_DIR`` is already in
+that layout, so workers then attach to it directly.
+
+    python -m src.serve
+"""
+import os
+import shutil
+import tempfile
+
+import uvicorn
+from service_common import shared_data
+
+from . import collection
+
+HOST = os.getenv("WEAVIATE_MOCK_HOST", "0.0.0.0")
+PORT = int(os.getenv("WEAVIATE_MOCK_PORT", "8003"))
+WORKERS = int(os.getenv("WEAVIATE_MOCK_WORKERS", "1"))
+SNAPSHOT_DIR = os.getenv("WEAVIATE_MOCK_SNAPSHOT_DIR")
+
+
+def publish_collection(directory: str) -> None:
+    """Publish the collection of this process for workers to attach to."""
+    from . import main as service
+
+    collection.publish_collection(directory, service.collection)
+
+
+def main() -> None:
+    if WORKERS <= 1:
+        uvicorn.run("src.main:app", host=HOST, port=PORT)
+        return
+    if SNAPSHOT_DIR:
+        os.environ["WEAVIATE_MOCK_SHARED_DIR"] = SNAPSHOT_DIR
+        uvicorn.run("src.main:app", host=HOST, port=PORT, workers=WORKERS)
+        return
+    directory = tempfile.mkdtemp(prefix="weaviate-mock-", dir=shared_data.default_shared_root())
+    try:
+        publish_collection(directory)
+        os.environ["WEAVIATE_MOCK_SHARED_DIR"] = directory
+        uvicorn.run("src.main:app", host=HOST, port=PORT, workers=WORKERS)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -327,4 +327,143 @@ def test_malformed_vectors():
         error_detail = response.json()["detail"]
         assert isinstance(error_detail, list)  # Pydantic returns an array of errors
         assert len(error_detail) > 0  # Should have at least one error
-        assert "msg" in error_detail[0]  # Each error should have a message
\ No newline at end of file
+        assert "msg" in error_detail[0]  # Each error should have a message
+def test_batch_vector_search_matches_single_queries():
+    """Test the /query/batch endpoint against individual /query calls.
+
+    Purpose:
+        Verify that a batch of vector searches returns, in request order, exactly
+        what each search returns on its own.
+
+    Expected Outcome:
+        - One response per query, in the order sent
+        - Each response matches the single-query response
+        - Unknown classes yield empty results and invalid vectors are rejected with 422
+    """
+    queries = [
+        {"vector": np.random.rand(128).tolist(), "class_name": "Document", "limit": limit,
+         "distance_threshold": 1.0}
+        for limit in (1, 2, 3)
+    ]
+    queries.append({"vector": np.random.rand(128).tolist(), "class_name": "Missing"})
+
+    response = client.post("/query/batch", json={"queries": queries})
+    assert response.status_code == 200
+    batch_results = response.json()["results"]
+    assert len(batch_results) == len(queries)
+    for query, batch_result in zip(queries, batch_results):
+        single = client.post("/query", json=query).json()["results"]
+        assert [r["id"] for r in single] == [r["id"] for r in batch_result["results"]]
+        assert [r["distance"] for r in single] == pytest.approx([r["distance"] for r in batch_result["results"]])
+    assert batch_results[3]["results"] == []
+
+    response = client.post("/query/batch", json={"queries": [{"vector": [1.0], "class_name": "Document"}]})
+    assert response.status_code == 422
+
+def test_search_of_interleaved_classes(monkeypatch):
+    """Test searches of a collection whose classes are interleaved.
+
+    Expected Outcome:
+        - Each class is stored as one contiguous row range, in order of first appearance
+        - A search only returns objects of its class
+        - Limited results equal the first results of an unlimited search, ties in object order
+    """
+    from src import main
+
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0], [1.0, 0.0], [0.0, 1.0], [1.0, 0.0], [1.0, 1.0]])
+    objects = [
+        {"id": str(row), "class": "Document" if row % 2 == 0 else "Note", "properties": {}}
+        for row in range(len(vectors))
+    ]
+    installed = main.build_collection(objects, np.pad(vectors, ((0, 0), (0, 126))))
+    monkeypatch.setattr(main, "collection", installed)
+
+    assert installed.classes == {"Document": (0, 3), "Note": (3, 6)}
+    query = {"vector": [1.0] + [0.0] * 127, "class_name": "Document", "distance_threshold": 1.0}
+    unlimited = client.post("/query", json={**query, "limit": None}).json()["results"]
+    assert [result["id"] for result in unlimited] == ["0", "2", "4"]
+    for limit in (1, 2):
+        limited = client.post("/query", json={**query, "limit": limit}).json()["results"]
+        assert limited == unlimited[:limit]
+
+    notes = client.post("/query", json={**query, "class_name": "Note"}).json()["results"]
+    assert [result["id"] for result in notes] == ["5", "1", "3"]
+
+def test_large_search_runs_off_the_event_loop(monkeypatch):
+    """Test that searches above the offload threshold run in the offload pool.
+
+    Expected Outcome:
+        - Small searches run inline; large ones run on a weaviate-offload thread
+        - Results are the same either way
+    """
+    import threading
+    from src import main
+
+    threads = []
+    search_many = main.search_many
+
+    def recording_search(queries, current):
+        threads.append(threading.current_thread().name)
+        return search_many(queries, current)
+
+    monkeypatch.setattr(main, "search_many", recording_search)
+    query = {"vector": np.random.rand(128).tolist(), "class_name": "Document", "distance_threshold": 1.0}
+    inline = client.post("/query", json=query).json()
+
+    monkeypatch.setattr(main, "OFFLOAD_THRESHOLD", 1)
+    offloaded = client.post("/query", json=query).json()
+
+    assert not threads[0].startswith("weaviate-offload")
+    assert threads[1].startswith("weaviate-offload")
+    assert offloaded == inline
+
+def test_metrics_endpoint_reports_search_stages():
+    """Test that /metrics exposes request latency and search stage timings.
+
+    Expected Outcome:
+        - /query appears in the request latency histogram under its status
+        - Planning, distance computation and result building are timed as stages
+    """
+    client.post("/query", json={"vector": [0.5] * 128, "class_name": "Document"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="POST",route="/query",status="200"}' in response.text
+    for name in ("plan", "execute", "serialize"):
+        assert f'stage_duration_seconds_count{{stage="{name}"}}' in response.text
+
+def test_search_continues_caller_trace(monkeypatch):
+    """Test that /query records its stages as spans of the caller's trace.
+
+    Expected Outcome:
+        - Plan, execute and serialize spans belong to the incoming trace, inline and offloaded
+    """
+    from src import main
+    from service_common.tracing import SpanExporter
+
+    class ListExporter(SpanExporter):
+        def __init__(self):
+            self.spans = []
+
+        def export(self, span):
+            self.spans.append(span)
+
+    monkeypatch.setattr(main.tracer, "exporter", ListExporter())
+    trace_id = "0af7651916cd43dd8448eb211c80319c"
+    headers = {"traceparent": f"00-{trace_id}-b7ad6b7169203331-01"}
+    query = {"vector": [0.5] * 128, "class_name": "Document"}
+    client.post("/query", json=query, headers=headers)
+    monkeypatch.setattr(main, "OFFLOAD_THRESHOLD", 1)
+    client.post("/query", json=query, headers=headers)
+
+    names = [span.name for span in main.tracer.exporter.spans]
+    assert names.count("execute") == names.count("serialize") == 2
+    assert all(span.context.trace_id == trace_id for span in main.tracer.exporter.spans)
+
+def test_profiling_disabled_without_token():
+    """Test that the profiling endpoint is admin-only.
+
+    Expected Outcome:
+        - Without WEAVIATE_MOCK_PROFILING_TOKEN, profiling is refused with 403
+    """
+    assert client.post("/admin/profile?seconds=1", headers={"X-Admin-Token": "x"}).status_code == 403
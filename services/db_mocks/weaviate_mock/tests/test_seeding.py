@@ -0,0 +1,59 @@
+from dataclasses import replace
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src import main
+from src.seeding import CorpusSeed, clustered_corpus
+
+client = TestClient(main.app)
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def test_clustered_corpus_is_deterministic_and_clustered():
+    """Test the synthetic corpus generator.
+
+    Expected Outcome:
+        - Equal seeds give equal corpora
+        - Topic sizes are skewed, and vectors sit closer to their own topic than to others
+    """
+    spec = CorpusSeed(objects=2000, clusters=8, seed=3)
+    objects, vectors = clustered_corpus(spec)
+    assert np.array_equal(vectors, clustered_corpus(spec)[1])
+    assert vectors.shape == (2000, 128) and vectors.dtype == np.float32
+
+    topics = np.array([int(obj["properties"]["category"].split("-")[1]) for obj in objects])
+    sizes = np.bincount(topics, minlength=8)
+    assert sizes[0] > 3 * sizes[7]
+
+    same = np.linalg.norm(vectors[topics == 0][:50] - vectors[topics == 0][50:100], axis=1).mean()
+    other = np.linalg.norm(vectors[topics == 0][:50] - vectors[topics == 1][:50], axis=1).mean()
+    assert same < other / 2
+
+
+def test_admin_seed_endpoint(monkeypatch):
+    """Test POST /admin/seed.
+
+    Expected Outcome:
+        - Only requests carrying the admin token may seed
+        - Searches run against the generated corpus, nearest neighbour first
+        - Seeding is refused when workers share a published collection
+    """
+    monkeypatch.setattr(main, "collection", main.collection)
+
+    monkeypatch.setattr(main.profiler, "settings", replace(main.profiler.settings, token="secret"))
+    spec = {"objects": 300, "clusters": 4, "seed": 1}
+    assert client.post("/admin/seed", json=spec).status_code == 403
+    assert client.post("/admin/seed", json=spec, headers={"X-Admin-Token": "x"}).status_code == 403
+
+    response = client.post("/admin/seed", json=spec, headers=ADMIN)
+    assert response.status_code == 200
+    assert response.json()["classes"] == {"Document": 300}
+
+    query = {"vector": main.collection.vectors[41].tolist(), "class_name": "Document", "limit": 3}
+    results = client.post("/query", json=query).json()["results"]
+    assert results[0]["id"] == main.collection.objects[41]["id"]
+    assert results[0]["distance"] < 1e-5
+
+    monkeypatch.setattr(main, "SHARED_DIR", "/dev/shm/weaviate-mock-test")
+    assert client.post("/admin/seed", json={"objects": 10}, headers=ADMIN).status_code == 409
@@ -0,0 +1,137 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+from service_common import shared_data
+
+from src import main, seeding
+from src.collection import attach_collection, publish_collection
+from src.seeding import CorpusSeed, clustered_corpus
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_publish_and_attach_round_trip(tmp_path):
+    """Test that published arrays are mapped back read-only with their metadata.
+
+    Expected Outcome:
+        - Arrays compare equal and are memory-mapped, not copied
+        - Republishing replaces the previous set
+    """
+    directory = tmp_path / "collection"
+    shared_data.publish(directory, {"vectors": np.arange(6.0).reshape(2, 3)}, {"objects": ["a", "b"]})
+    arrays, meta = shared_data.attach(directory)
+
+    assert isinstance(arrays["vectors"], np.memmap)
+    assert not arrays["vectors"].flags.writeable
+    assert arrays["vectors"].tolist() == [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]]
+    assert meta == {"objects": ["a", "b"]}
+
+    shared_data.publish(directory, {"vectors": np.zeros((1, 3))}, {"objects": ["c"]})
+    arrays, meta = shared_data.attach(directory)
+    assert arrays["vectors"].shape == (1, 3)
+    assert [path.name for path in tmp_path.iterdir()] == ["collection"]
+
+
+def test_packed_records_round_trip():
+    """Test that records packed into a blob and offsets are decoded one at a time.
+
+    Expected Outcome:
+        - Every record, including an empty one, reads back equal by index and slice
+        - Indexing past either end raises IndexError
+    """
+    records = [{"id": "1", "properties": {"content": "é"}}, {}, {"id": "3"}]
+    blob, offsets = shared_data.pack_records(records)
+    packed = shared_data.PackedRecords(blob, offsets)
+
+    assert blob.dtype == np.uint8
+    assert len(packed) == 3
+    assert list(packed) == records
+    assert packed[-1] == {"id": "3"}
+    assert packed[1:] == records[1:]
+    for index in (3, -4):
+        try:
+            packed[index]
+        except IndexError:
+            pass
+        else:
+            raise AssertionError(f"index {index} did not raise")
+
+
+def test_published_collection_keeps_metadata_small(tmp_path):
+    """Test that a published collection stores its objects as arrays, not in meta.json.
+
+    Expected Outcome:
+        - meta.json holds only the class row ranges
+        - The attached collection has the same objects, vectors and classes
+    """
+    objects, vectors = clustered_corpus(CorpusSeed(objects=200, clusters=3, seed=2))
+    directory = tmp_path / "collection"
+    publish_collection(directory, main.build_collection(objects, vectors))
+
+    assert (directory / shared_data.META_FILE).read_text() == '{"classes":{"Document":[0,200]}}'
+    attached = attach_collection(directory)
+    assert list(attached.objects) == objects
+    assert np.array_equal(attached.vectors, vectors)
+    assert attached.classes == {"Document": (0, 200)}
+
+
+def test_worker_attaches_published_collection(tmp_path):
+    """Test that a worker process started with WEAVIATE_MOCK_SHARED_DIR uses the owner's vectors.
+
+    Expected Outcome:
+        - The worker serves exactly the published vectors instead of generating its own
+    """
+    directory = tmp_path / "collection"
+    publish_collection(directory, main.collection)
+    worker = subprocess.run(
+        [sys.executable, "-c", "from src.main import collection; print(repr(float(collection.vectors.sum())))"],
+        cwd=SERVICE_ROOT,
+        env={**os.environ, "WEAVIATE_MOCK_SHARED_DIR": str(directory)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert float(worker.stdout) == float(main.collection.vectors.sum())
+
+
+def test_worker_starts_from_snapshot(tmp_path):
+    """Test startup from a corpus precomputed with `python -m src.seeding`.
+
+    Expected Outcome:
+        - A process started with WEAVIATE_MOCK_SNAPSHOT_DIR serves the snapshot's objects and vectors
+    """
+    directory = tmp_path / "snapshot"
+    seeding.main([str(directory), "--objects", "50", "--clusters", "3", "--seed", "4"])
+    objects, vectors = clustered_corpus(CorpusSeed(objects=50, clusters=3, seed=4))
+    worker = subprocess.run(
+        [sys.executable, "-c",
+         "from src.main import collection; print(len(collection), float(collection.vectors.sum()))"],
+        cwd=SERVICE_ROOT,
+        env={**os.environ, "WEAVIATE_MOCK_SNAPSHOT_DIR": str(directory)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    count, total = worker.stdout.split()
+    assert int(count) == len(objects)
+    assert float(total) == float(vectors.sum())
+
+
+def test_sample_vectors_are_identical_across_processes():
+    """Test that the built-in sample collection no longer draws unseeded random vectors.
+
+    Expected Outcome:
+        - A separately started process serves exactly the vectors of this one
+    """
+    worker = subprocess.run(
+        [sys.executable, "-c", "from src.main import collection; print(repr(float(collection.vectors.sum())))"],
+        cwd=SERVICE_ROOT,
+        env={key: value for key, value in os.environ.items() if not key.startswith("WEAVIATE_MOCK_")},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert float(worker.stdout) == float(main.collection.vectors.sum())
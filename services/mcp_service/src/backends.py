@@ -0,0 +1,473 @@
+"""
+Async clients for the database services the MCP routes to.
+
+Each DatabaseType has one DatabaseBackend implementation. A backend owns a
+long-lived pooled httpx.AsyncClient (keep-alive, timeouts, connection limits) per
+replica URL plus a semaphore that caps concurrent in-flight calls, and translates a routed query
+into the request format of its database service. Every request carries the current
+trace context as a ``traceparent`` header.
+
+Backends that have a batch endpoint can optionally merge concurrent calls into one
+round trip (MCP_MICROBATCH_BACKENDS); see batching.MicroBatcher.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+import httpx
+import orjson
+from service_common.tracing import inject
+
+from batching import MicroBatcher
+
+
+async def inject_trace_context(request: httpx.Request) -> None:
+    """Continue the current trace in the database service."""
+    inject(request.headers)
+
+
+class DatabaseType(str, Enum):
+    NEO4J = "neo4j"
+    WEAVIATE = "weaviate"
+    RELATIONAL = "relational"
+
+
+class BackendError(Exception):
+    """Raised when a backend call fails or the backend rejects the query."""
+
+    def __init__(self, database: DatabaseType, message: str, status_code: Optional[int] = None):
+        super().__init__(f"{database.value}: {message}")
+        self.database = database
+        self.status_code = status_code
+
+
+@dataclass
+class BackendSettings:
+    """Connection settings for one backend."""
+    base_url: str
+    replica_urls: List[str] = field(default_factory=list)
+    timeout: float = 5.0
+    connect_timeout: float = 1.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    max_concurrency: int = 64
+    batch_max_size: int = 0
+    batch_max_delay: float = 0.002
+
+    @classmethod
+    def from_env(cls, url_var: str, default_url: str, name: str = "") -> "BackendSettings":
+        batched = name in {item.strip() for item in os.getenv("MCP_MICROBATCH_BACKENDS", "").split(",")}
+        return cls(
+            base_url=os.getenv(url_var, default_url),
+            replica_urls=[url.strip() for url in os.getenv(f"{url_var}_REPLICAS", "").split(",") if url.strip()],
+            timeout=float(os.getenv("MCP_BACKEND_TIMEOUT", "5.0")),
+            connect_timeout=float(os.getenv("MCP_BACKEND_CONNECT_TIMEOUT", "1.0")),
+            max_connections=int(os.getenv("MCP_BACKEND_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("MCP_BACKEND_MAX_KEEPALIVE", "20")),
+            max_concurrency=int(os.getenv("MCP_BACKEND_MAX_CONCURRENCY", "64")),
+            batch_max_size=int(os.getenv("MCP_MICROBATCH_MAX_SIZE", "32")) if batched else 0,
+            batch_max_delay=float(os.getenv("MCP_MICROBATCH_MAX_DELAY_MS", "2")) / 1000,
+        )
+
+    @property
+    def urls(self) -> List[str]:
+        """Primary URL followed by any replica URLs."""
+        return [self.base_url, *self.replica_urls]
+
+
+@dataclass
+class BackendResult:
+    """Raw response of a backend call."""
+    database: DatabaseType
+    content: bytes
+    elapsed: float
+    replica: int = 0
+    _payload: Any = field(default=None, repr=False)
+
+    def json(self) -> Any:
+        if self._payload is None:
+            self._payload = orjson.loads(self.content)
+        return self._payload
+
+
+# One entry of a split batch response: the body for that caller, or its error
+BatchItem = Union[bytes, "BackendError"]
+
+
+class DatabaseBackend(ABC):
+    """Async client for one database service."""
+    database: DatabaseType
+    # Endpoint accepting several queries at once, or None if the service has none
+    batch_path: Optional[str] = None
+    # Endpoint streaming NDJSON records as they are produced, or None if the service has none
+    stream_path: Optional[str] = None
+
+    def __init__(self, settings: BackendSettings, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.settings = settings
+        self._transport = transport
+        self._clients: Dict[int, httpx.AsyncClient] = {}
+        self._semaphore = asyncio.Semaphore(settings.max_concurrency)
+        self._next_replica = 0
+        self._batchers: Dict[int, MicroBatcher] = {}
+
+    @property
+    def replica_count(self) -> int:
+        return len(self.settings.urls)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client of the primary replica."""
+        return self.client_for(0)
+
+    def client_for(self, replica: int) -> httpx.AsyncClient:
+        """The pooled client for one replica, created on first use and reused for every call."""
+        client = self._clients.get(replica)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=self.settings.urls[replica],
+                transport=self._transport,
+                timeout=httpx.Timeout(self.settings.timeout, connect=self.settings.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.settings.max_connections,
+                    max_keepalive_connections=self.settings.max_keepalive_connections,
+                    keepalive_expiry=self.settings.keepalive_expiry,
+                ),
+                event_hooks={"request": [inject_trace_context]},
+            )
+            self._clients[replica] = client
+        return client
+
+    def pick_replica(self) -> int:
+        """Round-robin replica for the next primary call."""
+        replica = self._next_replica
+        self._next_replica = (replica + 1) % self.replica_count
+        return replica
+
+    @abstractmethod
+    def build_request(self, query: str, parameters: Optional[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        """Translate a routed query into (path, JSON payload) for this backend."""
+
+    def is_read_only(self, query: str) -> bool:
+        """Whether running ``query`` twice is harmless, so calls may be coalesced or hedged."""
+        return True
+
+    @abstractmethod
+    def iter_records(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Split a complete response into records tagged with their kind under ``"record"``."""
+
+    @abstractmethod
+    def summarize_counts(self, counts: Dict[str, int]) -> str:
+        """Human readable one-line description from the number of records of each kind."""
+
+    def summarize(self, payload: Dict[str, Any]) -> str:
+        """Human readable one-line description of a backend response."""
+        counts: Dict[str, int] = {}
+        for record in self.iter_records(payload):
+            counts[record["record"]] = counts.get(record["record"], 0) + 1
+        return self.summarize_counts(counts)
+
+    def combine_batch(self, payloads: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Any]:
+        """Merge request payloads into one batch request body plus a plan for split_batch."""
+        return {"queries": payloads}, None
+
+    def split_batch(self, body: Dict[str, Any], plan: Any) -> List[BatchItem]:
+        """One response body (or error) per payload given to combine_batch."""
+        return [json.dumps(item).encode() for item in body["results"]]
+
+    @property
+    def batching(self) -> bool:
+        return self.batch_path is not None and self.settings.batch_max_size > 1
+
+    async def execute(self, query: str, parameters: Optional[Dict[str, Any]] = None,
+                      replica: int = 0) -> BackendResult:
+        """Run ``query`` against one replica of the backend and return its raw response."""
+        path, payload = self.build_request(query, parameters)
+        if self.batching:
+            return await self._batcher(replica).submit(payload)
+        response, elapsed = await self._post(replica, path, payload)
+        return BackendResult(database=self.database, content=response.content, elapsed=elapsed, replica=replica)
+
+    async def stream(self, query: str, parameters: Optional[Dict[str, Any]] = None,
+                     replica: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the records of ``query`` as the backend produces them.
+
+        Backends without a streaming endpoint yield the records of their complete response.
+        """
+        if self.stream_path is None:
+            result = await self.execute(query, parameters, replica)
+            for record in self.iter_records(result.json()):
+                yield record
+            return
+        _, payload = self.build_request(query, parameters)
+        async with self._semaphore:
+            try:
+                async with self.client_for(replica).stream("POST", self.stream_path, json=payload) as response:
+                    if response.status_code >= 400:
+                        body = await response.aread()
+                        raise BackendError(
+                            self.database, f"returned {response.status_code}: {body[:200].decode(errors='replace')}",
+                            status_code=response.status_code,
+                        )
+                    async for line in response.aiter_lines():
+                        if line:
+                            yield json.loads(line)
+            except httpx.TimeoutException as e:
+                raise BackendError(self.database, f"timed out: {e!r}", status_code=504) from e
+            except httpx.HTTPError as e:
+                raise BackendError(self.database, f"request failed: {e!r}") from e
+
+    async def _post(self, replica: int, path: str, payload: Dict[str, Any]) -> Tuple[httpx.Response, float]:
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                response = await self.client_for(replica).post(path, json=payload)
+            except httpx.TimeoutException as e:
+                raise BackendError(self.database, f"timed out: {e!r}", status_code=504) from e
+            except httpx.HTTPError as e:
+                raise BackendError(self.database, f"request failed: {e!r}") from e
+            elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise BackendError(
+                self.database, f"returned {response.status_code}: {response.text[:200]}",
+                status_code=response.status_code,
+            )
+        return response, elapsed
+
+    def _batcher(self, replica: int) -> MicroBatcher:
+        batcher = self._batchers.get(replica)
+        if batcher is None:
+            batcher = MicroBatcher(
+                lambda payloads: self._execute_batch(replica, payloads),
+                max_size=self.settings.batch_max_size,
+                max_delay=self.settings.batch_max_delay,
+            )
+            self._batchers[replica] = batcher
+        return batcher
+
+    async def _execute_batch(self, replica: int, payloads: List[Dict[str, Any]]) -> List[Any]:
+        """One round trip for a batch of payloads; failed entries come back as BackendError."""
+        body, plan = self.combine_batch(payloads)
+        response, elapsed = await self._post(replica, self.batch_path, body)
+        return [
+            item if isinstance(item, BackendError)
+            else BackendResult(database=self.database, content=item, elapsed=elapsed, replica=replica)
+            for item in self.split_batch(response.json(), plan)
+        ]
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+CYPHER_KEYWORDS = re.compile(r"^\s*(MATCH|CREATE|MERGE|UNWIND|RETURN|WITH|OPTIONAL\s+MATCH)\b", re.IGNORECASE)
+SQL_KEYWORDS = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+POINT_LOOKUP = re.compile(r"^\s*SELECT\s+\*\s+FROM\s+(\w+)\s+WHERE\s+(\w+)\s*=\s*('[^']*'|-?\d+)\s*;?\s*$",
+                          re.IGNORECASE)
+CYPHER_WRITE_KEYWORDS = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE)\b", re.IGNORECASE)
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Dimension of the vectors stored by the weaviate mock
+VECTOR_DIMENSION = 128
+
+
+def hash_embedding(text: str, dimension: int = VECTOR_DIMENSION) -> list:
+    """Deterministic bag-of-words embedding using the hashing trick.
+
+    Counts are non-negative so the cosine distance to the mock's stored vectors stays
+    in [0, 1]; crc32 keeps bucket assignment stable across processes.
+    """
+    vector = [0.0] * dimension
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        vector[zlib.crc32(token.encode()) % dimension] += 1.0
+    if not any(vector):
+        vector[0] = 1.0
+    return vector
+
+
+class Neo4jBackend(DatabaseBackend):
+    database = DatabaseType.NEO4J
+    stream_path = "/query/stream"
+
+    def build_request(self, query, parameters):
+        # Natural-language questions are answered with the full graph; Cypher passes through
+        cypher = query if CYPHER_KEYWORDS.match(query) else "MATCH (n) RETURN n"
+        return "/query", {"query": cypher, "parameters": parameters or {}}
+
+    def iter_records(self, payload):
+        for node in payload.get("nodes", []):
+            yield {"record": "node", **node}
+        for relationship in payload.get("relationships", []):
+            yield {"record": "relationship", **relationship}
+
+    def summarize(self, payload):
+        return (f"Found {len(payload.get('nodes', []))} nodes and "
+                f"{len(payload.get('relationships', []))} relationships")
+
+    def summarize_counts(self, counts):
+        return f"Found {counts.get('node', 0)} nodes and {counts.get('relationship', 0)} relationships"
+
+    def is_read_only(self, query):
+        return not (CYPHER_KEYWORDS.match(query) and CYPHER_WRITE_KEYWORDS.search(query))
+
+
+class WeaviateBackend(DatabaseBackend):
+    database = DatabaseType.WEAVIATE
+    batch_path = "/query/batch"
+
+    def build_request(self, query, parameters):
+        parameters = parameters or {}
+        return "/query", {
+            "vector": parameters.get("vector") or hash_embedding(query),
+            "class_name": parameters.get("class_name", "Document"),
+            "limit": parameters.get("limit", 10),
+            "distance_threshold": parameters.get("distance_threshold", 1.0),
+        }
+
+    def iter_records(self, payload):
+        for document in payload.get("results", []):
+            yield {"record": "document", **document}
+
+    def summarize(self, payload):
+        return f"Found {len(payload.get('results', []))} similar documents"
+
+    def summarize_counts(self, counts):
+        return f"Found {counts.get('document', 0)} similar documents"
+
+
+class RelationalBackend(DatabaseBackend):
+    database = DatabaseType.RELATIONAL
+    batch_path = "/query/batch"
+
+    # Keyword in a natural-language question -> table to read
+    TABLE_KEYWORDS = (("comment", "comments"), ("post", "posts"))
+
+    def build_request(self, query, parameters):
+        match = SQL_KEYWORDS.match(query)
+        if match:
+            sql, query_type = query, match.group(1).upper()
+        else:
+            lowered = query.lower()
+            table = next((table for keyword, table in self.TABLE_KEYWORDS if keyword in lowered), "users")
+            sql, query_type = f"SELECT * FROM {table}", "SELECT"
+        return "/query", {"query": sql, "query_type": query_type, "parameters": parameters}
+
+    def iter_records(self, payload):
+        if payload.get("results") is None:
+            # Writes have no rows, only a status
+            yield {"record": "status", "affected_rows": payload.get("affected_rows"), "message": payload.get("message")}
+            return
+        for row in payload["results"]:
+            yield {"record": "row", "values": row}
+
+    def summarize(self, payload):
+        if payload.get("results") is not None:
+            return f"Found {len(payload['results'])} records"
+        return payload.get("message") or f"{payload.get('affected_rows', 0)} rows affected"
+
+    def summarize_counts(self, counts):
+        return f"Found {counts.get('row', 0)} records"
+
+    def is_read_only(self, query):
+        match = SQL_KEYWORDS.match(query)
+        return match is None or match.group(1).upper() == "SELECT"
+
+    def combine_batch(self, payloads):
+        """Point lookups on the same table and column are merged into one IN query."""
+        lookups: Dict[Tuple[str, str], List[int]] = {}
+        for index, payload in enumerate(payloads):
+            match = None if payload.get("parameters") else POINT_LOOKUP.match(payload["query"])
+            if match:
+                lookups.setdefault((match.group(1), match.group(2)), []).append(index)
+
+        queries: List[Dict[str, Any]] = []
+        plan: List[Optional[Tuple[int, Optional[Tuple[str, Any]]]]] = [None] * len(payloads)
+        for (table, column), indices in lookups.items():
+            if len(indices) < 2:
+                continue
+            literals = [POINT_LOOKUP.match(payloads[index]["query"]).group(3) for index in indices]
+            unique = list(dict.fromkeys(literals))
+            queries.append({
+                "query": f"SELECT * FROM {table} WHERE {column} IN ({', '.join(unique)})",
+                "query_type": "SELECT",
+                "parameters": None,
+            })
+            for index, literal in zip(indices, literals):
+                plan[index] = (len(queries) - 1, (column, _sql_literal(literal)))
+        for index, payload in enumerate(payloads):
+            if plan[index] is None:
+                queries.append(payload)
+                plan[index] = (len(queries) - 1, None)
+        return {"queries": queries}, plan
+
+    def split_batch(self, body, plan):
+        items: List[BatchItem] = []
+        for position, row_filter in plan:
+            result = body["results"][position]
+            if result["status_code"] >= 400:
+                items.append(BackendError(
+                    self.database, f"returned {result['status_code']}: {result.get('detail')}",
+                    status_code=result["status_code"],
+                ))
+                continue
+            response = result["response"]
+            if row_filter is not None:
+                column, value = row_filter
+                rows = [row for row in response.get("results") or [] if row.get(column) == value]
+                response = {"results": rows, "affected_rows": None, "message": None if rows else "No data found"}
+            items.append(json.dumps(response).encode())
+        return items
+
+
+def _sql_literal(token: str) -> Any:
+    return token[1:-1] if token.startswith("'") else int(token)
+
+
+BACKEND_CLASSES: Dict[DatabaseType, Type[DatabaseBackend]] = {
+    DatabaseType.NEO4J: Neo4jBackend,
+    DatabaseType.WEAVIATE: WeaviateBackend,
+    DatabaseType.RELATIONAL: RelationalBackend,
+}
+
+# Environment variable and default URL of each backend (matching docker-compose)
+BACKEND_URLS: Dict[DatabaseType, Tuple[str, str]] = {
+    DatabaseType.NEO4J: ("NEO4J_MOCK_URL", "http://neo4j_mock:8002"),
+    DatabaseType.WEAVIATE: ("WEAVIATE_MOCK_URL", "http://weaviate_mock:8003"),
+    DatabaseType.RELATIONAL: ("RELATIONAL_MOCK_URL", "http://relational_mock:8004"),
+}
+
+
+class BackendRegistry:
+    """Holds one long-lived backend client per database."""
+
+    def __init__(
+        self,
+        settings: Optional[Dict[DatabaseType, BackendSettings]] = None,
+        transports: Optional[Dict[DatabaseType, httpx.AsyncBaseTransport]] = None,
+    ):
+        self.settings = settings or {
+            database: BackendSettings.from_env(var, default, database.value)
+            for database, (var, default) in BACKEND_URLS.items()
+        }
+        self.transports = transports or {}
+        self._backends: Dict[DatabaseType, DatabaseBackend] = {}
+
+    def get(self, database: DatabaseType) -> DatabaseBackend:
+        backend = self._backends.get(database)
+        if backend is None:
+            backend = BACKEND_CLASSES[database](self.settings[database], self.transports.get(database))
+            self._backends[database] = backend
+        return backend
+
+    async def aclose(self) -> None:
+        for backend in self._backends.values():
+            await backend.aclose()
+        self._backends.clear()
@@ -0,0 +1,75 @@
+"""
+Micro-batching of concurrent backend calls.
+
+A MicroBatcher collects submitted items for up to ``max_delay`` seconds or
+``max_size`` items, whichever comes first, hands them to one ``dispatch`` call
+and resolves every caller's future with its own entry of the result list.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+# dispatch(items) returns one result per item; an exception instance fails only that item
+Dispatch = Callable[[List[Any]], Awaitable[List[Any]]]
+
+
+class MicroBatcher:
+    """Merges concurrent submissions into batched dispatch calls."""
+
+    def __init__(self, dispatch: Dispatch, max_size: int = 32, max_delay: float = 0.002):
+        self.dispatch = dispatch
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Callers that gave up while waiting are not sent
+        batch = [(item, future) for item, future in self._pending if not future.done()]
+        self._pending = []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            try:
+                results = await self.dispatch([item for item, _ in batch])
+            except Exception as e:  # noqa: BLE001 - not swallowed: re-raised in every caller below
+                results = [e] * len(batch)
+            if len(results) != len(batch):
+                error = RuntimeError(
+                    f"batch dispatch returned {len(results)} results for {len(batch)} items"
+                )
+                results = [error] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            # A cancelled or otherwise aborted dispatch must not leave callers waiting forever
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("batch dispatch did not complete"))
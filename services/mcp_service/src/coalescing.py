@@ -0,0 +1,65 @@
+"""
+Single-flight coalescing of identical concurrent backend calls.
+
+Concurrent callers asking for the same key share one in-flight task instead of
+issuing their own request. The task is not owned by any one caller: it keeps
+running while at least one caller is still waiting and is cancelled when the
+last one goes away.
+"""
+import asyncio
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def coalesce_key(database: str, query: str, parameters: Optional[Dict[str, Any]]) -> Tuple[str, str, str]:
+    """(database, whitespace-normalized query, canonical parameters)."""
+    normalized = WHITESPACE.sub(" ", query).strip()
+    return database, normalized, json.dumps(parameters or {}, sort_keys=True, default=str)
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Future
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls by key; the first caller leads, the others share its result."""
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.leaders += 1
+        else:
+            self.shared += 1
+        flight.waiters += 1
+        try:
+            # shield: one caller being cancelled must not cancel the call for everybody else
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def snapshot(self) -> Dict[str, int]:
+        return {"in_flight": len(self._flights), "leaders": self.leaders, "shared": self.shared}
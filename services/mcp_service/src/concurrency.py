@@ -0,0 +1,155 @@
+"""
+Adaptive concurrency limits and load shedding.
+
+An AdaptiveLimiter caps in-flight calls with an AIMD rule driven by measured
+latency. The limit grows by about one per round trip while latency stays close
+to the no-load baseline. It shrinks multiplicatively, at most once per round
+trip, when a call fails or when the median latency of the last ``window`` calls
+has stayed above ``tolerance`` times the baseline for ``patience`` calls in a
+row. Slow outliers are ordinary jitter and do not move the median; overload
+slows most calls and does. Baselines below ``min_baseline`` count
+as that floor, so sub-millisecond local calls do not turn a few milliseconds of
+noise into a "2x slower" signal. Callers over the limit are rejected at once
+instead of queueing, so an overload turns into fast 503s rather than timeouts
+on every tier.
+
+Priority classes get a share of the limit. Low-priority work is shed first and
+high-priority work keeps the whole limit.
+"""
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional
+
+
+class Priority(str, Enum):
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+# Fraction of the current limit each priority class may occupy
+PRIORITY_SHARES: Dict[Priority, float] = {Priority.HIGH: 1.0, Priority.NORMAL: 0.9, Priority.LOW: 0.7}
+
+
+@dataclass
+class LimiterSettings:
+    initial_limit: float = 100.0
+    min_limit: float = 4.0
+    max_limit: float = 1000.0
+    tolerance: float = 2.0
+    backoff: float = 0.9
+    retry_after: float = 1.0
+    # Recent calls whose median latency is compared with the baseline
+    window: int = 20
+    # Consecutive calls the median must stay high before backing off
+    patience: int = 3
+    # Seconds; smaller measured baselines are raised to this
+    min_baseline: float = 0.005
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "LimiterSettings":
+        return cls(
+            initial_limit=float(os.getenv(f"{prefix}_INITIAL", "100")),
+            min_limit=float(os.getenv(f"{prefix}_MIN", "4")),
+            max_limit=float(os.getenv(f"{prefix}_MAX", "1000")),
+            tolerance=float(os.getenv(f"{prefix}_TOLERANCE", "2.0")),
+            backoff=float(os.getenv(f"{prefix}_BACKOFF", "0.9")),
+            retry_after=float(os.getenv(f"{prefix}_RETRY_AFTER", "1")),
+            window=int(os.getenv(f"{prefix}_WINDOW", "20")),
+            patience=int(os.getenv(f"{prefix}_PATIENCE", "3")),
+            min_baseline=float(os.getenv(f"{prefix}_MIN_BASELINE", "0.005")),
+        )
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit; ``try_acquire`` never blocks."""
+
+    def __init__(self, name: str, settings: Optional[LimiterSettings] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.settings = settings or LimiterSettings()
+        self.clock = clock
+        self.limit = self.settings.initial_limit
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self._recent: Deque[float] = deque(maxlen=self.settings.window)
+        self.rejected = 0
+        self._slow_streak = 0
+        self._last_decrease = float("-inf")
+
+    def try_acquire(self, priority: Priority = Priority.NORMAL) -> Optional[float]:
+        """Admit a call and return its start time, or None if it should be shed."""
+        if self.in_flight >= max(1.0, self.limit * PRIORITY_SHARES[priority]):
+            self.rejected += 1
+            return None
+        self.in_flight += 1
+        return self.clock()
+
+    def release(self, started: float, ok: bool = True, latency: Optional[float] = None) -> None:
+        """Finish an admitted call and adapt the limit to its latency.
+
+        ``latency`` defaults to the time since ``started``; long-lived calls such as
+        streams pass the part of it that reflects backend load.
+        """
+        self.in_flight = max(0, self.in_flight - 1)
+        if latency is None:
+            latency = self.clock() - started
+        settings = self.settings
+        slow = False
+        if ok:
+            self._update_baseline(latency)
+            self._recent.append(latency)
+            slow = self.median_latency() > settings.tolerance * max(self.baseline, settings.min_baseline)
+            self._slow_streak = self._slow_streak + 1 if slow else 0
+        if not ok or self._slow_streak >= settings.patience:
+            # One decrease per round trip: calls that started before the last decrease
+            # saw the old limit and carry no new information
+            if started >= self._last_decrease:
+                self.limit = max(settings.min_limit, self.limit * settings.backoff)
+                self._last_decrease = self.clock()
+                self._slow_streak = 0
+        elif not slow and (self.in_flight + 1) * 2 >= self.limit:
+            # Only grow while the limit is actually being used
+            self.limit = min(settings.max_limit, self.limit + 1.0 / self.limit)
+
+    def median_latency(self) -> Optional[float]:
+        """Median latency of the last ``window`` successful calls."""
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        return ordered[len(ordered) // 2]
+
+    def cancel(self) -> None:
+        """Finish an admitted call that was abandoned; says nothing about load."""
+        self.in_flight = max(0, self.in_flight - 1)
+
+    def _update_baseline(self, latency: float) -> None:
+        # Decaying minimum: follows drops at once, drifts slowly upwards so a
+        # permanently slower backend eventually becomes the new normal
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += (latency - self.baseline) * 0.01
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "baseline_latency": self.baseline,
+            "median_latency": self.median_latency(),
+            "rejected": self.rejected,
+        }
+
+
+def parse_priorities(spec: str) -> Dict[str, Priority]:
+    """Parse ``intent=priority`` pairs, e.g. ``semantic_search=low,structured_data=high``."""
+    priorities: Dict[str, Priority] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        intent, _, priority = item.partition("=")
+        priorities[intent.strip()] = Priority(priority.strip().lower())
+    return priorities
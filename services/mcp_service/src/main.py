@@ -1,48 +1,105 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+import orjson
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, constr, validator
-from enum import Enum
-from typing import Optional, List, Dict
+from typing import Any, AsyncIterator, Awaitable, Optional, List, Dict, Tuple
+from service_common.metrics import REGISTRY, instrument, stage
+from service_common.profiling import ProfilingSettings, enable_profiling
+from service_common.tracing import TraceSettings, Tracer, trace_requests
+
+from backends import BackendError, BackendRegistry, BackendResult, DatabaseType
+from coalescing import SingleFlight, coalesce_key
+from concurrency import AdaptiveLimiter, LimiterSettings, Priority, parse_priorities
+from resilience import BreakerSettings, BreakerState, CircuitBreaker, HedgeBudget, HedgeSettings, hedge_delay
+from routing import RoutingTable
+
+
+# Long-lived backend clients, shared by all requests and closed on shutdown
+backends = BackendRegistry()
+
+# One circuit breaker per backend, shared by all requests
+breakers: Dict[DatabaseType, CircuitBreaker] = {
+    database: CircuitBreaker(database.value, BreakerSettings.from_env()) for database in DatabaseType
+}
+
+# Hedging is opt-in per backend (MCP_HEDGE_BACKENDS); each backend pays for its hedges from its own budget
+hedge_settings = HedgeSettings.from_env()
+hedge_budgets: Dict[DatabaseType, HedgeBudget] = {
+    database: HedgeBudget(hedge_settings.budget_ratio, hedge_settings.budget_burst) for database in DatabaseType
+}
+
+# Identical concurrent reads share one downstream call
+single_flight = SingleFlight()
+
+# Adaptive concurrency limits for /route as a whole and for each backend
+route_limiter = AdaptiveLimiter("route", LimiterSettings.from_env("MCP_ROUTE_LIMIT"))
+backend_limiters: Dict[DatabaseType, AdaptiveLimiter] = {
+    database: AdaptiveLimiter(database.value, LimiterSettings.from_env("MCP_BACKEND_LIMIT"))
+    for database in DatabaseType
+}
+
+# Shedding priority per intent, e.g. MCP_INTENT_PRIORITIES="semantic_search=low,structured_data=high"
+INTENT_PRIORITIES: Dict[str, Priority] = parse_priorities(os.getenv("MCP_INTENT_PRIORITIES", ""))
+
+# Intent -> databases, from MCP_ROUTING_TABLE (hot-reloaded) or the built-in defaults
+routing_table = RoutingTable.from_env()
+
+# Upper bound for one attempt when another database is still left in the fallback chain
+FALLBACK_ATTEMPT_TIMEOUT = float(os.getenv("MCP_FALLBACK_ATTEMPT_TIMEOUT", "2.0"))
+
+# Loop time at which the current fallback attempt times out; calls cancelled past it count as failures
+attempt_deadline: ContextVar[Optional[float]] = ContextVar("attempt_deadline", default=None)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await backends.aclose()
 
 
 app = FastAPI(
     title="MCP Service",
     description="Model Context Protocol Service - Central routing hub",
+    lifespan=lifespan,
 )
+instrument(app)
 
+# Request traces, continued from the chatbot and into the mocks (MCP_TRACE_EXPORTER, MCP_TRACE_SAMPLE_RATIO)
+tracer = Tracer(TraceSettings.from_env("MCP_TRACE", "mcp"))
+trace_requests(app, tracer)
 
-# Define supported intents and their database mappings
-class DatabaseType(str, Enum):
-    NEO4J = "neo4j"
-    WEAVIATE = "weaviate"
-    RELATIONAL = "relational"
+# POST /admin/profile and X-Profile: 1 requests, enabled by MCP_PROFILING_TOKEN
+profiler = enable_profiling(app, ProfilingSettings.from_env("MCP", "mcp"))
 
+# Backend call latency by database and outcome; streams are timed to their first record
+BACKEND_CALL_DURATION = REGISTRY.histogram(
+    "mcp_backend_call_duration_seconds", "Time of one call to a database backend.",
+    ("backend", "mode", "outcome"),
+)
 
-# Database priority for hybrid intents
-DATABASE_PRIORITIES = {
-    "graph_with_semantic": [DatabaseType.NEO4J, DatabaseType.WEAVIATE],
-    "hybrid_fallback": [DatabaseType.NEO4J, DatabaseType.RELATIONAL, DatabaseType.WEAVIATE],
-    "priority_check": [DatabaseType.WEAVIATE, DatabaseType.NEO4J]
-}
+# Hot-path stages of /route, exported as stage_duration_seconds on /metrics
+PLAN_STAGE = stage("plan")
+EXECUTE_STAGE = stage("execute")
+SERIALIZE_STAGE = stage("serialize")
 
-# Basic intent to database mapping
-INTENT_TO_DB_MAP = {
-    "graph_relationships": DatabaseType.NEO4J,
-    "semantic_search": DatabaseType.WEAVIATE,
-    "structured_data": DatabaseType.RELATIONAL,
-    "test intent": DatabaseType.NEO4J
-}
 
 # Pydantic models for request/response validation
 class RouteRequest(BaseModel):
     query: constr(min_length=1)
     intent: str
+    parameters: Optional[Dict[str, Any]] = None
 
     @validator('intent')
     def validate_intent(cls, v):
         if not isinstance(v, str):
             raise ValueError("Intent must be a string")
-        # Check if it's a known intent or a valid hierarchical intent
-        if v not in INTENT_TO_DB_MAP and v not in DATABASE_PRIORITIES and not any(c for c in v if c == '.'):
+        # Known intents and any hierarchical (dotted) intent resolve to a route
+        if routing_table.resolve(v) is None:
             raise ValueError("Unsupported intent type")
         return v
 
@@ -50,54 +107,526 @@ class RouteRequest(BaseModel):
 class RouteResponse(BaseModel):
     database: str
     response: str
-    fallback_info: Optional[Dict[str, str]] = None
+    fallback_info: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
 
 
 class HealthResponse(BaseModel):
     status: str
 
 
+class BackendUnavailable(Exception):
+    """Raised when no database in the fallback chain produced a result."""
+
+    def __init__(self, tried: List[str], skipped: List[str], errors: Dict[str, str],
+                 status_code: int, retry_after: float = 0.0):
+        super().__init__("; ".join(errors.values()) or "all backends are unavailable")
+        self.tried = tried
+        self.skipped = skipped
+        self.errors = errors
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
 def get_database_for_intent(intent: str) -> tuple[DatabaseType, Optional[Dict[str, str]]]:
     """
     Determine the appropriate database based on intent with fallback support.
     Returns tuple of (selected_database, fallback_info).
     """
-    # Handle hierarchical intents
-    if '.' in intent:
-        # For demonstration, route hierarchical intents to Neo4j
-        return DatabaseType.NEO4J, {"intent_type": "hierarchical"}
+    databases, fallback_info = get_fallback_chain(intent)
+    return databases[0], fallback_info
+
+
+def get_fallback_chain(intent: str) -> Tuple[List[DatabaseType], Optional[Dict[str, Any]]]:
+    """
+    Ordered list of databases to try for an intent, plus the initial fallback_info.
+    Hierarchical intents use their longest configured prefix.
+    """
+    resolution = routing_table.resolve(intent)
+    if resolution is None:
+        raise ValueError("Unsupported intent type")
+    return list(resolution.route.databases), resolution.fallback_info()
+
+
+def get_intent_priority(intent: str) -> Priority:
+    """
+    Shedding priority: the route's own, else MCP_INTENT_PRIORITIES, else normal.
+    """
+    resolution = routing_table.resolve(intent)
+    if resolution is not None and resolution.route.priority is not None:
+        return resolution.route.priority
+    return INTENT_PRIORITIES.get(intent, Priority.NORMAL)
+
+
+def admit_backend_call(database: DatabaseType) -> Optional[float]:
+    """
+    Circuit breaker and concurrency limiter admission for a call outside the fallback
+    chain, such as a hedge. Returns the limiter admission, or None when either refuses.
+    """
+    breaker = breakers[database]
+    if not breaker.allow_request():
+        return None
+    admitted = backend_limiters[database].try_acquire()
+    if admitted is None:
+        breaker.record_cancelled()
+    return admitted
+
+
+async def call_backend(database: DatabaseType, query: str, parameters: Optional[Dict[str, Any]],
+                       replica: int, admitted: Optional[float] = None) -> BackendResult:
+    """
+    One backend call, admitted by the backend's concurrency limiter (unless the
+    caller already holds an admission) and with its outcome recorded on the
+    backend's circuit breaker.
+    """
+    limiter = backend_limiters[database]
+    breaker = breakers[database]
+    if admitted is None:
+        admitted = limiter.try_acquire()
+    if admitted is None:
+        # The call never reached the backend: hand back any half-open probe slot it claimed
+        breaker.record_cancelled()
+        raise BackendError(database, "concurrency limit reached", status_code=503)
+    start = time.perf_counter()
+    try:
+        with tracer.span("backend.query", kind="client", backend=database.value, replica=replica):
+            result = await backends.get(database).execute(query, parameters, replica)
+    except BackendError:
+        elapsed = time.perf_counter() - start
+        BACKEND_CALL_DURATION.labels(database.value, "request", "error").observe(elapsed)
+        breaker.record_failure(elapsed)
+        limiter.release(admitted, ok=False)
+        raise
+    except asyncio.CancelledError:
+        elapsed = time.perf_counter() - start
+        deadline = attempt_deadline.get()
+        if deadline is not None and asyncio.get_running_loop().time() >= deadline:
+            # Abandoned by the fallback attempt timeout: the only place that timeout is recorded
+            BACKEND_CALL_DURATION.labels(database.value, "request", "timeout").observe(elapsed)
+            breaker.record_failure(elapsed)
+        else:
+            BACKEND_CALL_DURATION.labels(database.value, "request", "cancelled").observe(elapsed)
+            breaker.record_cancelled()
+        limiter.cancel()
+        raise
+    BACKEND_CALL_DURATION.labels(database.value, "request", "ok").observe(time.perf_counter() - start)
+    breaker.record_success(result.elapsed)
+    limiter.release(admitted)
+    return result
+
+
+def pick_hedge_target(database: DatabaseType, replica: int,
+                      alternates: List[DatabaseType]) -> Optional[Tuple[DatabaseType, int, float]]:
+    """
+    Another replica of the same database if there is one, else the next healthy database in the chain.
+
+    The target must admit the hedge through its circuit breaker and concurrency limiter.
+    Returns (database, replica, admission), or None when no target admits it.
+    """
+    backend = backends.get(database)
+    if backend.replica_count > 1:
+        candidates = [(database, (replica + 1) % backend.replica_count)]
+    else:
+        candidates = [(alternate, None) for alternate in alternates
+                      if breakers[alternate].state == BreakerState.CLOSED]
+    for target, target_replica in candidates:
+        admitted = admit_backend_call(target)
+        if admitted is not None:
+            if target_replica is None:
+                target_replica = backends.get(target).pick_replica()
+            return target, target_replica, admitted
+    return None
+
+
+async def execute_hedged(
+    database: DatabaseType,
+    alternates: List[DatabaseType],
+    query: str,
+    parameters: Optional[Dict[str, Any]],
+) -> Tuple[BackendResult, Optional[Dict[str, Any]]]:
+    """
+    Call ``database`` and, if it is slower than its observed latency quantile, race a
+    duplicate against another replica or the next database in the chain.
+
+    The first successful answer wins and the other call is cancelled. Returns
+    (result, hedge_info); hedge_info is None when no hedge was sent.
+    """
+    budget = hedge_budgets[database]
+    budget.deposit()
+    backend = backends.get(database)
+    # Writes are never duplicated
+    delay = hedge_delay(hedge_settings, breakers[database]) if backend.is_read_only(query) else None
+    replica = backend.pick_replica()
+    if delay is None:
+        return await call_backend(database, query, parameters, replica), None
+
+    primary = asyncio.ensure_future(call_backend(database, query, parameters, replica))
+    tasks = [primary]
+    hedge_info: Optional[Dict[str, Any]] = None
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            target = pick_hedge_target(database, replica, alternates)
+            if target is not None:
+                hedge_database, hedge_replica, admitted = target
+                if budget.try_acquire():
+                    tasks.append(asyncio.ensure_future(
+                        call_backend(hedge_database, query, parameters, hedge_replica, admitted)
+                    ))
+                    hedge_info = {"after": round(delay, 4), "target": hedge_database.value,
+                                  "replica": hedge_replica, "won": False}
+                else:
+                    # Not sent: hand back the admissions the target granted
+                    breakers[hedge_database].record_cancelled()
+                    backend_limiters[hedge_database].cancel()
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        hedge_info["won"] = True
+                        budget.wins += 1
+                    return task.result(), hedge_info
+        # Both legs failed: report the primary's error
+        raise primary.exception()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def execute_coalesced(
+    database: DatabaseType,
+    alternates: List[DatabaseType],
+    query: str,
+    parameters: Optional[Dict[str, Any]],
+) -> Tuple[BackendResult, Optional[Dict[str, Any]]]:
+    """
+    Run a read through the single-flight layer so concurrent duplicates share one call.
+
+    Every caller arrives holding a breaker admission, but only the leader's call
+    records an outcome; followers hand theirs back so no half-open probe slot leaks.
+    """
+    if not backends.get(database).is_read_only(query):
+        return await execute_hedged(database, alternates, query, parameters)
+    led = False
+
+    def lead() -> Awaitable[Tuple[BackendResult, Optional[Dict[str, Any]]]]:
+        nonlocal led
+        led = True
+        return execute_hedged(database, alternates, query, parameters)
+
+    try:
+        return await single_flight.do(coalesce_key(database.value, query, parameters), lead)
+    finally:
+        if not led:
+            breakers[database].record_cancelled()
+
+
+async def execute_with_fallback(
+    databases: List[DatabaseType],
+    query: str,
+    parameters: Optional[Dict[str, Any]],
+) -> Tuple[BackendResult, List[str], List[str], Optional[Dict[str, Any]]]:
+    """
+    Try each database in order, skipping any whose circuit breaker is open.
+
+    Attempts that still have a fallback behind them are capped at
+    FALLBACK_ATTEMPT_TIMEOUT so a slow backend cannot stall the whole chain.
+    Returns (result, tried, skipped, hedge_info).
+    """
+    tried: List[str] = []
+    skipped: List[str] = []
+    errors: Dict[str, str] = {}
+    status_code = 503
+    for position, database in enumerate(databases):
+        breaker = breakers[database]
+        if not breaker.allow_request():
+            skipped.append(database.value)
+            continue
+        tried.append(database.value)
+        has_fallback = position < len(databases) - 1
+        try:
+            call = execute_coalesced(database, databases[position + 1:], query, parameters)
+            if has_fallback:
+                # Set before wait_for creates the attempt's task, which copies the context
+                token = attempt_deadline.set(asyncio.get_running_loop().time() + FALLBACK_ATTEMPT_TIMEOUT)
+                try:
+                    result, hedge_info = await asyncio.wait_for(call, FALLBACK_ATTEMPT_TIMEOUT)
+                finally:
+                    attempt_deadline.reset(token)
+            else:
+                result, hedge_info = await call
+        except asyncio.TimeoutError:
+            # The abandoned backend call recorded the timeout on the breaker as it was cancelled
+            errors[database.value] = f"{database.value}: timed out"
+            status_code = 504
+            continue
+        except BackendError as e:
+            errors[database.value] = str(e)
+            status_code = e.status_code if e.status_code in (503, 504) else 502
+            continue
+        return result, tried, skipped, hedge_info
+
+    retry_after = min((breakers[DatabaseType(name)].retry_after() for name in skipped),
+                      default=backend_limiters[databases[-1]].settings.retry_after)
+    raise BackendUnavailable(tried, skipped, errors, status_code if tried else 503, retry_after)
+
+
+def admit_route(request: RouteRequest) -> float:
+    """
+    Admit a routed request under the adaptive concurrency limit or shed it with 503.
+    """
+    priority = get_intent_priority(request.intent)
+    admitted = route_limiter.try_acquire(priority)
+    if admitted is None:
+        raise HTTPException(
+            status_code=503,
+            detail={"message": "MCP service is overloaded", "priority": priority.value},
+            headers={"Retry-After": str(max(1, round(route_limiter.settings.retry_after)))},
+        )
+    return admitted
+
+
+def unavailable_error(e: BackendUnavailable) -> HTTPException:
+    headers = {"Retry-After": str(max(1, round(e.retry_after)))} if e.status_code == 503 else None
+    return HTTPException(
+        status_code=e.status_code,
+        detail={"message": str(e), "tried": e.tried, "skipped": e.skipped, "errors": e.errors},
+        headers=headers,
+    )
 
-    # Check if it's a hybrid/complex intent with priorities
-    if intent in DATABASE_PRIORITIES:
-        fallback_info = {"primary_choice": DATABASE_PRIORITIES[intent][0]}
-        
-        # For demonstration, always use first available in priority list
-        return DATABASE_PRIORITIES[intent][0], fallback_info
 
-    # Fall back to basic intent mapping
-    return INTENT_TO_DB_MAP.get(intent, DatabaseType.NEO4J), None
+async def open_record_stream(
+    databases: List[DatabaseType],
+    query: str,
+    parameters: Optional[Dict[str, Any]],
+) -> Tuple[DatabaseType, Optional[Dict[str, Any]], AsyncIterator[Dict[str, Any]], List[str], List[str]]:
+    """
+    Start a record stream on the first database in the chain that answers.
+
+    Fallback is only possible until the first record arrives, so breakers and
+    limiters judge streams by their time to first record, and an attempt with a
+    fallback behind it must produce that record within FALLBACK_ATTEMPT_TIMEOUT.
+    Returns (database, first_record, remaining_records, tried, skipped).
+    """
+    tried: List[str] = []
+    skipped: List[str] = []
+    errors: Dict[str, str] = {}
+    status_code = 503
+    for position, database in enumerate(databases):
+        breaker = breakers[database]
+        if not breaker.allow_request():
+            skipped.append(database.value)
+            continue
+        tried.append(database.value)
+        limiter = backend_limiters[database]
+        admitted = limiter.try_acquire()
+        if admitted is None:
+            breaker.record_cancelled()
+            errors[database.value] = f"{database.value}: concurrency limit reached"
+            continue
+        backend = backends.get(database)
+        records = backend.stream(query, parameters, backend.pick_replica())
+        timeout = FALLBACK_ATTEMPT_TIMEOUT if position < len(databases) - 1 else None
+        start = time.perf_counter()
+        try:
+            with tracer.span("backend.stream", kind="client", backend=database.value):
+                async with asyncio.timeout(timeout):
+                    first = await records.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except TimeoutError:
+            elapsed = time.perf_counter() - start
+            BACKEND_CALL_DURATION.labels(database.value, "stream", "timeout").observe(elapsed)
+            breaker.record_failure(elapsed)
+            limiter.cancel()
+            await records.aclose()
+            errors[database.value] = f"{database.value}: timed out"
+            status_code = 504
+            continue
+        except BackendError as e:
+            elapsed = time.perf_counter() - start
+            BACKEND_CALL_DURATION.labels(database.value, "stream", "error").observe(elapsed)
+            breaker.record_failure(elapsed)
+            limiter.release(admitted, ok=False)
+            errors[database.value] = str(e)
+            status_code = e.status_code if e.status_code in (503, 504) else 502
+            continue
+        except asyncio.CancelledError:
+            BACKEND_CALL_DURATION.labels(database.value, "stream", "cancelled").observe(time.perf_counter() - start)
+            breaker.record_cancelled()
+            limiter.cancel()
+            await records.aclose()
+            raise
+        elapsed = time.perf_counter() - start
+        BACKEND_CALL_DURATION.labels(database.value, "stream", "ok").observe(elapsed)
+        breaker.record_success(elapsed)
+        limiter.release(admitted)
+        return database, first, records, tried, skipped
+
+    retry_after = min((breakers[DatabaseType(name)].retry_after() for name in skipped),
+                      default=backend_limiters[databases[-1]].settings.retry_after)
+    raise BackendUnavailable(tried, skipped, errors, status_code if tried else 503, retry_after)
+
+
+def ndjson_line(event: Dict[str, Any]) -> bytes:
+    return orjson.dumps(event) + b"\n"
+
+
+async def stream_route_events(
+    database: DatabaseType,
+    fallback_info: Optional[Dict[str, Any]],
+    first: Optional[Dict[str, Any]],
+    records: AsyncIterator[Dict[str, Any]],
+    admitted: float,
+    first_record_latency: float,
+) -> AsyncIterator[bytes]:
+    """
+    NDJSON events of a streamed route: route, one record event per record, then done or error.
+
+    The route slot is held until the stream ends, but the limiter learns the time to
+    first record: how long a stream lasts depends on its size and on the client.
+    """
+    backend = backends.get(database)
+    counts: Dict[str, int] = {}
+    status_message: Optional[str] = None
+    ok = False
+    try:
+        yield ndjson_line({"event": "route", "database": database.value, "fallback_info": fallback_info})
+        if first is not None:
+            record = first
+            while True:
+                kind = record["record"]
+                counts[kind] = counts.get(kind, 0) + 1
+                if kind == "status":
+                    status_message = record.get("message")
+                yield ndjson_line({"event": "record", "record": record})
+                try:
+                    record = await records.__anext__()
+                except StopAsyncIteration:
+                    break
+        yield ndjson_line({
+            "event": "done",
+            "database": database.value,
+            "counts": counts,
+            "response": status_message or backend.summarize_counts(counts),
+        })
+        ok = True
+    except BackendError as e:
+        yield ndjson_line({"event": "error", "detail": str(e)})
+    finally:
+        await records.aclose()
+        route_limiter.release(admitted, ok, latency=first_record_latency)
+
+
+def encode_route_response(
+    database: DatabaseType,
+    summary: str,
+    fallback_info: Optional[Dict[str, Any]],
+    content: bytes,
+) -> bytes:
+    """
+    RouteResponse JSON with the backend's response bytes spliced in as ``result``.
+
+    ``content`` has already been parsed once (for the summary), so it is known to be
+    valid JSON; splicing it avoids re-encoding a payload that grows with the result size.
+    """
+    return b"".join((
+        b'{"database":', orjson.dumps(database),
+        b',"response":', orjson.dumps(summary),
+        b',"fallback_info":', orjson.dumps(fallback_info),
+        b',"result":', content,
+        b"}",
+    ))
 
 
 # API endpoints
 @app.post("/route", response_model=RouteResponse)
-async def route_request(request: RouteRequest) -> RouteResponse:
+async def route_request(request: RouteRequest) -> Response:
     """
     Route a request to the appropriate database mock based on query and intent.
     Handles complex routing scenarios including hybrid intents and fallbacks.
+    Requests over the adaptive concurrency limit are shed with 503 and Retry-After.
     """
+    admitted = admit_route(request)
+    ok = False
     try:
-        database, fallback_info = get_database_for_intent(request.intent)
-        
-        response = RouteResponse(
-            database=database,
-            response="Mock routing response",
-            fallback_info=fallback_info
-        )
-        
+        response = await route_to_backends(request)
+        ok = True
         return response
-        
+    except HTTPException as e:
+        # Backend errors are not a sign that this service is overloaded; timeouts are
+        ok = e.status_code != 504
+        raise
+    finally:
+        route_limiter.release(admitted, ok)
+
+
+async def route_to_backends(request: RouteRequest) -> Response:
+    """
+    Execute a routed request along its fallback chain and build the response.
+    """
+    try:
+        with PLAN_STAGE.time(), tracer.span("plan", intent=request.intent):
+            databases, fallback_info = get_fallback_chain(request.intent)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        with EXECUTE_STAGE.time(), tracer.span("execute"):
+            result, tried, skipped, hedge_info = await execute_with_fallback(
+                databases, request.query, request.parameters
+            )
+    except BackendUnavailable as e:
+        raise unavailable_error(e)
+
+    if len(databases) > 1 or tried != [databases[0].value]:
+        fallback_info = {**(fallback_info or {}), "tried": tried, "skipped": skipped}
+    if hedge_info is not None:
+        fallback_info = {**(fallback_info or {}), "hedge": hedge_info}
+
+    with SERIALIZE_STAGE.time(), tracer.span("serialize"):
+        summary = backends.get(result.database).summarize(result.json())
+        content = encode_route_response(result.database, summary, fallback_info, result.content)
+    return Response(content=content, media_type="application/json")
+
+
+@app.post("/route/stream")
+async def route_request_stream(request: RouteRequest) -> StreamingResponse:
+    """
+    Streaming variant of /route returning newline-delimited JSON events.
+
+    Events: {"event": "route"} naming the database, one {"event": "record"} per
+    graph element, similar document or row as the backend produces it, then
+    {"event": "done"} with a summary, or {"event": "error"} if the backend fails
+    mid-stream. Errors before the first record return the same status codes as /route.
+    """
+    admitted = admit_route(request)
+    try:
+        databases, fallback_info = get_fallback_chain(request.intent)
+        database, first, records, tried, skipped = await open_record_stream(
+            databases, request.query, request.parameters
+        )
     except ValueError as e:
+        route_limiter.release(admitted)
         raise HTTPException(status_code=422, detail=str(e))
+    except BackendUnavailable as e:
+        route_limiter.release(admitted, ok=e.status_code != 504)
+        raise unavailable_error(e)
+    except BaseException:
+        route_limiter.cancel()
+        raise
+
+    first_record_latency = route_limiter.clock() - admitted
+    if len(databases) > 1 or tried != [databases[0].value]:
+        fallback_info = {**(fallback_info or {}), "tried": tried, "skipped": skipped}
+    return StreamingResponse(
+        stream_route_events(database, fallback_info, first, records, admitted, first_record_latency),
+        media_type="application/x-ndjson",
+    )
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -106,3 +635,37 @@ async def health_check() -> HealthResponse:
     Health check endpoint to verify service status
     """
     return HealthResponse(status="ok")
+
+
+@app.get("/health/backends")
+async def backend_health() -> Dict[str, Dict[str, Any]]:
+    """
+    Circuit breaker state and rolling statistics for every backend
+    """
+    return {
+        database.value: {**breaker.snapshot(), "hedging": hedge_budgets[database].snapshot()}
+        for database, breaker in breakers.items()
+    }
+
+
+@app.get("/health/load")
+async def load_health() -> Dict[str, Any]:
+    """
+    Adaptive concurrency limits, in-flight calls and shed requests
+    """
+    return {
+        "route": route_limiter.snapshot(),
+        "backends": {database.value: limiter.snapshot() for database, limiter in backend_limiters.items()},
+    }
+
+
+@app.post("/admin/routing/reload", dependencies=[Depends(profiler.require_admin)])
+async def reload_routing_table() -> Dict[str, Any]:
+    """
+    Re-read the routing table file now instead of waiting for the change check
+    """
+    if not routing_table.path:
+        raise HTTPException(status_code=409, detail="No routing table file configured (MCP_ROUTING_TABLE)")
+    if not routing_table.reload():
+        raise HTTPException(status_code=422, detail="Routing table is invalid; previous version kept")
+    return routing_table.summary()
@@ -0,0 +1,250 @@
+"""
+Per-backend health tracking: rolling latency/error windows, circuit breakers and
+hedging budgets.
+
+A breaker opens when the rolling error rate or p99 latency of its backend crosses
+a threshold, rejects calls without waiting while open, and after a cool-down lets
+a few half-open probe calls through to decide whether to close again.
+
+A hedged call sends a duplicate request once the primary has been outstanding for
+longer than the backend's observed latency quantile. Hedges are paid for from a
+token bucket refilled by a fraction of primary calls, so hedging can add at most
+that fraction of extra load however slow the backend gets.
+"""
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, FrozenSet, Optional, Tuple
+
+
+class LatencyWindow:
+    """Rolling window of (timestamp, latency, ok) samples bounded by age and count."""
+
+    def __init__(self, window_seconds: float = 30.0, max_samples: int = 512,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self._samples: Deque[Tuple[float, float, bool]] = deque(maxlen=max_samples)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self._samples.append((self.clock(), latency, ok))
+
+    def _trim(self) -> None:
+        cutoff = self.clock() - self.window_seconds
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+
+    def __len__(self) -> int:
+        self._trim()
+        return len(self._samples)
+
+    def error_rate(self) -> float:
+        self._trim()
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, _, ok in self._samples if not ok) / len(self._samples)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency at quantile ``q`` (0..1) over the window, or None without samples."""
+        self._trim()
+        if not self._samples:
+            return None
+        latencies = sorted(latency for _, latency, _ in self._samples)
+        return latencies[min(len(latencies) - 1, max(0, math.ceil(q * len(latencies)) - 1))]
+
+    def clear(self) -> None:
+        self._samples.clear()
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class BreakerSettings:
+    window_seconds: float = 30.0
+    min_requests: int = 20
+    error_rate_threshold: float = 0.5
+    p99_latency_threshold: float = 2.0
+    open_seconds: float = 10.0
+    half_open_probes: int = 3
+
+    @classmethod
+    def from_env(cls) -> "BreakerSettings":
+        return cls(
+            window_seconds=float(os.getenv("MCP_BREAKER_WINDOW_SECONDS", "30")),
+            min_requests=int(os.getenv("MCP_BREAKER_MIN_REQUESTS", "20")),
+            error_rate_threshold=float(os.getenv("MCP_BREAKER_ERROR_RATE", "0.5")),
+            p99_latency_threshold=float(os.getenv("MCP_BREAKER_P99_LATENCY", "2.0")),
+            open_seconds=float(os.getenv("MCP_BREAKER_OPEN_SECONDS", "10")),
+            half_open_probes=int(os.getenv("MCP_BREAKER_HALF_OPEN_PROBES", "3")),
+        )
+
+
+class CircuitBreaker:
+    """Closed -> open on high error rate or p99 latency; open -> half-open after a cool-down."""
+
+    def __init__(self, name: str, settings: Optional[BreakerSettings] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.settings = settings or BreakerSettings()
+        self.clock = clock
+        self.window = LatencyWindow(self.settings.window_seconds, clock=clock)
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.last_trip_reason: Optional[str] = None
+
+    @property
+    def state(self) -> BreakerState:
+        if self._state == BreakerState.OPEN and self.clock() - self._opened_at >= self.settings.open_seconds:
+            self._state = BreakerState.HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker admits probe calls again."""
+        if self.state != BreakerState.OPEN:
+            return 0.0
+        return max(0.0, self.settings.open_seconds - (self.clock() - self._opened_at))
+
+    def allow_request(self) -> bool:
+        """Whether a call may be attempted now; never blocks."""
+        state = self.state
+        if state == BreakerState.CLOSED:
+            return True
+        if state == BreakerState.HALF_OPEN and self._probes_in_flight < self.settings.half_open_probes:
+            self._probes_in_flight += 1
+            return True
+        return False
+
+    def record_success(self, latency: float) -> None:
+        if self._state == BreakerState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if latency >= self.settings.p99_latency_threshold:
+                self._trip(f"slow probe ({latency:.3f}s)")
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.settings.half_open_probes:
+                self._close()
+            return
+        self.window.record(latency, ok=True)
+        self._evaluate()
+
+    def record_failure(self, latency: float) -> None:
+        if self._state == BreakerState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._trip("failed probe")
+            return
+        self.window.record(latency, ok=False)
+        self._evaluate()
+
+    def record_cancelled(self) -> None:
+        """A call abandoned by the caller (e.g. the losing leg of a hedge) tells nothing about health."""
+        if self._state == BreakerState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _evaluate(self) -> None:
+        if self._state != BreakerState.CLOSED or len(self.window) < self.settings.min_requests:
+            return
+        error_rate = self.window.error_rate()
+        if error_rate >= self.settings.error_rate_threshold:
+            self._trip(f"error rate {error_rate:.0%}")
+            return
+        p99 = self.window.quantile(0.99)
+        if p99 is not None and p99 >= self.settings.p99_latency_threshold:
+            self._trip(f"p99 latency {p99:.3f}s")
+
+    def _trip(self, reason: str) -> None:
+        self._state = BreakerState.OPEN
+        self._opened_at = self.clock()
+        self.last_trip_reason = reason
+
+    def _close(self) -> None:
+        self._state = BreakerState.CLOSED
+        self.window.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "error_rate": round(self.window.error_rate(), 4),
+            "p99_latency": self.window.quantile(0.99),
+            "samples": len(self.window),
+            "last_trip_reason": self.last_trip_reason,
+        }
+
+
+@dataclass
+class HedgeSettings:
+    backends: FrozenSet[str] = frozenset()
+    quantile: float = 0.95
+    min_delay: float = 0.005
+    min_samples: int = 20
+    budget_ratio: float = 0.05
+    budget_burst: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "HedgeSettings":
+        names = os.getenv("MCP_HEDGE_BACKENDS", "")
+        return cls(
+            backends=frozenset(name.strip() for name in names.split(",") if name.strip()),
+            quantile=float(os.getenv("MCP_HEDGE_QUANTILE", "0.95")),
+            min_delay=float(os.getenv("MCP_HEDGE_MIN_DELAY", "0.005")),
+            min_samples=int(os.getenv("MCP_HEDGE_MIN_SAMPLES", "20")),
+            budget_ratio=float(os.getenv("MCP_HEDGE_BUDGET_RATIO", "0.05")),
+            budget_burst=float(os.getenv("MCP_HEDGE_BUDGET_BURST", "10")),
+        )
+
+    def enabled_for(self, name: str) -> bool:
+        return name in self.backends or "all" in self.backends
+
+
+class HedgeBudget:
+    """Token bucket: every primary call earns ``ratio`` tokens, every hedge spends one."""
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self.issued = 0
+        self.denied = 0
+        self.wins = 0
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def deposit(self) -> None:
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.issued += 1
+            return True
+        self.denied += 1
+        return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"tokens": round(self._tokens, 3), "issued": self.issued, "denied": self.denied, "wins": self.wins}
+
+
+def hedge_delay(settings: HedgeSettings, breaker: CircuitBreaker) -> Optional[float]:
+    """How long to wait for the primary before hedging, or None if the call should not be hedged.
+
+    Only healthy backends with enough recent samples are hedged; during an incident the
+    breaker takes over and duplicating requests would only add load.
+    """
+    if not settings.enabled_for(breaker.name) or breaker.state != BreakerState.CLOSED:
+        return None
+    if len(breaker.window) < settings.min_samples:
+        return None
+    latency = breaker.window.quantile(settings.quantile)
+    return max(settings.min_delay, latency or 0.0)
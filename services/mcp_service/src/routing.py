@@ -0,0 +1,195 @@
+"""
+Intent routing table.
+
+Intents are dotted paths (``analytics.graph.pagerank``). Each configured intent
+or intent prefix maps to an ordered list of databases (the first is the primary,
+the rest are fallbacks) and an optional shedding priority. Routes live in a trie
+keyed by path segment, so resolving an intent walks at most one node per segment
+and returns the longest configured prefix.
+
+The table is built from DEFAULT_ROUTES, or from a JSON file named by
+MCP_ROUTING_TABLE::
+
+    {
+      "routes": {
+        "graph_relationships": ["neo4j"],
+        "analytics": {"databases": ["neo4j", "relational"], "priority": "low"}
+      },
+      "hierarchical_default": ["neo4j"]
+    }
+
+The file is re-read when its modification time changes. A file that fails to
+load leaves the previous table in place.
+"""
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from backends import DatabaseType
+from concurrency import Priority
+
+logger = logging.getLogger(__name__)
+
+# Built-in routes, used when no routing table file is configured
+DEFAULT_ROUTES: Dict[str, Any] = {
+    "graph_relationships": ["neo4j"],
+    "semantic_search": ["weaviate"],
+    "structured_data": ["relational"],
+    "test intent": ["neo4j"],
+    # Hybrid intents, in priority order
+    "graph_with_semantic": ["neo4j", "weaviate"],
+    "hybrid_fallback": ["neo4j", "relational", "weaviate"],
+    "priority_check": ["weaviate", "neo4j"],
+}
+
+
+@dataclass(frozen=True)
+class Route:
+    databases: Tuple[DatabaseType, ...]
+    priority: Optional[Priority] = None
+
+
+@dataclass(frozen=True)
+class Resolution:
+    route: Route
+    matched: str
+    hierarchical: bool
+
+    def fallback_info(self) -> Optional[Dict[str, Any]]:
+        """Initial fallback_info reported by /route for this resolution."""
+        if self.hierarchical:
+            info: Dict[str, Any] = {"intent_type": "hierarchical"}
+            if self.matched:
+                info["matched_prefix"] = self.matched
+            return info
+        if len(self.route.databases) > 1:
+            return {"primary_choice": self.route.databases[0]}
+        return None
+
+
+class _Node:
+    __slots__ = ("children", "route")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Node"] = {}
+        self.route: Optional[Route] = None
+
+
+def parse_route(spec: Any) -> Route:
+    """A route is a list of database names or {"databases": [...], "priority": ...}."""
+    if isinstance(spec, dict):
+        databases, priority = spec.get("databases"), spec.get("priority")
+    else:
+        databases, priority = spec, None
+    if not isinstance(databases, list) or not databases:
+        raise ValueError(f"Route needs a non-empty list of databases, got {spec!r}")
+    return Route(
+        databases=tuple(DatabaseType(name) for name in databases),
+        priority=Priority(priority) if priority is not None else None,
+    )
+
+
+class IntentTrie:
+    """Routes keyed by dotted intent; lookups return the longest configured prefix."""
+
+    def __init__(self, routes: Dict[str, Any], hierarchical_default: Any = ("neo4j",)):
+        self._root = _Node()
+        self.size = 0
+        for intent, spec in routes.items():
+            self.insert(intent, parse_route(spec))
+        self.hierarchical_default = parse_route(list(hierarchical_default))
+
+    def insert(self, intent: str, route: Route) -> None:
+        node = self._root
+        for segment in intent.split("."):
+            node = node.children.setdefault(segment, _Node())
+        if node.route is None:
+            self.size += 1
+        node.route = route
+
+    def resolve(self, intent: str) -> Optional[Resolution]:
+        """Route for ``intent``, or None if a flat intent is not configured.
+
+        Dotted intents always resolve: to their longest configured prefix, or to
+        the hierarchical default when no prefix is configured.
+        """
+        segments = intent.split(".")
+        node = self._root
+        best: Optional[Tuple[Route, int]] = None
+        for depth, segment in enumerate(segments, start=1):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            if node.route is not None:
+                best = (node.route, depth)
+        hierarchical = len(segments) > 1
+        if best is not None:
+            route, depth = best
+            return Resolution(route, ".".join(segments[:depth]), hierarchical)
+        if hierarchical:
+            return Resolution(self.hierarchical_default, "", True)
+        return None
+
+
+class RoutingTable:
+    """IntentTrie that follows a JSON config file and reloads it when it changes."""
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.trie = IntentTrie(DEFAULT_ROUTES)
+        self.version = 0
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        if path:
+            self.reload()
+
+    @classmethod
+    def from_env(cls) -> "RoutingTable":
+        return cls(
+            path=os.getenv("MCP_ROUTING_TABLE") or None,
+            check_interval=float(os.getenv("MCP_ROUTING_RELOAD_INTERVAL", "2")),
+        )
+
+    def reload(self) -> bool:
+        """Load the config file now; returns False (keeping the old table) if it is invalid."""
+        if not self.path:
+            return False
+        try:
+            mtime = os.stat(self.path).st_mtime
+            with open(self.path) as f:
+                config = json.load(f)
+            trie = IntentTrie(config.get("routes", {}), config.get("hierarchical_default", ["neo4j"]))
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.error("Keeping routing table version %s, failed to load %s: %s", self.version, self.path, e)
+            return False
+        self.trie = trie
+        self._mtime = mtime
+        self.version += 1
+        return True
+
+    def _maybe_reload(self) -> None:
+        if not self.path:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime != self._mtime:
+            # Remember the attempt so a broken file is not re-parsed on every check
+            self._mtime = mtime
+            self.reload()
+
+    def resolve(self, intent: str) -> Optional[Resolution]:
+        self._maybe_reload()
+        return self.trie.resolve(intent)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"path": self.path, "version": self.version, "routes": self.trie.size}
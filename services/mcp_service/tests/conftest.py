@@ -0,0 +1,66 @@
+import json
+from typing import Callable, Dict, List
+
+import httpx
+import pytest
+
+import main
+from backends import BackendRegistry, DatabaseType
+from coalescing import SingleFlight
+from concurrency import AdaptiveLimiter
+from resilience import BreakerSettings, CircuitBreaker
+
+# Canned responses shaped like the three database mocks
+MOCK_PAYLOADS = {
+    DatabaseType.NEO4J: {
+        "nodes": [{"id": 1, "labels": ["Person"], "properties": {"name": "John"}}],
+        "relationships": [],
+    },
+    DatabaseType.WEAVIATE: {
+        "results": [{"id": "1", "class_name": "Document", "distance": 0.1, "properties": {}}],
+    },
+    DatabaseType.RELATIONAL: {
+        "results": [{"id": 1, "username": "john_doe"}],
+        "affected_rows": None,
+        "message": None,
+    },
+}
+
+Handler = Callable[[httpx.Request], httpx.Response]
+
+
+class FakeBackends:
+    """Routes backend calls to in-process handlers and records every request."""
+
+    def __init__(self) -> None:
+        self.calls: Dict[DatabaseType, List[dict]] = {database: [] for database in DatabaseType}
+        self.handlers: Dict[DatabaseType, Handler] = {}
+
+    def set_handler(self, database: DatabaseType, handler: Handler) -> None:
+        self.handlers[database] = handler
+
+    def transport(self, database: DatabaseType) -> httpx.MockTransport:
+        def handle(request: httpx.Request) -> httpx.Response:
+            self.calls[database].append(json.loads(request.content or b"null"))
+            handler = self.handlers.get(database)
+            if handler is not None:
+                return handler(request)
+            return httpx.Response(200, json=MOCK_PAYLOADS[database])
+        return httpx.MockTransport(handle)
+
+
+@pytest.fixture(autouse=True)
+def fake_backends(monkeypatch) -> FakeBackends:
+    """Replace the real backend clients with in-process fakes for every test."""
+    fakes = FakeBackends()
+    registry = BackendRegistry(transports={database: fakes.transport(database) for database in DatabaseType})
+    monkeypatch.setattr(main, "backends", registry)
+    monkeypatch.setattr(main, "breakers", {
+        database: CircuitBreaker(database.value, BreakerSettings()) for database in DatabaseType
+    })
+    monkeypatch.setattr(main, "single_flight", SingleFlight())
+    monkeypatch.setattr(main, "route_limiter", AdaptiveLimiter("route"))
+    monkeypatch.setattr(main, "backend_limiters", {
+        database: AdaptiveLimiter(database.value) for database in DatabaseType
+    })
+    return fakes
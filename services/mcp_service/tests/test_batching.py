@@ -0,0 +1,179 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import main
+from backends import BackendError, DatabaseType
+from batching import MicroBatcher
+
+
+def test_micro_batcher_flushes_on_size_and_delay():
+    """Test both flush triggers of the micro-batcher.
+
+    Expected Outcome:
+        - A full batch is dispatched immediately
+        - A partial batch is dispatched after max_delay
+        - Every caller receives its own result
+    """
+    async def scenario():
+        batches = []
+
+        async def dispatch(items):
+            batches.append(list(items))
+            return [item * 10 for item in items]
+
+        batcher = MicroBatcher(dispatch, max_size=3, max_delay=0.01)
+        assert await asyncio.gather(*(batcher.submit(i) for i in range(5))) == [0, 10, 20, 30, 40]
+        assert batches == [[0, 1, 2], [3, 4]]
+        assert (batcher.batches, batcher.items) == (2, 5)
+
+    asyncio.run(scenario())
+
+
+def test_micro_batcher_propagates_errors():
+    """Test error fan-out of the micro-batcher.
+
+    Expected Outcome:
+        - A per-item error fails only that caller
+        - A failed dispatch fails every caller in the batch
+    """
+    async def scenario():
+        async def dispatch(items):
+            if "down" in items:
+                raise RuntimeError("backend down")
+            return [ValueError(item) if item == "bad" else item for item in items]
+
+        batcher = MicroBatcher(dispatch, max_size=10, max_delay=0.001)
+        results = await asyncio.gather(batcher.submit("ok"), batcher.submit("bad"), return_exceptions=True)
+        assert results[0] == "ok" and isinstance(results[1], ValueError)
+        results = await asyncio.gather(batcher.submit("down"), batcher.submit("ok"), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    asyncio.run(scenario())
+
+
+def test_micro_batcher_fails_callers_of_cancelled_dispatch():
+    """Test that cancelling a dispatch does not strand its callers.
+
+    Expected Outcome:
+        - Every caller in the cancelled batch receives an error instead of hanging
+    """
+    async def scenario():
+        started = asyncio.Event()
+
+        async def dispatch(items):
+            started.set()
+            await asyncio.sleep(10)
+
+        batcher = MicroBatcher(dispatch, max_size=2, max_delay=0.001)
+        callers = asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+        await started.wait()
+        for task in list(batcher._running):
+            task.cancel()
+        results = await asyncio.wait_for(callers, timeout=1)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    asyncio.run(scenario())
+
+
+def test_micro_batcher_fails_batch_on_result_count_mismatch():
+    """Test that a dispatch returning too few results fails the whole batch.
+
+    Expected Outcome:
+        - Every caller receives an error, including those whose result was returned
+    """
+    async def scenario():
+        async def dispatch(items):
+            return items[:-1]
+
+        batcher = MicroBatcher(dispatch, max_size=3, max_delay=0.001)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True), timeout=1)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def batched(monkeypatch):
+    """Enable micro-batching for the weaviate and relational backends."""
+    for database in (DatabaseType.WEAVIATE, DatabaseType.RELATIONAL):
+        settings = main.backends.settings[database]
+        monkeypatch.setattr(settings, "batch_max_size", 16)
+        monkeypatch.setattr(settings, "batch_max_delay", 0.01)
+
+
+async def route_all(queries, intent):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as client:
+        return await asyncio.gather(*(
+            client.post("/route", json={"query": query, "intent": intent}) for query in queries
+        ))
+
+
+def test_concurrent_vector_searches_share_one_round_trip(fake_backends, batched):
+    """Test that concurrent semantic searches become one weaviate batch call.
+
+    Expected Outcome:
+        - One request to /query/batch carrying every query vector
+        - Each caller receives the result at its own position
+    """
+    def handler(request):
+        assert request.url.path == "/query/batch"
+        queries = json.loads(request.content)["queries"]
+        return httpx.Response(200, json={"results": [
+            {"results": [{"id": str(i), "class_name": "Document", "distance": 0.1, "properties": {}}] * (i + 1)}
+            for i in range(len(queries))
+        ]})
+
+    fake_backends.set_handler(DatabaseType.WEAVIATE, handler)
+    responses = asyncio.run(route_all([f"topic {i}" for i in range(5)], "semantic_search"))
+
+    assert len(fake_backends.calls[DatabaseType.WEAVIATE]) == 1
+    assert len(fake_backends.calls[DatabaseType.WEAVIATE][0]["queries"]) == 5
+    counts = sorted(len(response.json()["result"]["results"]) for response in responses)
+    assert counts == [1, 2, 3, 4, 5]
+
+
+def test_point_lookups_merge_into_in_query(fake_backends, batched):
+    """Test that concurrent SQL point lookups are merged into one IN query.
+
+    Expected Outcome:
+        - Lookups on the same table and column become `WHERE id IN (...)`
+        - Rows are fanned back out to the caller that asked for them
+        - Other statements travel in the same batch unchanged and fail individually
+    """
+    users = [{"id": 1, "username": "john_doe"}, {"id": 2, "username": "jane_smith"}]
+
+    def handler(request):
+        results = []
+        for query in json.loads(request.content)["queries"]:
+            if "IN" in query["query"]:
+                results.append({"status_code": 200, "response": {"results": users}})
+            else:
+                results.append({"status_code": 422, "detail": "bad query"})
+        return httpx.Response(200, json={"results": results})
+
+    fake_backends.set_handler(DatabaseType.RELATIONAL, handler)
+    queries = ["SELECT * FROM users WHERE id = 1", "SELECT * FROM users WHERE id = 2",
+               "SELECT * FROM users WHERE id = 7", "UPDATE users SET active = false"]
+    responses = asyncio.run(route_all(queries, "structured_data"))
+
+    batch = fake_backends.calls[DatabaseType.RELATIONAL]
+    assert len(batch) == 1
+    assert [query["query"] for query in batch[0]["queries"]] == [
+        "SELECT * FROM users WHERE id IN (1, 2, 7)", "UPDATE users SET active = false"]
+    assert responses[0].json()["result"]["results"] == [users[0]]
+    assert responses[1].json()["result"]["results"] == [users[1]]
+    assert responses[2].json()["result"]["message"] == "No data found"
+    assert responses[3].status_code == 502
+
+
+def test_relational_split_batch_reports_errors():
+    """Test that a failed entry in a relational batch becomes a BackendError."""
+    backend = main.backends.get(DatabaseType.RELATIONAL)
+    _, plan = backend.combine_batch([{"query": "SELECT * FROM x", "query_type": "SELECT", "parameters": None}])
+    items = backend.split_batch({"results": [{"status_code": 422, "detail": "nope"}]}, plan)
+    assert isinstance(items[0], BackendError) and items[0].status_code == 422
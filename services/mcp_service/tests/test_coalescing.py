@@ -0,0 +1,166 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from backends import DatabaseType
+from coalescing import SingleFlight, coalesce_key
+from conftest import MOCK_PAYLOADS
+
+
+def test_coalesce_key_normalizes_query_and_parameters():
+    """Test that equivalent requests map to the same single-flight key.
+
+    Expected Outcome:
+        - Whitespace differences and parameter order do not change the key
+        - Different databases or parameter values do
+    """
+    assert coalesce_key("neo4j", "MATCH  (n)\n RETURN n ", {"a": 1, "b": 2}) == \
+        coalesce_key("neo4j", "MATCH (n) RETURN n", {"b": 2, "a": 1})
+    assert coalesce_key("neo4j", "q", None) == coalesce_key("neo4j", "q", {})
+    assert coalesce_key("neo4j", "q", None) != coalesce_key("weaviate", "q", None)
+    assert coalesce_key("neo4j", "q", {"a": 1}) != coalesce_key("neo4j", "q", {"a": 2})
+
+
+def test_single_flight_shares_one_call():
+    """Test that concurrent callers with the same key share the leader's result or error.
+
+    Expected Outcome:
+        - The factory runs once per key for concurrent callers
+        - Errors are delivered to every waiter
+        - A later call after completion starts a new flight
+    """
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def work(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            if value == "bad":
+                raise ValueError("boom")
+            return value
+
+        results = await asyncio.gather(*(flight.do("k", lambda: work("v")) for _ in range(10)))
+        assert results == ["v"] * 10
+        errors = await asyncio.gather(*(flight.do("e", lambda: work("bad")) for _ in range(3)),
+                                      return_exceptions=True)
+        assert all(isinstance(error, ValueError) for error in errors)
+        await flight.do("k", lambda: work("v"))
+        assert calls == ["v", "bad", "v"]
+        assert flight.snapshot() == {"in_flight": 0, "leaders": 3, "shared": 11}
+
+    asyncio.run(scenario())
+
+
+def test_single_flight_survives_cancelled_waiter():
+    """Test cancellation semantics of a shared call.
+
+    Expected Outcome:
+        - Cancelling one waiter leaves the call running for the others
+        - Cancelling the last waiter cancels the underlying call
+    """
+    async def scenario():
+        flight = SingleFlight()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def work():
+            started.set()
+            await release.wait()
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await started.wait()
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        release.clear()
+        only = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        only.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await only
+        assert len(flight) == 0
+
+    asyncio.run(scenario())
+
+
+def test_route_coalesces_concurrent_identical_reads(fake_backends):
+    """Test /route under a burst of identical questions.
+
+    Purpose:
+        Verify the backend sees one call per distinct read query while writes are never merged.
+
+    Expected Outcome:
+        - 20 concurrent identical reads produce a single neo4j call
+        - A different query gets its own call
+        - Concurrent identical writes are all executed
+    """
+    async def slow(request):
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json=MOCK_PAYLOADS[DatabaseType.NEO4J])
+
+    fake_backends.set_handler(DatabaseType.NEO4J, slow)
+
+    async def burst(queries):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as client:
+            return await asyncio.gather(*(
+                client.post("/route", json={"query": query, "intent": "graph_relationships"})
+                for query in queries
+            ))
+
+    responses = asyncio.run(burst(["who knows John"] * 20 + ["MATCH (p:Person) RETURN p"]))
+    assert all(response.status_code == 200 for response in responses)
+    assert len(fake_backends.calls[DatabaseType.NEO4J]) == 2
+
+    fake_backends.calls[DatabaseType.NEO4J].clear()
+    asyncio.run(burst(["CREATE (n:Person {name: 'Ann'})"] * 3))
+    assert len(fake_backends.calls[DatabaseType.NEO4J]) == 3
+
+
+def test_coalesced_reads_release_half_open_probes(fake_backends):
+    """Test concurrent identical reads while the backend's breaker is half-open.
+
+    Purpose:
+        Each caller claims a probe slot, but only the leader's call reports an outcome.
+
+    Expected Outcome:
+        - Bursts of identical reads share one call and leave no probe in flight
+        - Repeated bursts keep being admitted instead of pinning the breaker open
+    """
+    async def slow(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=MOCK_PAYLOADS[DatabaseType.NEO4J])
+
+    fake_backends.set_handler(DatabaseType.NEO4J, slow)
+    breaker = main.breakers[DatabaseType.NEO4J]
+    breaker._trip("test")
+    breaker._opened_at -= breaker.settings.open_seconds
+
+    async def burst():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as client:
+            return await asyncio.gather(*(
+                client.post("/route", json={"query": "who knows John", "intent": "graph_relationships"})
+                for _ in range(2)
+            ))
+
+    for _ in range(breaker.settings.half_open_probes - 1):
+        responses = asyncio.run(burst())
+        assert [response.status_code for response in responses] == [200, 200]
+        assert breaker.snapshot()["state"] == "half_open"
+        assert breaker._probes_in_flight == 0
+
+    # One successful probe per burst, so the last one closes the breaker
+    responses = asyncio.run(burst())
+    assert [response.status_code for response in responses] == [200, 200]
+    assert breaker.snapshot()["state"] == "closed"
+    assert len(fake_backends.calls[DatabaseType.NEO4J]) == breaker.settings.half_open_probes
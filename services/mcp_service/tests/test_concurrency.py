@@ -0,0 +1,245 @@
+import asyncio
+import random
+
+import httpx
+from fastapi.testclient import TestClient
+
+import main
+from backends import DatabaseType
+from concurrency import AdaptiveLimiter, LimiterSettings, Priority, parse_priorities
+from conftest import MOCK_PAYLOADS
+
+client = TestClient(main.app)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run_calls(limiter: AdaptiveLimiter, clock: FakeClock, latency: float, count: int, concurrency: int) -> None:
+    """Run ``count`` calls in waves of ``concurrency`` that each take ``latency`` seconds."""
+    for _ in range(count // concurrency):
+        started = [limiter.try_acquire() for _ in range(concurrency)]
+        clock.now += latency
+        for start in started:
+            if start is not None:
+                limiter.release(start)
+
+
+def test_limiter_grows_while_latency_is_flat_and_backs_off_on_queueing():
+    """Test the AIMD rule.
+
+    Purpose:
+        Verify the limit increases additively while latency stays near the baseline
+        and decreases multiplicatively, once per round trip, when latency rises.
+
+    Expected Outcome:
+        - The limit grows under steady full utilization
+        - Two rounds of slow calls shrink it by one backoff step only, once the median
+          latency has stayed high for ``patience`` calls
+        - The limit never drops below the configured minimum
+    """
+    clock = FakeClock()
+    limiter = AdaptiveLimiter("test", LimiterSettings(initial_limit=10, min_limit=2, backoff=0.5), clock=clock)
+    run_calls(limiter, clock, 0.01, count=100, concurrency=9)
+    grown = limiter.limit
+    assert grown > 10
+
+    run_calls(limiter, clock, 0.1, count=18, concurrency=9)
+    # Until the median turns, slow calls still count as normal and may grow the limit a little
+    assert grown * 0.5 <= limiter.limit < grown * 0.55
+
+    for _ in range(10):
+        run_calls(limiter, clock, 1.0, count=2, concurrency=2)
+    assert limiter.limit == 2
+
+
+def test_limiter_ignores_jitter_around_a_tiny_baseline():
+    """Test that ordinary latency noise is not taken for overload.
+
+    Purpose:
+        Sub-millisecond local calls routinely take several times the fastest call
+        seen, and any backend has the odd slow outlier. Neither may shrink the limit.
+
+    Expected Outcome:
+        - With 8 concurrent callers and jittery latency, the limit never decreases
+        - Nothing is shed
+    """
+    # (fastest latency, spread of normal latencies above it)
+    for base, spread in ((0.0007, 3.0), (0.02, 1.5)):
+        clock = FakeClock()
+        rng = random.Random(0)
+        limiter = AdaptiveLimiter("test", LimiterSettings(initial_limit=20, min_limit=4), clock=clock)
+        for _ in range(150):
+            wave_start = clock.now
+            started = [limiter.try_acquire() for _ in range(8)]
+            latencies = sorted(base * rng.uniform(1.0, spread) * (4 if rng.random() < 0.1 else 1)
+                               for _ in started)
+            for start, latency in zip(started, latencies):
+                clock.now = wave_start + latency
+                assert start is not None
+                limiter.release(start)
+        assert limiter.limit >= 20
+        assert limiter.rejected == 0
+
+
+def test_limiter_sheds_low_priority_first():
+    """Test priority shares of the concurrency limit.
+
+    Expected Outcome:
+        - Low priority calls are rejected at 70% of the limit
+        - High priority calls may use the whole limit
+        - Rejections are counted
+    """
+    limiter = AdaptiveLimiter("test", LimiterSettings(initial_limit=10))
+    for _ in range(7):
+        assert limiter.try_acquire(Priority.LOW) is not None
+    assert limiter.try_acquire(Priority.LOW) is None
+    assert limiter.try_acquire(Priority.NORMAL) is not None
+    assert limiter.try_acquire(Priority.NORMAL) is not None
+    assert limiter.try_acquire(Priority.NORMAL) is None
+    assert limiter.try_acquire(Priority.HIGH) is not None
+    assert limiter.try_acquire(Priority.HIGH) is None
+    assert limiter.snapshot()["rejected"] == 3
+
+
+def test_parse_priorities():
+    """Test parsing of the MCP_INTENT_PRIORITIES setting."""
+    assert parse_priorities("semantic_search=low, structured_data=HIGH,") == {
+        "semantic_search": Priority.LOW,
+        "structured_data": Priority.HIGH,
+    }
+
+
+def test_route_sheds_excess_requests(fake_backends, monkeypatch):
+    """Test load shedding on /route under a burst larger than the limit.
+
+    Purpose:
+        Verify excess requests fail fast with 503 instead of queueing.
+
+    Expected Outcome:
+        - Requests within the limit succeed
+        - The rest get 503 with a Retry-After header
+        - /health/load reports the rejections
+    """
+    monkeypatch.setattr(main, "route_limiter",
+                        AdaptiveLimiter("route", LimiterSettings(initial_limit=4, min_limit=4, max_limit=4)))
+
+    async def slow(request):
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json=MOCK_PAYLOADS[DatabaseType.RELATIONAL])
+
+    fake_backends.set_handler(DatabaseType.RELATIONAL, slow)
+
+    async def burst():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as client:
+            responses = await asyncio.gather(*(
+                client.post("/route", json={"query": f"SELECT * FROM users WHERE id = {i}",
+                                            "intent": "structured_data"})
+                for i in range(10)
+            ))
+            load = (await client.get("/health/load")).json()
+        return responses, load
+
+    responses, load = asyncio.run(burst())
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses.count(200) == 4
+    assert statuses.count(503) == 6
+    shed = next(response for response in responses if response.status_code == 503)
+    assert shed.headers["Retry-After"] == "1"
+    assert load["route"]["rejected"] == 6
+    assert load["route"]["in_flight"] == 0
+
+
+def test_backend_limit_falls_back_to_next_database(fake_backends, monkeypatch):
+    """Test that a backend at its concurrency limit is treated as unavailable.
+
+    Expected Outcome:
+        - The request is served by the next database in the fallback chain
+        - The overloaded backend's circuit breaker is not charged for the rejection
+    """
+    limiter = AdaptiveLimiter("weaviate", LimiterSettings(initial_limit=1, min_limit=1, max_limit=1))
+    limiter.try_acquire()
+    main.backend_limiters[DatabaseType.WEAVIATE] = limiter
+
+    response = client.post("/route", json={"query": "q", "intent": "priority_check"})
+    assert response.status_code == 200
+    assert response.json()["database"] == "neo4j"
+    assert fake_backends.calls[DatabaseType.WEAVIATE] == []
+    assert main.breakers[DatabaseType.WEAVIATE].window.error_rate() == 0.0
+
+    response = client.post("/route", json={"query": "q", "intent": "semantic_search"})
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+def test_route_sheds_nothing_under_normal_concurrent_load(fake_backends):
+    """Test /route with 8 concurrent clients against fast, jittery backends.
+
+    Expected Outcome:
+        - Every request succeeds; the route and backend limits do not collapse
+    """
+    rng = random.Random(1)
+
+    async def jittery(request):
+        await asyncio.sleep(rng.uniform(0, 0.002))
+        return httpx.Response(200, json=MOCK_PAYLOADS[DatabaseType.RELATIONAL])
+
+    fake_backends.set_handler(DatabaseType.RELATIONAL, jittery)
+
+    async def clients():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as client:
+            async def worker(worker_id):
+                statuses = []
+                for i in range(50):
+                    response = await client.post("/route", json={
+                        "query": f"SELECT * FROM users WHERE id = {worker_id * 100 + i}",
+                        "intent": "structured_data",
+                    })
+                    statuses.append(response.status_code)
+                return statuses
+
+            return [status for statuses in await asyncio.gather(*(worker(w) for w in range(8)))
+                    for status in statuses]
+
+    statuses = asyncio.run(clients())
+    assert statuses.count(200) == len(statuses) == 400
+    assert main.route_limiter.rejected == 0
+    assert main.route_limiter.limit >= LimiterSettings().initial_limit
+    assert main.backend_limiters[DatabaseType.RELATIONAL].limit >= LimiterSettings().initial_limit
+
+
+def test_backend_limit_rejection_releases_half_open_probe(fake_backends):
+    """Test limiter rejections while the backend's breaker is half-open.
+
+    Purpose:
+        A call shed by the backend limiter never reaches the backend, so it must not
+        keep the probe slot the breaker granted it.
+
+    Expected Outcome:
+        - Rejections on /route and /route/stream leave no probe in flight
+        - Once load drops, the next request probes the backend and succeeds
+    """
+    breaker = main.breakers[DatabaseType.NEO4J]
+    breaker._trip("test")
+    breaker._opened_at -= breaker.settings.open_seconds
+    full = AdaptiveLimiter("neo4j", LimiterSettings(initial_limit=1, min_limit=1, max_limit=1))
+    full.try_acquire()
+    main.backend_limiters[DatabaseType.NEO4J] = full
+
+    for path in ("/route", "/route/stream") * 2:
+        response = client.post(path, json={"query": "q", "intent": "graph_relationships"})
+        assert response.status_code == 503
+    assert breaker.snapshot()["state"] == "half_open"
+    assert breaker._probes_in_flight == 0
+
+    main.backend_limiters[DatabaseType.NEO4J] = AdaptiveLimiter("neo4j")
+    response = client.post("/route", json={"query": "q", "intent": "graph_relationships"})
+    assert response.status_code == 200
+    assert len(fake_backends.calls[DatabaseType.NEO4J]) == 1
@@ -23,7 +23,8 @@ def test_route_endpoint_valid_request():
         - Status code should be 200
         - Response should include:
             - database: "neo4j"
-            - response: "Mock routing response"
+            - response: summary of the backend result
+            - result: payload returned by the neo4j backend
     """
     response = client.post(
         "/route", json={"query": "test query", "intent": "test intent"}
@@ -31,7 +32,8 @@ def test_route_endpoint_valid_request():
     assert response.status_code == 200
     data = response.json()
     assert data["database"] == "neo4j"
-    assert data["response"] == "Mock routing response"
+    assert data["response"] == "Found 1 nodes and 0 relationships"
+    assert data["result"]["nodes"][0]["properties"]["name"] == "John"
 
 
 def test_route_endpoint_empty_query():
@@ -294,3 +296,140 @@ def test_route_endpoint_database_fallback():
     )
     assert response.status_code == 200
     assert "database" in response.json()
+
+
+def test_route_executes_backend_query(fake_backends):
+    """Test that /route translates and executes the query on the selected backend.
+
+    Purpose:
+        Verify each database receives a request in its own query format.
+
+    Expected Outcome:
+        - neo4j receives a Cypher read for natural-language input
+        - weaviate receives a 128-dimensional query vector
+        - relational receives a SELECT against the table named in the question
+    """
+    from backends import DatabaseType
+
+    client.post("/route", json={"query": "who knows John", "intent": "graph_relationships"})
+    client.post("/route", json={"query": "AI articles", "intent": "semantic_search"})
+    client.post("/route", json={"query": "latest posts", "intent": "structured_data"})
+
+    assert fake_backends.calls[DatabaseType.NEO4J][0]["query"] == "MATCH (n) RETURN n"
+    assert len(fake_backends.calls[DatabaseType.WEAVIATE][0]["vector"]) == 128
+    relational_call = fake_backends.calls[DatabaseType.RELATIONAL][0]
+    assert relational_call["query"] == "SELECT * FROM posts"
+    assert relational_call["query_type"] == "SELECT"
+
+
+def test_route_backend_failure(fake_backends):
+    """Test /route when the selected backend fails.
+
+    Expected Outcome:
+        - Backend errors surface as 502 with the database named in the detail
+        - Backend timeouts surface as 504
+    """
+    import httpx
+    from backends import DatabaseType
+
+    fake_backends.set_handler(DatabaseType.NEO4J, lambda request: httpx.Response(500, text="boom"))
+    response = client.post("/route", json={"query": "q", "intent": "graph_relationships"})
+    assert response.status_code == 502
+    assert response.json()["detail"]["tried"] == ["neo4j"]
+
+    def timeout(request):
+        raise httpx.ReadTimeout("slow", request=request)
+
+    fake_backends.set_handler(DatabaseType.NEO4J, timeout)
+    response = client.post("/route", json={"query": "q", "intent": "graph_relationships"})
+    assert response.status_code == 504
+
+
+def test_route_passes_backend_bytes_through(fake_backends):
+    """Test that /route forwards the backend response without re-encoding it.
+
+    Expected Outcome:
+        - The backend's JSON bytes appear verbatim as the `result` field
+        - The response is still valid RouteResponse JSON
+    """
+    import httpx
+    from backends import DatabaseType
+
+    raw = b'{"results": [ {"id": 7,  "username": "x"} ], "affected_rows": null, "message": null}'
+    fake_backends.set_handler(DatabaseType.RELATIONAL, lambda request: httpx.Response(200, content=raw))
+    response = client.post("/route", json={"query": "users", "intent": "structured_data"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.content.endswith(b',"result":' + raw + b"}")
+    data = response.json()
+    assert data["response"] == "Found 1 records"
+    assert data["result"]["results"][0]["id"] == 7
+
+
+def test_metrics_endpoint_reports_backend_calls(fake_backends):
+    """Test that /metrics exposes backend call timings and /route stages.
+
+    Expected Outcome:
+        - Successful and failed backend calls are timed under their outcome
+        - Planning, execution and serialization are timed as stages
+    """
+    import httpx
+    from backends import DatabaseType
+
+    client.post("/route", json={"query": "users", "intent": "structured_data"})
+    fake_backends.set_handler(DatabaseType.NEO4J, lambda request: httpx.Response(500, text="boom"))
+    client.post("/route", json={"query": "q", "intent": "graph_relationships"})
+
+    text = client.get("/metrics").text
+    assert 'mcp_backend_call_duration_seconds_count{backend="relational",mode="request",outcome="ok"}' in text
+    assert 'mcp_backend_call_duration_seconds_count{backend="neo4j",mode="request",outcome="error"}' in text
+    assert 'http_request_duration_seconds_count{method="POST",route="/route",status="502"}' in text
+    for name in ("plan", "execute", "serialize"):
+        assert f'stage_duration_seconds_count{{stage="{name}"}}' in text
+
+
+def test_route_propagates_trace_context(fake_backends, monkeypatch):
+    """Test that /route continues the caller's trace into the backend call.
+
+    Expected Outcome:
+        - The backend request carries a sampled traceparent of the caller's trace
+        - Planning, the backend query and serialization are recorded as spans of that trace
+    """
+    import httpx
+    import main
+    from backends import DatabaseType
+    from service_common.tracing import SpanExporter
+
+    class ListExporter(SpanExporter):
+        def __init__(self):
+            self.spans = []
+
+        def export(self, span):
+            self.spans.append(span)
+
+    monkeypatch.setattr(main.tracer, "exporter", ListExporter())
+    headers = []
+
+    def handler(request):
+        headers.append(request.headers.get("traceparent"))
+        return httpx.Response(200, json={"results": [], "affected_rows": None, "message": None})
+
+    fake_backends.set_handler(DatabaseType.RELATIONAL, handler)
+    trace_id = "0af7651916cd43dd8448eb211c80319c"
+    client.post("/route", json={"query": "users", "intent": "structured_data"},
+                headers={"traceparent": f"00-{trace_id}-b7ad6b7169203331-01"})
+
+    spans = {span.name: span for span in main.tracer.exporter.spans}
+    assert {"plan", "execute", "backend.query", "serialize", "POST /route"} <= set(spans)
+    assert all(span.context.trace_id == trace_id for span in spans.values())
+    assert spans["backend.query"].attributes["backend"] == "relational"
+    assert headers == [f"00-{trace_id}-{spans['backend.query'].context.span_id}-01"]
+
+
+def test_profiling_disabled_without_token():
+    """Test that the profiling endpoint is admin-only.
+
+    Expected Outcome:
+        - Without MCP_PROFILING_TOKEN, profiling is refused with 403
+    """
+    assert client.post("/admin/profile?seconds=1", headers={"X-Admin-Token": "x"}).status_code == 403
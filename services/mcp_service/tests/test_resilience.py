@@ -0,0 +1,277 @@
+import asyncio
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+import main
+from backends import DatabaseType
+from conftest import MOCK_PAYLOADS
+from resilience import (BreakerSettings, BreakerState, CircuitBreaker, HedgeBudget, HedgeSettings,
+                        LatencyWindow)
+
+client = TestClient(main.app)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_latency_window_quantile_and_expiry():
+    """Test rolling latency quantiles and error rate.
+
+    Expected Outcome:
+        - p99 of 1..100 ms is 99 ms
+        - Samples older than the window no longer count
+    """
+    clock = FakeClock()
+    window = LatencyWindow(window_seconds=10, clock=clock)
+    for ms in range(1, 101):
+        window.record(ms / 1000, ok=ms % 10 != 0)
+    assert window.quantile(0.99) == 0.099
+    assert window.error_rate() == 0.1
+    clock.now += 11
+    assert len(window) == 0
+    assert window.quantile(0.99) is None
+
+
+def test_breaker_opens_on_error_rate_and_recovers():
+    """Test the closed -> open -> half-open -> closed cycle.
+
+    Purpose:
+        Verify the breaker fails fast while open and closes after successful probes.
+
+    Expected Outcome:
+        - Breaker opens once the error rate crosses the threshold
+        - Calls are rejected without waiting while open
+        - Only the configured number of probes is admitted when half-open
+        - Successful probes close the breaker
+    """
+    clock = FakeClock()
+    breaker = CircuitBreaker("neo4j", BreakerSettings(min_requests=4, open_seconds=5, half_open_probes=2),
+                             clock=clock)
+    for _ in range(4):
+        assert breaker.allow_request()
+        breaker.record_failure(0.01)
+    assert breaker.state == BreakerState.OPEN
+    assert not breaker.allow_request()
+    assert breaker.retry_after() == 5
+
+    clock.now += 5
+    assert breaker.state == BreakerState.HALF_OPEN
+    assert breaker.allow_request() and breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success(0.01)
+    breaker.record_success(0.01)
+    assert breaker.state == BreakerState.CLOSED
+
+
+def test_breaker_opens_on_p99_latency():
+    """Test that a slow but successful backend trips the breaker.
+
+    Expected Outcome:
+        - p99 above the latency threshold opens the breaker
+        - A failed half-open probe re-opens it
+    """
+    clock = FakeClock()
+    breaker = CircuitBreaker("weaviate", BreakerSettings(min_requests=5, p99_latency_threshold=1.0),
+                             clock=clock)
+    for _ in range(5):
+        breaker.record_success(1.5)
+    assert breaker.state == BreakerState.OPEN
+    assert "p99" in breaker.last_trip_reason
+
+    clock.now += breaker.settings.open_seconds
+    assert breaker.allow_request()
+    breaker.record_failure(0.1)
+    assert breaker.state == BreakerState.OPEN
+
+
+def test_hybrid_intent_falls_back_to_next_backend(fake_backends):
+    """Test the hybrid_fallback chain when the primary database fails.
+
+    Expected Outcome:
+        - The next database in the priority list answers the request
+        - fallback_info reports which backends were tried
+    """
+    fake_backends.set_handler(DatabaseType.NEO4J, lambda request: httpx.Response(503))
+    response = client.post("/route", json={"query": "q", "intent": "hybrid_fallback"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["database"] == "relational"
+    assert data["fallback_info"]["primary_choice"] == "neo4j"
+    assert data["fallback_info"]["tried"] == ["neo4j", "relational"]
+    assert data["fallback_info"]["skipped"] == []
+
+
+def test_open_breaker_is_skipped_without_calling(fake_backends):
+    """Test that an open breaker short-circuits its backend.
+
+    Expected Outcome:
+        - The unhealthy backend receives no request and is reported as skipped
+        - A single-database intent fails fast with 503 and Retry-After
+    """
+    main.breakers[DatabaseType.NEO4J]._trip("test")
+
+    response = client.post("/route", json={"query": "q", "intent": "hybrid_fallback"})
+    assert response.status_code == 200
+    assert response.json()["fallback_info"]["skipped"] == ["neo4j"]
+    assert fake_backends.calls[DatabaseType.NEO4J] == []
+
+    response = client.post("/route", json={"query": "q", "intent": "graph_relationships"})
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["detail"]["skipped"] == ["neo4j"]
+
+
+def test_slow_primary_is_abandoned_for_fallback(fake_backends, monkeypatch):
+    """Test the per-attempt deadline applied while a fallback is available.
+
+    Expected Outcome:
+        - A primary slower than the attempt timeout is abandoned
+        - The fallback database answers and the slow attempt counts as a failure
+    """
+    monkeypatch.setattr(main, "FALLBACK_ATTEMPT_TIMEOUT", 0.05)
+    original = main.backends.get(DatabaseType.WEAVIATE).execute
+
+    async def slow_execute(*args):
+        await asyncio.sleep(1)
+        return await original(*args)
+
+    monkeypatch.setattr(main.backends.get(DatabaseType.WEAVIATE), "execute", slow_execute)
+    response = client.post("/route", json={"query": "q", "intent": "priority_check"})
+    assert response.status_code == 200
+    assert response.json()["database"] == "neo4j"
+    assert main.breakers[DatabaseType.WEAVIATE].window.error_rate() == 1.0
+
+
+def test_timed_out_attempt_is_recorded_once(fake_backends, monkeypatch):
+    """Test that a timed-out attempt counts as exactly one breaker failure.
+
+    Expected Outcome:
+        - Two coalesced reads that both time out share one backend call
+        - That call is recorded as one failure, with no separate count per caller
+    """
+    monkeypatch.setattr(main, "FALLBACK_ATTEMPT_TIMEOUT", 0.05)
+    fake_backends.set_handler(DatabaseType.WEAVIATE,
+                              slow_host("weaviate_mock", 1, MOCK_PAYLOADS[DatabaseType.WEAVIATE]))
+
+    async def route_twice():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as http:
+            responses = await asyncio.gather(*(
+                http.post("/route", json={"query": "q", "intent": "priority_check"}) for _ in range(2)
+            ))
+            # Let the abandoned call finish cancelling
+            await asyncio.sleep(0.01)
+            return responses
+
+    responses = asyncio.run(route_twice())
+    assert [response.json()["database"] for response in responses] == ["neo4j", "neo4j"]
+    assert len(fake_backends.calls[DatabaseType.WEAVIATE]) == 1
+    window = main.breakers[DatabaseType.WEAVIATE].window
+    assert (len(window), window.error_rate()) == (1, 1.0)
+
+
+def test_hedge_budget_limits_extra_load():
+    """Test that hedges are paid for by a fraction of primary calls.
+
+    Expected Outcome:
+        - The burst allowance is spent first
+        - Afterwards only one hedge per 1/ratio primary calls is allowed
+    """
+    budget = HedgeBudget(ratio=0.25, burst=2)
+    assert budget.try_acquire() and budget.try_acquire()
+    assert not budget.try_acquire()
+    for _ in range(4):
+        budget.deposit()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+    assert budget.snapshot()["issued"] == 3
+    assert budget.snapshot()["denied"] == 2
+
+
+def enable_hedging(monkeypatch, backend: str, burst: float = 10.0) -> None:
+    settings = HedgeSettings(backends=frozenset({backend}), min_samples=0, min_delay=0.02,
+                             budget_ratio=0.0, budget_burst=burst)
+    monkeypatch.setattr(main, "hedge_settings", settings)
+    monkeypatch.setattr(main, "hedge_budgets", {
+        database: HedgeBudget(settings.budget_ratio, settings.budget_burst) for database in DatabaseType
+    })
+
+
+def slow_host(host: str, delay: float, payload: dict):
+    async def handler(request):
+        if request.url.host == host:
+            await asyncio.sleep(delay)
+        return httpx.Response(200, json=payload)
+    return handler
+
+
+def test_slow_call_is_hedged_to_replica(fake_backends, monkeypatch):
+    """Test hedging against a second replica of the same backend.
+
+    Expected Outcome:
+        - The duplicate sent to the replica answers first
+        - fallback_info records the hedge and the budget counts the win
+    """
+    enable_hedging(monkeypatch, "weaviate")
+    main.backends.settings[DatabaseType.WEAVIATE].replica_urls = ["http://weaviate_replica:8003"]
+    fake_backends.set_handler(DatabaseType.WEAVIATE,
+                              slow_host("weaviate_mock", 2, MOCK_PAYLOADS[DatabaseType.WEAVIATE]))
+
+    start = time.perf_counter()
+    response = client.post("/route", json={"query": "q", "intent": "semantic_search"})
+    assert time.perf_counter() - start < 1
+    assert response.status_code == 200
+    hedge = response.json()["fallback_info"]["hedge"]
+    assert hedge["target"] == "weaviate" and hedge["replica"] == 1 and hedge["won"]
+    assert main.hedge_budgets[DatabaseType.WEAVIATE].wins == 1
+
+
+def test_slow_call_is_hedged_to_fallback_database(fake_backends, monkeypatch):
+    """Test hedging against the next database when a backend has no replicas.
+
+    Expected Outcome:
+        - The fallback database answers the request
+        - Once the budget is spent, slow calls are waited out instead of hedged
+    """
+    enable_hedging(monkeypatch, "weaviate", burst=1)
+    fake_backends.set_handler(DatabaseType.WEAVIATE,
+                              slow_host("weaviate_mock", 0.3, MOCK_PAYLOADS[DatabaseType.WEAVIATE]))
+
+    response = client.post("/route", json={"query": "q", "intent": "priority_check"})
+    assert response.status_code == 200
+    assert response.json()["database"] == "neo4j"
+    assert response.json()["fallback_info"]["hedge"]["target"] == "neo4j"
+
+    response = client.post("/route", json={"query": "q", "intent": "priority_check"})
+    assert response.json()["database"] == "weaviate"
+    assert "hedge" not in response.json()["fallback_info"]
+    assert main.hedge_budgets[DatabaseType.WEAVIATE].denied == 1
+    assert len(fake_backends.calls[DatabaseType.NEO4J]) == 1
+
+
+def test_hedge_is_skipped_when_target_refuses_admission(fake_backends, monkeypatch):
+    """Test that a hedge needs the target's limiter admission, not just a closed breaker.
+
+    Expected Outcome:
+        - With the fallback database's limiter full, no hedge is sent
+        - No hedge token is spent and the target's admissions are left as they were
+    """
+    enable_hedging(monkeypatch, "weaviate")
+    fake_backends.set_handler(DatabaseType.WEAVIATE,
+                              slow_host("weaviate_mock", 0.1, MOCK_PAYLOADS[DatabaseType.WEAVIATE]))
+    limiter = main.backend_limiters[DatabaseType.NEO4J]
+    limiter.in_flight = int(limiter.limit)
+
+    response = client.post("/route", json={"query": "q", "intent": "priority_check"})
+    assert response.json()["database"] == "weaviate"
+    assert "hedge" not in response.json()["fallback_info"]
+    assert limiter.in_flight == int(limiter.limit)
+    assert fake_backends.calls[DatabaseType.NEO4J] == []
+    assert main.hedge_budgets[DatabaseType.WEAVIATE].issued == 0
@@ -0,0 +1,133 @@
+import json
+import os
+from dataclasses import replace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from backends import DatabaseType
+from concurrency import Priority
+from routing import IntentTrie, RoutingTable
+
+client = TestClient(main.app)
+ADMIN = {"X-Admin-Token": "secret"}
+
+ROUTES = {
+    "analytics": ["neo4j"],
+    "analytics.tabular": {"databases": ["relational", "neo4j"], "priority": "low"},
+    "analytics.tabular.vectors": ["weaviate"],
+    "faq": ["weaviate"],
+}
+
+
+def test_trie_resolves_longest_prefix():
+    """Test longest-prefix resolution of dotted intents.
+
+    Expected Outcome:
+        - The deepest configured prefix wins
+        - Unconfigured dotted intents use the hierarchical default
+        - Unconfigured flat intents do not resolve
+    """
+    trie = IntentTrie(ROUTES, hierarchical_default=["relational"])
+    resolution = trie.resolve("analytics.tabular.monthly.revenue")
+    assert resolution.matched == "analytics.tabular"
+    assert resolution.route.databases == (DatabaseType.RELATIONAL, DatabaseType.NEO4J)
+    assert resolution.route.priority == Priority.LOW
+    assert trie.resolve("analytics.tabular.vectors").route.databases == (DatabaseType.WEAVIATE,)
+    assert trie.resolve("analytics.graph").matched == "analytics"
+    assert trie.resolve("faq").fallback_info() is None
+
+    unknown = trie.resolve("unknown.area")
+    assert unknown.route.databases == (DatabaseType.RELATIONAL,)
+    assert unknown.fallback_info() == {"intent_type": "hierarchical"}
+    assert trie.resolve("unknown") is None
+
+
+def test_trie_scales_to_thousands_of_intents():
+    """Test a large generated routing table resolves every intent to its own route."""
+    routes = {f"domain{i}.area{i % 10}": ["weaviate" if i % 2 else "relational"] for i in range(5000)}
+    trie = IntentTrie(routes)
+    assert trie.size == 5000
+    assert trie.resolve("domain4321.area1.detail").route.databases == (DatabaseType.WEAVIATE,)
+    assert trie.resolve("domain4320.area0").route.databases == (DatabaseType.RELATIONAL,)
+
+
+def test_invalid_route_is_rejected():
+    """Test that unknown databases and empty routes fail to load."""
+    with pytest.raises(ValueError):
+        IntentTrie({"x": ["oracle"]})
+    with pytest.raises(ValueError):
+        IntentTrie({"x": []})
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    """Configure the admin token that /admin endpoints require."""
+    monkeypatch.setattr(main.profiler, "settings", replace(main.profiler.settings, token="secret"))
+
+
+@pytest.fixture
+def routing_file(tmp_path, monkeypatch):
+    """A routing table file installed as the MCP routing table."""
+    path = tmp_path / "routing.json"
+    path.write_text(json.dumps({"routes": ROUTES}))
+    table = RoutingTable(str(path), check_interval=0)
+    monkeypatch.setattr(main, "routing_table", table)
+    return path
+
+
+def test_table_hot_reloads_on_change(routing_file):
+    """Test hot reload of the routing table file.
+
+    Expected Outcome:
+        - A changed file is picked up on the next lookup
+        - An invalid file keeps the previous table
+    """
+    table = main.routing_table
+    assert table.resolve("faq").route.databases == (DatabaseType.WEAVIATE,)
+
+    routing_file.write_text(json.dumps({"routes": {**ROUTES, "faq": ["relational"]}}))
+    os.utime(routing_file, (1, 1))
+    assert table.resolve("faq").route.databases == (DatabaseType.RELATIONAL,)
+    assert table.version == 2
+
+    routing_file.write_text("{not json")
+    os.utime(routing_file, (2, 2))
+    assert table.resolve("faq").route.databases == (DatabaseType.RELATIONAL,)
+    assert table.version == 2
+
+
+def test_route_uses_configured_table(routing_file, admin_token):
+    """Test /route and /admin/routing/reload with a configured routing table.
+
+    Expected Outcome:
+        - Dotted intents route by their longest configured prefix
+        - fallback_info names the matched prefix and the route's priority is used for shedding
+        - Intents missing from the table are rejected with 422
+        - The reload endpoint requires the admin token and reports the loaded table
+    """
+    response = client.post("/route", json={"query": "revenue", "intent": "analytics.tabular.monthly"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["database"] == "relational"
+    assert data["fallback_info"]["matched_prefix"] == "analytics.tabular"
+    assert data["fallback_info"]["intent_type"] == "hierarchical"
+    assert main.get_intent_priority("analytics.tabular.monthly") == Priority.LOW
+
+    response = client.post("/route", json={"query": "q", "intent": "semantic_search"})
+    assert response.status_code == 422
+
+    assert client.post("/admin/routing/reload").status_code == 403
+    response = client.post("/admin/routing/reload", headers=ADMIN)
+    assert response.status_code == 200
+    assert response.json()["routes"] == len(ROUTES)
+
+    routing_file.write_text(json.dumps({"routes": {"x": ["oracle"]}}))
+    assert client.post("/admin/routing/reload", headers=ADMIN).status_code == 422
+
+
+def test_reload_without_file_conflicts(admin_token):
+    """Test /admin/routing/reload when the built-in routes are in use."""
+    response = client.post("/admin/routing/reload", headers=ADMIN)
+    assert response.status_code == 409
@@ -0,0 +1,155 @@
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+import main
+from backends import DatabaseType
+
+client = TestClient(main.app)
+
+GRAPH_RECORDS = [
+    {"record": "node", "id": 1, "labels": ["Person"], "properties": {"name": "John"}},
+    {"record": "node", "id": 2, "labels": ["Person"], "properties": {"name": "Jane"}},
+    {"record": "relationship", "id": 0, "type": "KNOWS", "start_node": 1, "end_node": 2, "properties": {}},
+]
+
+
+def ndjson(records) -> bytes:
+    return b"".join(json.dumps(record).encode() + b"\n" for record in records)
+
+
+def stream_events(payload):
+    with client.stream("POST", "/route/stream", json=payload) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_graph_stream_forwards_neo4j_records(fake_backends):
+    """Test /route/stream for a graph intent.
+
+    Purpose:
+        Verify graph elements from the neo4j streaming endpoint are forwarded one by one.
+
+    Expected Outcome:
+        - The neo4j /query/stream endpoint is used
+        - Events are route, one record per graph element, then done with a summary
+    """
+    def handler(request):
+        assert request.url.path == "/query/stream"
+        return httpx.Response(200, content=ndjson(GRAPH_RECORDS))
+
+    fake_backends.set_handler(DatabaseType.NEO4J, handler)
+    events = stream_events({"query": "who knows John", "intent": "graph_relationships"})
+
+    assert [event["event"] for event in events] == ["route", "record", "record", "record", "done"]
+    assert events[0]["database"] == "neo4j"
+    assert [event["record"] for event in events[1:4]] == GRAPH_RECORDS
+    assert events[-1]["counts"] == {"node": 2, "relationship": 1}
+    assert events[-1]["response"] == "Found 2 nodes and 1 relationships"
+
+
+def test_stream_of_non_streaming_backends(fake_backends):
+    """Test /route/stream for backends without a streaming endpoint.
+
+    Expected Outcome:
+        - Similar documents and rows are emitted as individual records
+        - Writes report their status message
+    """
+    events = stream_events({"query": "AI articles", "intent": "semantic_search"})
+    assert events[1]["record"]["record"] == "document"
+    assert events[-1]["response"] == "Found 1 similar documents"
+
+    events = stream_events({"query": "users", "intent": "structured_data"})
+    assert events[1]["record"] == {"record": "row", "values": {"id": 1, "username": "john_doe"}}
+
+    fake_backends.set_handler(DatabaseType.RELATIONAL, lambda request: httpx.Response(
+        200, json={"results": None, "affected_rows": 1, "message": "Record deleted successfully"}))
+    events = stream_events({"query": "DELETE FROM users WHERE id = 1", "intent": "structured_data"})
+    assert events[-1]["response"] == "Record deleted successfully"
+
+
+def test_stream_falls_back_before_first_record(fake_backends):
+    """Test fallback when the primary fails before streaming starts.
+
+    Expected Outcome:
+        - The next database in the chain streams the response
+        - A chain with no working database fails with the /route status codes
+    """
+    fake_backends.set_handler(DatabaseType.NEO4J, lambda request: httpx.Response(500, text="boom"))
+    events = stream_events({"query": "q", "intent": "hybrid_fallback"})
+    assert events[0]["database"] == "relational"
+    assert events[0]["fallback_info"]["tried"] == ["neo4j", "relational"]
+
+    response = client.post("/route/stream", json={"query": "q", "intent": "graph_relationships"})
+    assert response.status_code == 502
+    assert main.route_limiter.in_flight == 0
+
+
+class SlowStream(httpx.AsyncByteStream):
+    """Sends its records only after ``delay`` seconds."""
+
+    def __init__(self, records, delay: float):
+        self.records = records
+        self.delay = delay
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.delay)
+        yield ndjson(self.records)
+
+
+def test_slow_stream_is_abandoned_for_fallback(fake_backends, monkeypatch):
+    """Test the per-attempt deadline on the first record of a stream.
+
+    Expected Outcome:
+        - A primary whose first record takes longer than the attempt timeout is abandoned
+        - The fallback database streams the response and the slow attempt counts as a failure
+    """
+    monkeypatch.setattr(main, "FALLBACK_ATTEMPT_TIMEOUT", 0.05)
+    fake_backends.set_handler(DatabaseType.NEO4J, lambda request: httpx.Response(
+        200, stream=SlowStream(GRAPH_RECORDS, delay=1)))
+
+    events = stream_events({"query": "q", "intent": "hybrid_fallback"})
+    assert events[0]["database"] == "relational"
+    assert events[0]["fallback_info"]["tried"] == ["neo4j", "relational"]
+    assert main.breakers[DatabaseType.NEO4J].window.error_rate() == 1.0
+    assert main.backend_limiters[DatabaseType.NEO4J].in_flight == 0
+
+
+def test_stream_limiter_learns_time_to_first_record(fake_backends, monkeypatch):
+    """Test the latency sample a finished stream gives the route limiter.
+
+    Expected Outcome:
+        - The sample is the time to the first record, not the lifetime of the stream
+    """
+    fake_backends.set_handler(DatabaseType.NEO4J,
+                              lambda request: httpx.Response(200, content=ndjson(GRAPH_RECORDS)))
+    clock = iter([0.0, 0.5, 30.0])
+    monkeypatch.setattr(main.route_limiter, "clock", lambda: next(clock))
+    stream_events({"query": "q", "intent": "graph_relationships"})
+    assert main.route_limiter.median_latency() == 0.5
+    assert main.route_limiter.in_flight == 0
+
+
+class BrokenStream(httpx.AsyncByteStream):
+    """Sends one record and then drops the connection."""
+
+    async def __aiter__(self):
+        yield ndjson(GRAPH_RECORDS[:1])
+        raise httpx.ReadError("connection reset")
+
+
+def test_stream_reports_mid_stream_failure(fake_backends):
+    """Test a backend failing after records were already forwarded.
+
+    Expected Outcome:
+        - Records received so far are forwarded
+        - The stream ends with an error event
+    """
+    fake_backends.set_handler(DatabaseType.NEO4J, lambda request: httpx.Response(200, stream=BrokenStream()))
+    events = stream_events({"query": "q", "intent": "graph_relationships"})
+    assert [event["event"] for event in events] == ["route", "record", "error"]
+    assert "connection reset" in events[-1]["detail"]
+    assert main.route_limiter.in_flight == 0
@@ -0,0 +1 @@
+"""Load-testing and benchmark harness for the tri-database stack (see __main__)."""
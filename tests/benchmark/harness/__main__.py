@@ -0,0 +1,226 @@
+"""Load-test the tri-database stack and compare runs between commits.
+
+Run from tests/benchmark::
+
+    # boot all five services locally and drive the full mix with 16 users for 30s
+    python -m harness run --mode local --mix full --concurrency 16 --duration 30 -o results.json
+
+    # open loop: 200 req/s Poisson arrivals against an already running stack
+    python -m harness run --mode external --load open --rate 200 --mix route -o results.json
+
+    # record the baseline, then check later runs against it
+    python -m harness run ... -o baselines/full.json
+    python -m harness compare baselines/full.json results.json
+
+    # cold-start time to ready and import cost of every service
+    python -m harness startup --runs 5 -o startup.json
+
+``compare`` exits with status 1 when any latency percentile, throughput or error
+rate regressed beyond the given tolerances; ``startup`` does when a service's median
+time to ready is over the budget.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .report import compare, summarize
+from .runner import run_closed_loop, run_open_loop
+from .stack import EXTERNAL_URLS, REPO_ROOT, SERVICES, LocalStack, wait_until_healthy
+from .startup import measure_service
+from .workloads import Mix, parse_mix
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_pairs(pairs: List[str]) -> Dict[str, str]:
+    result = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected KEY=VALUE, got {pair!r}")
+        result[key] = value
+    return result
+
+
+async def drive(args: argparse.Namespace, urls: Dict[str, str], mix: Mix) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        if args.warmup > 0:
+            await run_closed_loop(client, urls, mix, args.concurrency, args.warmup, seed=args.seed + 1)
+        if args.load == "open":
+            result = await run_open_loop(
+                client, urls, mix, args.rate, args.duration, seed=args.seed, max_in_flight=args.max_in_flight
+            )
+        else:
+            result = await run_closed_loop(client, urls, mix, args.concurrency, args.duration, seed=args.seed)
+    return summarize(result)
+
+
+def run(args: argparse.Namespace) -> int:
+    mix = parse_mix(args.mix)
+    if args.mode == "local":
+        stack = LocalStack(base_port=args.base_port, env=parse_pairs(args.env))
+        urls = stack.urls
+    else:
+        stack = nullcontext()
+        urls = {**EXTERNAL_URLS, **parse_pairs(args.url)}
+    with stack:
+        wait_until_healthy({name: urls[name] for name in mix.services})
+        summary = asyncio.run(drive(args, urls, mix))
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "mode": args.mode,
+            "load": args.load,
+            "mix": mix.weights,
+            "concurrency": args.concurrency if args.load == "closed" else None,
+            "rate": args.rate if args.load == "open" else None,
+            "duration_s": args.duration,
+            "seed": args.seed,
+        },
+        "summary": summary,
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text + "\n")
+    overall = summary["overall"]
+    print(
+        f"{overall['requests']} requests, {overall['throughput_rps']:.1f} req/s, "
+        f"p50 {overall['latency_ms']['p50']:.2f}ms, p95 {overall['latency_ms']['p95']:.2f}ms, "
+        f"p99 {overall['latency_ms']['p99']:.2f}ms, errors {overall['error_rate']:.2%}",
+        file=sys.stderr,
+    )
+    if not args.output:
+        print(text)
+    return 0
+
+
+def run_compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    if baseline["meta"]["mix"] != current["meta"]["mix"] or baseline["meta"]["load"] != current["meta"]["load"]:
+        print("warning: runs used different mixes or load models", file=sys.stderr)
+    regressions = compare(
+        baseline,
+        current,
+        latency_tolerance=args.latency_tolerance,
+        throughput_tolerance=args.throughput_tolerance,
+        error_rate_tolerance=args.error_rate_tolerance,
+    )
+    for regression in regressions:
+        print(regression)
+    if not regressions:
+        print(f"No regressions against {baseline['meta'].get('commit') or args.baseline}")
+    return 1 if regressions else 0
+
+
+def run_startup(args: argparse.Namespace) -> int:
+    names = args.services.split(",") if args.services else list(SERVICES)
+    unknown = sorted(set(names) - set(SERVICES))
+    if unknown:
+        raise SystemExit(f"Unknown services: {', '.join(unknown)}")
+    services = {}
+    for name in names:
+        services[name] = measure_service(
+            name, args.base_port + SERVICES[name].port_offset, args.runs, args.top, parse_pairs(args.env)
+        )
+        result = services[name]
+        breakdown = ", ".join(f"{package} {seconds * 1000:.0f}ms"
+                              for package, seconds in result["import_breakdown_s"].items())
+        print(
+            f"{name}: ready in {result['time_to_ready_s']['median'] * 1000:.0f}ms median "
+            f"(min {result['time_to_ready_s']['min'] * 1000:.0f}ms), "
+            f"imports {result['imports_s'] * 1000:.0f}ms: {breakdown}",
+            file=sys.stderr,
+        )
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "runs": args.runs,
+            "budget_s": args.budget,
+        },
+        "services": services,
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    slow = [name for name, result in services.items() if result["time_to_ready_s"]["median"] > args.budget]
+    for name in slow:
+        print(f"{name} is over the {args.budget:g}s startup budget", file=sys.stderr)
+    return 1 if slow else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m harness", description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run a load test and record its results")
+    run_parser.add_argument("--mode", choices=["local", "external"], default="local")
+    run_parser.add_argument("--load", choices=["closed", "open"], default="closed")
+    run_parser.add_argument("--mix", default="full", help="Named mix or weights such as chat=3,route=1")
+    run_parser.add_argument("--concurrency", type=int, default=8, help="Closed-loop users")
+    run_parser.add_argument("--rate", type=float, default=100.0, help="Open-loop arrivals per second")
+    run_parser.add_argument("--max-in-flight", type=int, default=1000, help="Open-loop cap before dropping")
+    run_parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before the run")
+    run_parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--base-port", type=int, default=18000, help="First port used in local mode")
+    run_parser.add_argument("--env", action="append", default=[], help="KEY=VALUE for local services")
+    run_parser.add_argument("--url", action="append", default=[], help="service=URL override in external mode")
+    run_parser.add_argument("-o", "--output", help="Write results JSON here instead of stdout")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare results against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--latency-tolerance", type=float, default=0.10)
+    compare_parser.add_argument("--throughput-tolerance", type=float, default=0.10)
+    compare_parser.add_argument("--error-rate-tolerance", type=float, default=0.01)
+    compare_parser.set_defaults(func=run_compare)
+
+    startup_parser = commands.add_parser("startup", help="Measure cold-start time to ready and import cost")
+    startup_parser.add_argument("--services", help="Comma-separated services; all five by default")
+    startup_parser.add_argument("--runs", type=int, default=5, help="Timed cold starts per service")
+    startup_parser.add_argument("--budget", type=float, default=1.0, help="Maximum median seconds to ready")
+    startup_parser.add_argument("--top", type=int, default=8, help="Packages listed in the import breakdown")
+    startup_parser.add_argument("--base-port", type=int, default=18000, help="First port, as in local mode")
+    startup_parser.add_argument("--env", action="append", default=[], help="KEY=VALUE for the services")
+    startup_parser.add_argument("-o", "--output", help="Write results JSON here instead of stdout")
+    startup_parser.set_defaults(func=run_startup)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Summaries of a run and comparison against a stored baseline."""
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+from .runner import RunResult, Sample
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_samples(samples: Iterable[Sample], elapsed: float) -> Dict[str, Any]:
+    samples = list(samples)
+    latencies = sorted(sample.latency * 1000 for sample in samples if sample.ok)
+    errors: Dict[str, int] = {}
+    for sample in samples:
+        if not sample.ok:
+            errors[sample.error or "error"] = errors.get(sample.error or "error", 0) + 1
+    failed = sum(errors.values())
+    return {
+        "requests": len(samples),
+        "errors": failed,
+        "error_rate": failed / len(samples) if samples else 0.0,
+        "error_kinds": errors,
+        "throughput_rps": (len(samples) - failed) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {
+            **{f"p{q}": percentile(latencies, q) for q in PERCENTILES},
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "max": latencies[-1] if latencies else 0.0,
+        },
+    }
+
+
+def summarize(result: RunResult) -> Dict[str, Any]:
+    """Overall and per-scenario statistics of a run."""
+    by_scenario: Dict[str, List[Sample]] = {}
+    for sample in result.samples:
+        by_scenario.setdefault(sample.scenario, []).append(sample)
+    return {
+        "elapsed_s": result.elapsed,
+        "overall": summarize_samples(result.samples, result.elapsed),
+        "scenarios": {
+            name: summarize_samples(samples, result.elapsed)
+            for name, samples in sorted(by_scenario.items())
+        },
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    latency_tolerance: float = 0.10,
+    throughput_tolerance: float = 0.10,
+    error_rate_tolerance: float = 0.01,
+) -> List[str]:
+    """Regressions of ``current`` against ``baseline``, as readable messages.
+
+    Latency percentiles may grow and throughput may drop by the given fractions,
+    and the error rate may grow by the given absolute amount, before a change
+    counts as a regression. Scenarios missing from either run are skipped.
+    """
+    regressions: List[str] = []
+    sections = {"overall": (baseline["summary"]["overall"], current["summary"]["overall"])}
+    for name, stats in current["summary"]["scenarios"].items():
+        previous: Optional[Dict[str, Any]] = baseline["summary"]["scenarios"].get(name)
+        if previous is not None:
+            sections[name] = (previous, stats)
+
+    for name, (before, after) in sections.items():
+        for q in PERCENTILES:
+            key = f"p{q}"
+            old, new = before["latency_ms"][key], after["latency_ms"][key]
+            if old > 0 and new > old * (1 + latency_tolerance):
+                regressions.append(f"{name}: {key} latency {old:.2f}ms -> {new:.2f}ms (+{new / old - 1:.0%})")
+        old, new = before["throughput_rps"], after["throughput_rps"]
+        if old > 0 and new < old * (1 - throughput_tolerance):
+            regressions.append(f"{name}: throughput {old:.1f} -> {new:.1f} req/s ({new / old - 1:.0%})")
+        old, new = before["error_rate"], after["error_rate"]
+        if new > old + error_rate_tolerance:
+            regressions.append(f"{name}: error rate {old:.2%} -> {new:.2%}")
+    return regressions
@@ -0,0 +1,127 @@
+"""Closed- and open-loop load generators.
+
+Closed loop: ``concurrency`` virtual users each send their next request as soon as
+the previous one finished, so throughput is what the stack sustains at that
+concurrency.
+
+Open loop: requests arrive as a Poisson process at ``rate`` per second whether or
+not earlier ones finished. Latency is measured from the scheduled arrival time, so
+queueing delay caused by a slow stack is counted instead of hidden (no coordinated
+omission). Arrivals beyond ``max_in_flight`` are recorded as dropped errors.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+
+from .workloads import Mix, Scenario
+
+
+@dataclass
+class Sample:
+    scenario: str
+    latency: float
+    ok: bool
+    status: Optional[int] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class RunResult:
+    samples: List[Sample]
+    elapsed: float
+
+
+async def issue(
+    client: httpx.AsyncClient,
+    urls: Dict[str, str],
+    scenario: Scenario,
+    rng: random.Random,
+    started: Optional[float] = None,
+) -> Sample:
+    """Send one request of ``scenario``; latency counts from ``started`` when given."""
+    payload = scenario.payload(rng)
+    started = time.perf_counter() if started is None else started
+    try:
+        response = await client.post(f"{urls[scenario.service]}{scenario.path}", json=payload)
+        await response.aread()
+    except httpx.HTTPError as e:
+        return Sample(scenario.name, time.perf_counter() - started, False, error=type(e).__name__)
+    return Sample(
+        scenario.name,
+        time.perf_counter() - started,
+        response.status_code < 400,
+        status=response.status_code,
+        error=None if response.status_code < 400 else f"HTTP {response.status_code}",
+    )
+
+
+async def run_closed_loop(
+    client: httpx.AsyncClient,
+    urls: Dict[str, str],
+    mix: Mix,
+    concurrency: int,
+    duration: float,
+    seed: int = 0,
+    max_requests: Optional[int] = None,
+) -> RunResult:
+    """Drive the stack with ``concurrency`` back-to-back users for ``duration`` seconds.
+
+    ``max_requests`` ends the run early once that many requests were sent.
+    """
+    samples: List[Sample] = []
+    issued = 0
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def user(index: int) -> None:
+        nonlocal issued
+        rng = random.Random(seed * 100003 + index)
+        while time.perf_counter() < deadline and (max_requests is None or issued < max_requests):
+            issued += 1
+            samples.append(await issue(client, urls, mix.pick(rng), rng))
+
+    await asyncio.gather(*(user(index) for index in range(concurrency)))
+    return RunResult(samples, time.perf_counter() - started)
+
+
+async def run_open_loop(
+    client: httpx.AsyncClient,
+    urls: Dict[str, str],
+    mix: Mix,
+    rate: float,
+    duration: float,
+    seed: int = 0,
+    max_in_flight: int = 1000,
+) -> RunResult:
+    """Send Poisson arrivals at ``rate`` requests per second for ``duration`` seconds."""
+    rng = random.Random(seed)
+    samples: List[Sample] = []
+    in_flight: set = set()
+    started = time.perf_counter()
+    arrival = started
+
+    async def tracked(scenario: Scenario, scheduled: float, request_rng: random.Random) -> None:
+        samples.append(await issue(client, urls, scenario, request_rng, started=scheduled))
+
+    while True:
+        arrival += rng.expovariate(rate)
+        if arrival - started >= duration:
+            break
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        scenario = mix.pick(rng)
+        if len(in_flight) >= max_in_flight:
+            samples.append(Sample(scenario.name, 0.0, False, error="dropped"))
+            continue
+        task = asyncio.create_task(tracked(scenario, arrival, random.Random(rng.random())))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    return RunResult(samples, time.perf_counter() - started)
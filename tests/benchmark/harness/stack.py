@@ -0,0 +1,116 @@
+"""Locate or boot the five services under test.
+
+``external`` mode benchmarks services that are already running (for example via
+``docker compose up``). ``local`` mode starts every service as a uvicorn process on
+consecutive ports from ``base_port``, wired to each other through the same
+environment variables docker-compose uses. Local mode runs the services with the
+current interpreter, which therefore needs every service's dependencies installed.
+
+The apps cannot share one process: each service is imported as ``src.main``.
+"""
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+# Same defaults as tests/integration
+EXTERNAL_URLS = {
+    "chatbot": "http://localhost:8000",
+    "mcp": "http://localhost:8001",
+    "neo4j": "http://localhost:8002",
+    "weaviate": "http://localhost:8003",
+    "relational": "http://localhost:8004",
+}
+
+
+@dataclass(frozen=True)
+class ServiceSpec:
+    directory: str
+    app: str
+    port_offset: int
+    pythonpath: List[str] = field(default_factory=lambda: ["."])
+
+
+SERVICES: Dict[str, ServiceSpec] = {
+    "chatbot": ServiceSpec("services/chatbot_service", "src.main:app", 0),
+    "mcp": ServiceSpec("services/mcp_service", "src.main:app", 1, [".", "src"]),
+    "neo4j": ServiceSpec("services/db_mocks/neo4j_mock", "src.main:app", 2),
+    "weaviate": ServiceSpec("services/db_mocks/weaviate_mock", "src.main:app", 3),
+    "relational": ServiceSpec("services/db_mocks/relational_mock", "src.main:app", 4),
+}
+
+
+def wait_until_healthy(urls: Dict[str, str], timeout: float = 30.0) -> None:
+    """Poll every service's /health endpoint until all answer 200."""
+    deadline = time.monotonic() + timeout
+    pending = dict(urls)
+    with httpx.Client(timeout=2.0) as client:
+        while pending:
+            for name, url in list(pending.items()):
+                try:
+                    if client.get(f"{url}/health").status_code == 200:
+                        del pending[name]
+                except httpx.HTTPError:
+                    pass
+            if pending and time.monotonic() > deadline:
+                raise RuntimeError(f"Services not healthy after {timeout:.0f}s: {', '.join(sorted(pending))}")
+            if pending:
+                time.sleep(0.2)
+
+
+class LocalStack:
+    """The five services as local uvicorn processes, stopped on exit."""
+
+    def __init__(self, base_port: int = 18000, host: str = "127.0.0.1", env: Optional[Dict[str, str]] = None):
+        self.host = host
+        self.urls = {name: f"http://{host}:{base_port + spec.port_offset}" for name, spec in SERVICES.items()}
+        self.extra_env = env or {}
+        self._processes: List[subprocess.Popen] = []
+
+    def _environment(self, spec: ServiceSpec) -> Dict[str, str]:
+        service_dir = REPO_ROOT / spec.directory
+        return {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(str(service_dir / path) for path in spec.pythonpath),
+            "MCP_SERVICE_URL": self.urls["mcp"],
+            "NEO4J_MOCK_URL": self.urls["neo4j"],
+            "WEAVIATE_MOCK_URL": self.urls["weaviate"],
+            "RELATIONAL_MOCK_URL": self.urls["relational"],
+            **self.extra_env,
+        }
+
+    def __enter__(self) -> "LocalStack":
+        try:
+            for name, spec in SERVICES.items():
+                port = self.urls[name].rsplit(":", 1)[1]
+                self._processes.append(subprocess.Popen(
+                    [sys.executable, "-m", "uvicorn", spec.app, "--host", self.host, "--port", port,
+                     "--log-level", "warning", "--no-access-log"],
+                    cwd=REPO_ROOT / spec.directory,
+                    env=self._environment(spec),
+                ))
+            wait_until_healthy(self.urls)
+        except BaseException:
+            self.stop()
+            raise
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def stop(self) -> None:
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._processes.clear()
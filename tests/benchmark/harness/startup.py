@@ -0,0 +1,140 @@
+"""Measure how long each service takes to become ready, and what its imports cost.
+
+Every run starts one service as a fresh uvicorn process and polls its /health
+endpoint every few milliseconds. Time to ready runs from spawning the process to the
+first 200, which is what a readiness probe waits for. One extra run with
+``-X importtime`` breaks the import cost down by top-level package; it is kept
+out of the timed runs because the tracing itself slows imports down.
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+
+from .stack import REPO_ROOT, SERVICES, ServiceSpec
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(text: str) -> List[ImportTiming]:
+    """The module lines of ``-X importtime`` output, in the order they were printed."""
+    timings = []
+    for line in text.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return timings
+
+
+def import_breakdown(timings: List[ImportTiming], top: int = 10) -> Dict[str, float]:
+    """Seconds spent importing each top-level package, largest first.
+
+    Self times are summed, so a package is charged only for its own modules and the
+    entries add up to the total import time. Anything past ``top`` is summed as ``other``.
+    """
+    seconds: Dict[str, float] = {}
+    for timing in timings:
+        package = timing.module.split(".")[0]
+        seconds[package] = seconds.get(package, 0.0) + timing.self_us / 1e6
+    ranked = sorted(seconds.items(), key=lambda item: -item[1])
+    breakdown = dict(ranked[:top])
+    if len(ranked) > top:
+        breakdown["other"] = sum(value for _, value in ranked[top:])
+    return breakdown
+
+
+def start_service(spec: ServiceSpec, port: int, env: Dict[str, str], stderr,
+                  importtime: bool = False) -> subprocess.Popen:
+    service_dir = REPO_ROOT / spec.directory
+    return subprocess.Popen(
+        [sys.executable, *(["-X", "importtime"] if importtime else []), "-m", "uvicorn", spec.app,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=service_dir,
+        env={
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(str(service_dir / path) for path in spec.pythonpath),
+            **env,
+        },
+        stdout=subprocess.DEVNULL,
+        stderr=stderr,
+    )
+
+
+def wait_until_ready(process: subprocess.Popen, url: str, timeout: float = 30.0, poll: float = 0.005) -> None:
+    """Return as soon as ``url``/health answers 200."""
+    started = time.perf_counter()
+    with httpx.Client(timeout=1.0) as client:
+        while True:
+            try:
+                if client.get(f"{url}/health").status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            if process.poll() is not None:
+                raise RuntimeError(f"{url} exited with status {process.returncode} before becoming ready")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+            time.sleep(poll)
+
+
+def stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def measure_service(name: str, port: int, runs: int = 5, top: int = 10,
+                    env: Optional[Dict[str, str]] = None) -> Dict[str, object]:
+    """Time to ready over ``runs`` cold starts, plus one import breakdown."""
+    spec = SERVICES[name]
+    url = f"http://127.0.0.1:{port}"
+    samples = []
+    for _ in range(runs):
+        # Time from just before the spawn, so interpreter startup counts too
+        started = time.perf_counter()
+        process = start_service(spec, port, env or {}, subprocess.DEVNULL)
+        try:
+            wait_until_ready(process, url)
+            samples.append(time.perf_counter() - started)
+        finally:
+            stop(process)
+
+    # The trace can outgrow a pipe buffer before anyone reads it, so it goes to a file
+    with tempfile.TemporaryFile("w+") as trace:
+        process = start_service(spec, port, env or {}, trace, importtime=True)
+        try:
+            wait_until_ready(process, url)
+        finally:
+            stop(process)
+        trace.seek(0)
+        timings = parse_importtime(trace.read())
+
+    return {
+        "time_to_ready_s": {
+            "min": min(samples),
+            "median": statistics.median(samples),
+            "max": max(samples),
+        },
+        "runs": samples,
+        "imports_s": sum(timing.self_us for timing in timings) / 1e6,
+        "import_breakdown_s": import_breakdown(timings, top),
+    }
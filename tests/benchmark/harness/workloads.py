@@ -0,0 +1,114 @@
+"""Request scenarios and the weighted mixes that combine them."""
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+CHAT_QUESTIONS = [
+    "What is the relationship between John and Jane?",
+    "Show the connection between TechCorp and its employees",
+    "Find documents similar to machine learning",
+    "Search for articles like natural language processing",
+    "Show the user profile for john_doe",
+    "List recent transaction records",
+]
+
+ROUTE_REQUESTS = [
+    ("who knows John", "graph_relationships"),
+    ("AI articles", "semantic_search"),
+    ("latest posts", "structured_data"),
+]
+
+RELATIONAL_QUERIES = [
+    "SELECT * FROM users WHERE id = 1",
+    "SELECT * FROM posts WHERE user_id = 1",
+    "SELECT username, email FROM users",
+    "SELECT * FROM users u JOIN posts p ON u.id = p.user_id",
+]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One kind of request: the service it targets and how to build its body."""
+
+    name: str
+    service: str
+    path: str
+    payload: Callable[[random.Random], Dict[str, Any]]
+
+
+def _chat(rng: random.Random) -> Dict[str, Any]:
+    return {"user_input": rng.choice(CHAT_QUESTIONS)}
+
+
+def _route(rng: random.Random) -> Dict[str, Any]:
+    query, intent = rng.choice(ROUTE_REQUESTS)
+    return {"query": query, "intent": intent}
+
+
+def _neo4j(rng: random.Random) -> Dict[str, Any]:
+    return {"query": "MATCH (n) RETURN n"}
+
+
+def _weaviate(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "vector": [rng.random() for _ in range(128)],
+        "class_name": "Document",
+        "limit": 5,
+        "distance_threshold": 1.0,
+    }
+
+
+def _relational(rng: random.Random) -> Dict[str, Any]:
+    return {"query": rng.choice(RELATIONAL_QUERIES), "query_type": "SELECT"}
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("chat", "chatbot", "/chat", _chat),
+        Scenario("route", "mcp", "/route", _route),
+        Scenario("neo4j_query", "neo4j", "/query", _neo4j),
+        Scenario("weaviate_query", "weaviate", "/query", _weaviate),
+        Scenario("relational_query", "relational", "/query", _relational),
+    )
+}
+
+MIXES: Dict[str, Dict[str, float]] = {
+    "chat": {"chat": 1},
+    "route": {"route": 1},
+    "mocks": {"neo4j_query": 1, "weaviate_query": 1, "relational_query": 1},
+    "full": {"chat": 4, "route": 3, "neo4j_query": 1, "weaviate_query": 1, "relational_query": 1},
+}
+
+
+class Mix:
+    """Weighted choice between scenarios."""
+
+    def __init__(self, weights: Dict[str, float]):
+        unknown = sorted(set(weights) - set(SCENARIOS))
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {', '.join(unknown)}")
+        if not weights or any(weight <= 0 for weight in weights.values()):
+            raise ValueError("A mix needs at least one scenario, all with positive weights")
+        self.weights = dict(weights)
+        self._scenarios: List[Scenario] = [SCENARIOS[name] for name in weights]
+        self._weights: List[float] = list(weights.values())
+
+    @property
+    def services(self) -> Tuple[str, ...]:
+        return tuple(sorted({scenario.service for scenario in self._scenarios}))
+
+    def pick(self, rng: random.Random) -> Scenario:
+        return rng.choices(self._scenarios, weights=self._weights)[0]
+
+
+def parse_mix(spec: str) -> Mix:
+    """A named mix (``full``) or explicit weights (``chat=3,route=1``)."""
+    if spec in MIXES:
+        return Mix(MIXES[spec])
+    weights: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight) if weight else 1.0
+    return Mix(weights)
+
@@ -0,0 +1,98 @@
+import httpx
+import pytest
+
+from harness.report import compare, percentile, summarize
+from harness.runner import RunResult, Sample, run_closed_loop, run_open_loop
+from harness.stack import EXTERNAL_URLS
+from harness.startup import import_breakdown, parse_importtime
+from harness.workloads import parse_mix
+
+def fake_client(status_code: int = 200) -> httpx.AsyncClient:
+    """Client whose requests are answered in-process, without any service running."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(status_code, json={})))
+
+
+def test_parse_mix():
+    """Test named mixes, explicit weights and validation."""
+    assert parse_mix("mocks").services == ("neo4j", "relational", "weaviate")
+    assert parse_mix("chat=3,route").weights == {"chat": 3.0, "route": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("unknown=1")
+
+
+async def test_closed_loop_records_every_request():
+    """Test the closed-loop runner against a fake stack.
+
+    Expected Outcome:
+        - Exactly max_requests samples, spread over the mix's scenarios
+        - Non-2xx responses are recorded as errors with their status
+    """
+    async with fake_client() as client:
+        result = await run_closed_loop(client, EXTERNAL_URLS, parse_mix("full"), 4, 10.0, max_requests=50)
+    assert len(result.samples) == 50
+    assert all(sample.ok for sample in result.samples)
+    assert len({sample.scenario for sample in result.samples}) > 1
+
+    async with fake_client(503) as client:
+        result = await run_closed_loop(client, EXTERNAL_URLS, parse_mix("route"), 2, 10.0, max_requests=4)
+    assert [sample.error for sample in result.samples] == ["HTTP 503"] * 4
+
+
+async def test_open_loop_sends_arrivals_at_rate():
+    """Test that the open-loop runner issues roughly rate * duration requests."""
+    async with fake_client() as client:
+        result = await run_open_loop(client, EXTERNAL_URLS, parse_mix("mocks"), 200.0, 0.5)
+    assert 50 < len(result.samples) < 150
+
+
+def test_summary_and_regression_check():
+    """Test percentile summaries and baseline comparison.
+
+    Expected Outcome:
+        - Nearest-rank percentiles and error rates per scenario
+        - Slower latency, lower throughput and more errors are reported as regressions
+    """
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 99) == 4.0
+
+    fast = RunResult([Sample("route", 0.010, True)] * 99 + [Sample("route", 0.0, False, error="HTTP 503")], 1.0)
+    slow = RunResult([Sample("route", 0.020, True)] * 80 + [Sample("route", 0.0, False, error="HTTP 503")] * 20, 1.0)
+    baseline = {"summary": summarize(fast)}
+    summary = baseline["summary"]["scenarios"]["route"]
+    assert summary["latency_ms"]["p95"] == pytest.approx(10.0)
+    assert summary["error_rate"] == pytest.approx(0.01)
+    assert summary["throughput_rps"] == pytest.approx(99.0)
+
+    assert compare(baseline, baseline) == []
+    regressions = compare(baseline, {"summary": summarize(slow)})
+    assert any("route: p99 latency" in regression for regression in regressions)
+    assert any("route: throughput" in regression for regression in regressions)
+    assert any("route: error rate" in regression for regression in regressions)
+
+
+def test_import_breakdown_from_importtime_output():
+    """Test parsing `python -X importtime` output into per-package import cost.
+
+    Expected Outcome:
+        - Module lines are parsed with their nesting depth; other stderr lines are ignored
+        - Self times are summed per top-level package, and the tail is folded into "other"
+    """
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       400 |        400 |   numpy._core",
+        "import time:       100 |        500 | numpy",
+        "import time:      2000 |       2000 |     fastapi.routing",
+        "import time:       300 |       2300 |   fastapi",
+        "import time:        50 |         50 | json",
+        "INFO:     Started server process [42]",
+        "import time:       700 |       3550 | src.main",
+    ])
+    timings = parse_importtime(output)
+    assert [(timing.module, timing.depth) for timing in timings] == [
+        ("numpy._core", 1), ("numpy", 0), ("fastapi.routing", 2), ("fastapi", 1), ("json", 0), ("src.main", 0),
+    ]
+
+    assert import_breakdown(timings) == pytest.approx(
+        {"fastapi": 0.0023, "src": 0.0007, "numpy": 0.0005, "json": 0.00005}
+    )
+    assert import_breakdown(timings, top=2) == pytest.approx({"fastapi": 0.0023, "src": 0.0007, "other": 0.00055})